@@ -4,10 +4,19 @@
 
 from .portfolio_analyzer import analyze_multi_timeframe, calculate_trend_alignment, make_portfolio_summary
 from .market_condition import analyze_market_condition
+from .ai_prompt import build_portfolio_messages, get_prompt_version
+from .signal_engine import TieredSignalEngine, generate_local_signals
+from .risk_metrics import compute_risk_metrics, risk_position_multiplier
 
 __all__ = [
     'analyze_multi_timeframe',
     'calculate_trend_alignment',
     'make_portfolio_summary',
     'analyze_market_condition',
+    'build_portfolio_messages',
+    'get_prompt_version',
+    'TieredSignalEngine',
+    'generate_local_signals',
+    'compute_risk_metrics',
+    'risk_position_multiplier',
 ]
@@ -7,6 +7,7 @@ import time
 import json
 import logging
 from openai import OpenAI
+from analysis.risk_metrics import compute_risk_metrics
 
 
 def analyze_multi_timeframe(coin_data, calculate_rsi_func):
@@ -84,7 +85,7 @@ def calculate_trend_alignment(multi_tf_analysis):
         return "mixed_signals"
 
 
-def make_portfolio_summary(portfolio_data, fng, news, calculate_rsi_func):
+def make_portfolio_summary(portfolio_data, fng, news, calculate_rsi_func, risk_config=None):
     """
     포트폴리오 전체 요약 생성 - 다중 타임프레임 지원
     
@@ -93,6 +94,7 @@ def make_portfolio_summary(portfolio_data, fng, news, calculate_rsi_func):
         fng: 공포탐욕지수
         news: 뉴스 헤드라인
         calculate_rsi_func: RSI 계산 함수
+        risk_config: 리스크 지표 설정 (weights, timeframe, window, var_confidence)
     
     Returns:
         dict: 포트폴리오 요약
@@ -135,4 +137,14 @@ def make_portfolio_summary(portfolio_data, fng, news, calculate_rsi_func):
     from analysis.market_condition import analyze_market_condition
     portfolio_summary["market_condition"] = analyze_market_condition(portfolio_summary)
     
+    # 상관/변동성/VaR/베타 리스크 지표 (수집된 캔들 재사용)
+    risk_config = risk_config or {}
+    portfolio_summary["risk_metrics"] = compute_risk_metrics(
+        portfolio_data,
+        weights=risk_config.get('weights'),
+        timeframe=risk_config.get('timeframe', 'hour1'),
+        window=risk_config.get('window'),
+        confidence=risk_config.get('var_confidence', 0.95)
+    )
+    
     return portfolio_summary
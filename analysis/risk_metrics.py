@@ -0,0 +1,168 @@
+"""
+포트폴리오 리스크 지표 (NumPy 벡터화)
+- 이미 수집한 캔들 데이터로 계산 (추가 API 호출 없음)
+- 수익률 공분산/상관 행렬, 코인별 실현 변동성, 포트폴리오 VaR/CVaR, BTC 대비 베타
+- AI 요약(portfolio_summary['risk_metrics'])과 동적 포지션 사이징에 사용
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# 타임프레임별 연간 기간 수 (암호화폐 24/365 거래)
+PERIODS_PER_YEAR = {
+    'day': 365,
+    'hour4': 365 * 6,
+    'hour1': 365 * 24
+}
+
+
+def align_returns(portfolio_data, timeframe='hour1', window=None):
+    """
+    코인별 종가를 공통 시각으로 정렬한 로그 수익률 행렬
+
+    Args:
+        portfolio_data: {coin: {timeframe: DataFrame}} (get_portfolio_data 결과)
+        timeframe: 사용할 타임프레임 ('day', 'hour4', 'hour1')
+        window: 최근 N개 수익률만 사용 (None이면 전체)
+
+    Returns:
+        tuple: (coins 리스트, returns np.ndarray [기간 × 코인]) - 데이터 부족 시 ([], None)
+    """
+    closes = {coin: data[timeframe]['close'] for coin, data in portfolio_data.items()
+              if data and data.get(timeframe) is not None and len(data[timeframe]) > 2}
+    if not closes:
+        return [], None
+
+    aligned = pd.concat(closes, axis=1, join='inner').sort_index()
+    prices = aligned.to_numpy(dtype=float)
+    if len(prices) < 3:
+        return [], None
+
+    returns = np.diff(np.log(prices), axis=0)
+    if window:
+        returns = returns[-window:]
+    return list(aligned.columns), returns
+
+
+def historical_var(returns, confidence=0.95):
+    """
+    역사적 VaR / CVaR (손실을 양수로 표현)
+
+    Args:
+        returns: 기간 수익률 배열
+        confidence: 신뢰수준
+
+    Returns:
+        tuple: (VaR, CVaR)
+    """
+    cutoff = np.quantile(returns, 1 - confidence)
+    tail = returns[returns <= cutoff]
+    cvar = -tail.mean() if tail.size else -cutoff
+    return float(max(-cutoff, 0.0)), float(max(cvar, 0.0))
+
+
+def compute_risk_metrics(portfolio_data, weights=None, timeframe='hour1', window=None,
+                         confidence=0.95, benchmark='BTC'):
+    """
+    포트폴리오 리스크 지표 계산
+
+    Args:
+        portfolio_data: {coin: {timeframe: DataFrame}}
+        weights: 코인별 비중 dict (None이면 동일 비중, 합이 1이 되도록 정규화)
+        timeframe: 수익률 계산 타임프레임
+        window: 최근 N개 수익률만 사용
+        confidence: VaR/CVaR 신뢰수준
+        benchmark: 베타 기준 코인
+
+    Returns:
+        dict: {
+            'timeframe', 'observations',
+            'volatility': {coin: 연환산 변동성},
+            'correlation': {coin: {coin: 상관계수}},
+            'avg_correlation': 평균 쌍별 상관계수,
+            'beta': {coin: 벤치마크 대비 베타},
+            'portfolio_volatility': 연환산 포트폴리오 변동성,
+            'var', 'cvar': 1기간 포트폴리오 VaR/CVaR (수익률, 손실 양수),
+            'var_daily', 'cvar_daily': 1일 환산 VaR/CVaR
+        } (데이터 부족 시 None)
+    """
+    coins, returns = align_returns(portfolio_data, timeframe, window)
+    if returns is None or len(returns) < 10:
+        return None
+
+    periods_per_year = PERIODS_PER_YEAR.get(timeframe, 365)
+    annualize = np.sqrt(periods_per_year)
+
+    covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(std, std)
+    correlation = np.nan_to_num(correlation)
+    np.fill_diagonal(correlation, 1.0)
+
+    n = len(coins)
+    off_diagonal = correlation[~np.eye(n, dtype=bool)]
+    avg_correlation = float(off_diagonal.mean()) if off_diagonal.size else 1.0
+
+    if benchmark in coins and std[coins.index(benchmark)] > 0:
+        b = coins.index(benchmark)
+        betas = covariance[:, b] / covariance[b, b]
+    else:
+        betas = np.full(n, np.nan)
+
+    w = np.array([(weights or {}).get(coin, 0 if weights else 1) for coin in coins], dtype=float)
+    if w.sum() <= 0:
+        w = np.ones(n)
+    w = w / w.sum()
+
+    portfolio_returns = returns @ w
+    portfolio_volatility = float(np.sqrt(w @ covariance @ w) * annualize)
+    var, cvar = historical_var(portfolio_returns, confidence)
+    day_scale = np.sqrt(periods_per_year / 365)
+
+    return {
+        'timeframe': timeframe,
+        'observations': int(len(returns)),
+        'volatility': {coin: round(float(s * annualize), 4) for coin, s in zip(coins, std)},
+        'correlation': {coin: {other: round(float(correlation[i, j]), 3) for j, other in enumerate(coins)}
+                        for i, coin in enumerate(coins)},
+        'avg_correlation': round(avg_correlation, 3),
+        'beta': {coin: (round(float(beta), 3) if np.isfinite(beta) else None) for coin, beta in zip(coins, betas)},
+        'portfolio_volatility': round(portfolio_volatility, 4),
+        'var': round(var, 5),
+        'cvar': round(cvar, 5),
+        'var_daily': round(var * day_scale, 5),
+        'cvar_daily': round(cvar * day_scale, 5),
+        'confidence': confidence
+    }
+
+
+def risk_position_multiplier(risk_metrics, target_volatility=0.8, high_correlation=0.8,
+                             correlation_multiplier=0.8, min_multiplier=0.5):
+    """
+    리스크 지표 기반 포지션 승수 (변동성 타기팅 + 고상관 분산효과 할인)
+
+    Args:
+        risk_metrics: compute_risk_metrics 결과 (None이면 1.0)
+        target_volatility: 목표 연환산 포트폴리오 변동성
+        high_correlation: 고상관 기준 평균 상관계수
+        correlation_multiplier: 고상관 시 추가 승수
+        min_multiplier: 승수 하한
+
+    Returns:
+        tuple: (승수, 사유 리스트)
+    """
+    if not risk_metrics:
+        return 1.0, []
+
+    multiplier = 1.0
+    reasons = []
+    portfolio_volatility = risk_metrics['portfolio_volatility']
+    if portfolio_volatility > target_volatility > 0:
+        multiplier *= target_volatility / portfolio_volatility
+        reasons.append(f"변동성 {portfolio_volatility:.0%} > 목표 {target_volatility:.0%}")
+    if risk_metrics['avg_correlation'] > high_correlation:
+        multiplier *= correlation_multiplier
+        reasons.append(f"평균 상관 {risk_metrics['avg_correlation']:.2f} > {high_correlation}")
+    return max(multiplier, min_multiplier), reasons
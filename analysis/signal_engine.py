@@ -0,0 +1,191 @@
+"""
+계층형 신호 엔진
+- 1단계: 로컬 규칙/점수 모델 (백테스트 매매 규칙과 공유, API 호출 없음)
+- 2단계: LLM 신호로 정제 (사이클당 엄격한 마감 시간 내에서만)
+- 마감 시점에 사용 가능한 결과를 채택하고 출처(provenance)를 기록
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+
+def score_indicators(indicators, threshold_buy=2, threshold_sell=2):
+    """
+    기술적 지표 점수 기반 신호 산출 (로컬 모델)
+
+    Args:
+        indicators: rsi, ma5, ma20, current_price (+ 선택: bb_upper, bb_lower)
+        threshold_buy: 매수 신호 최소 점수
+        threshold_sell: 매도 신호 최소 점수
+
+    Returns:
+        dict: {'signal', 'confidence', 'reason', 'buy_score', 'sell_score'}
+    """
+    rsi = indicators.get('rsi', 50)
+    current_price = indicators.get('current_price', 0)
+    ma5 = indicators.get('ma5') or current_price
+    ma20 = indicators.get('ma20') or current_price
+    bb_upper = indicators.get('bb_upper')
+    bb_lower = indicators.get('bb_lower')
+
+    buy_signals = 0
+    sell_signals = 0
+
+    # RSI 신호 (보수적 구간 설정)
+    if rsi < 25:  # 강한 과매도
+        buy_signals += 3
+    elif rsi < 35:  # 과매도
+        buy_signals += 2
+    elif rsi < 40:  # 약한 매수
+        buy_signals += 1
+    elif rsi > 75:  # 강한 과매수
+        sell_signals += 3
+    elif rsi > 65:  # 과매수
+        sell_signals += 2
+    elif rsi > 60:  # 약한 매도
+        sell_signals += 1
+
+    # 이동평균 신호 (트렌드 기반)
+    if current_price > ma5:  # 단기 상승
+        buy_signals += 1
+    elif current_price < ma5:  # 단기 하락
+        sell_signals += 1
+
+    if ma5 > ma20:  # 중기 상승 트렌드
+        buy_signals += 1
+    elif ma5 < ma20:  # 중기 하락 트렌드
+        sell_signals += 1
+
+    # 볼린저 밴드 신호 (지표가 있을 때만)
+    if bb_lower is not None and bb_upper is not None:
+        if current_price <= bb_lower * 1.02:  # 하단 근처
+            buy_signals += 1
+        elif current_price >= bb_upper * 0.98:  # 상단 근처
+            sell_signals += 1
+
+    # 가격 모멘텀 (MA20 대비 이격도)
+    price_change = (current_price - ma20) / ma20 * 100 if ma20 else 0
+    if price_change < -3:  # 3% 이상 하락
+        buy_signals += 1
+    elif price_change > 3:  # 3% 이상 상승
+        sell_signals += 1
+
+    if buy_signals >= threshold_buy:
+        signal = 'BUY'
+        confidence = min(0.85, 0.65 + buy_signals * 0.05)
+    elif sell_signals >= threshold_sell:
+        signal = 'SELL'
+        confidence = min(0.85, 0.65 + sell_signals * 0.05)
+    else:
+        signal = 'HOLD'
+        confidence = 0.5
+
+    return {
+        'signal': signal,
+        'confidence': confidence,
+        'reason': f'RSI: {rsi:.1f}, MA추세: {ma5 > ma20}, 매수신호: {buy_signals}, 매도신호: {sell_signals}',
+        'buy_score': buy_signals,
+        'sell_score': sell_signals
+    }
+
+
+def generate_local_signals(portfolio_summary):
+    """
+    포트폴리오 요약 전체에 로컬 모델 적용
+
+    Args:
+        portfolio_summary: make_portfolio_summary 결과
+
+    Returns:
+        dict: 코인별 신호 (source='local')
+    """
+    signals = {}
+    for coin, data in portfolio_summary.get('coins', {}).items():
+        result = score_indicators(data)
+        signals[coin] = {
+            'signal': result['signal'],
+            'confidence': result['confidence'],
+            'reason': f"[로컬 모델] {result['reason']}",
+            'source': 'local'
+        }
+    return signals
+
+
+class TieredSignalEngine:
+    """로컬 모델 + 마감 시간 제한 LLM 정제 신호 엔진"""
+
+    def __init__(self, llm_func, deadline_seconds=20):
+        """
+        Args:
+            llm_func: portfolio_summary → 신호 dict (실패 시 None) 함수
+            deadline_seconds: 사이클당 LLM 대기 한도 (초)
+        """
+        self.llm_func = llm_func
+        self.deadline_seconds = deadline_seconds
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LLMSignal")
+        self._pending = None
+        self.last_provenance = {}
+
+    def get_signals(self, portfolio_summary, deadline_seconds=None):
+        """
+        마감 시간 내 가용한 최선의 신호 반환
+
+        Args:
+            portfolio_summary: 포트폴리오 요약 데이터
+            deadline_seconds: 이번 사이클 마감 시간 (None이면 기본값)
+
+        Returns:
+            dict: 코인별 신호 (각 신호에 'source' = 'llm' | 'local')
+        """
+        start = time.perf_counter()
+        deadline = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+
+        # 1단계: 로컬 모델 (항상 즉시 사용 가능)
+        local_signals = generate_local_signals(portfolio_summary)
+        local_ms = (time.perf_counter() - start) * 1000
+
+        # 2단계: LLM 정제 (이전 호출이 아직 진행 중이면 중복 요청하지 않음)
+        llm_signals = None
+        if self._pending is not None and not self._pending.done():
+            status = 'llm_busy'
+        else:
+            self._pending = self._executor.submit(self.llm_func, portfolio_summary)
+            remaining = max(0.0, deadline - (time.perf_counter() - start))
+            try:
+                llm_signals = self._pending.result(timeout=remaining)
+                status = 'llm_ok' if llm_signals else 'llm_failed'
+            except FuturesTimeout:
+                status = 'llm_timeout'
+            except Exception as e:
+                logging.error(f"LLM 신호 오류: {e}")
+                status = 'llm_error'
+
+        # 3단계: 병합 (LLM 결과 우선, 누락 코인은 로컬 모델로 보완)
+        signals = {}
+        for coin, local_signal in local_signals.items():
+            llm_signal = (llm_signals or {}).get(coin)
+            if isinstance(llm_signal, dict) and 'signal' in llm_signal:
+                llm_signal['source'] = 'llm'
+                signals[coin] = llm_signal
+            else:
+                signals[coin] = local_signal
+        for coin, llm_signal in (llm_signals or {}).items():
+            if coin not in signals and isinstance(llm_signal, dict):
+                llm_signal['source'] = 'llm'
+                signals[coin] = llm_signal
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_provenance = {
+            'status': status,
+            'sources': {coin: data.get('source') for coin, data in signals.items()},
+            'local_ms': local_ms,
+            'elapsed_ms': elapsed_ms,
+            'deadline_seconds': deadline
+        }
+
+        if status != 'llm_ok':
+            print(f"⚡ 로컬 모델 신호 사용 ({status}, {elapsed_ms:.0f}ms / 마감 {deadline}초)")
+        logging.info(f"SIGNAL_ENGINE - {status} | 소요: {elapsed_ms:.0f}ms (로컬 {local_ms:.2f}ms) | "
+                     f"출처: {self.last_provenance['sources']}")
+        return signals
@@ -0,0 +1,57 @@
+"""
+백테스트 모듈
+"""
+
+from .engine import HistoricalBacktest, align_candles
+from .strategy import SignalStrategy, coin_thresholds
+from .indicators import indicator_snapshot
+from .vectorized import VectorizedBacktest, indicator_arrays, signal_arrays, vectorized_arrays
+from .replay import VirtualClock, HistoricalMarket, replay
+from .event_driven import EventDrivenBacktest
+from .sweep import ParameterSweep, grid_space, random_space, apply_overrides, rank_results, evaluate_vectorized
+from .walk_forward import WalkForward, walk_forward_windows, stitch_equity
+from .metrics import performance_report, equity_metrics, trade_metrics, round_trip_pnl, save_report, append_reports_csv
+from .monte_carlo import MonteCarloBacktest, simulate_paths, resample_indices
+from .intraday import IntradayBacktest, ExitRules, resolve_exits
+from .trend_coin import TrendCoinBacktest, universe_arrays, trend_scan, coin_summary
+
+__all__ = [
+    'HistoricalBacktest',
+    'align_candles',
+    'SignalStrategy',
+    'coin_thresholds',
+    'indicator_snapshot',
+    'VectorizedBacktest',
+    'indicator_arrays',
+    'signal_arrays',
+    'vectorized_arrays',
+    'VirtualClock',
+    'HistoricalMarket',
+    'replay',
+    'EventDrivenBacktest',
+    'ParameterSweep',
+    'grid_space',
+    'random_space',
+    'apply_overrides',
+    'rank_results',
+    'evaluate_vectorized',
+    'WalkForward',
+    'walk_forward_windows',
+    'stitch_equity',
+    'performance_report',
+    'equity_metrics',
+    'trade_metrics',
+    'round_trip_pnl',
+    'save_report',
+    'append_reports_csv',
+    'MonteCarloBacktest',
+    'simulate_paths',
+    'resample_indices',
+    'IntradayBacktest',
+    'ExitRules',
+    'resolve_exits',
+    'TrendCoinBacktest',
+    'universe_arrays',
+    'trend_scan',
+    'coin_summary',
+]
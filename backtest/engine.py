@@ -0,0 +1,130 @@
+"""
+과거 데이터 백테스트 엔진
+- 로컬 캔들 저장소에서 기간 전체를 티커당 1회 로드 (백테스트 중 네트워크 조회 없음)
+- 티커 간 공통 시각으로 정렬한 종가/거래량 행렬 구성
+- 매일 시점까지의 뷰(복사 없음)로 지표 계산 → 신호 → 포트폴리오 상태 갱신
+"""
+
+import time
+import numpy as np
+from backtest.indicators import indicator_snapshot
+
+
+def align_candles(store, tickers, interval='day', start=None, end=None):
+    """
+    티커별 캔들을 공통 시각으로 정렬
+
+    Returns:
+        dict: {'coins', 'ts' (n,), 'open'/'high'/'low'/'close'/'volume' (코인 × n)} - 데이터 없으면 None
+    """
+    records = {ticker: store.load(ticker, interval, start, end) for ticker in tickers}
+    records = {ticker: r for ticker, r in records.items() if len(r)}
+    if not records:
+        return None
+
+    common_ts = None
+    for r in records.values():
+        common_ts = r['ts'] if common_ts is None else np.intersect1d(common_ts, r['ts'], assume_unique=True)
+
+    market = {'coins': [ticker.split('-')[1] for ticker in records], 'ts': np.asarray(common_ts)}
+    positions = [np.searchsorted(r['ts'], common_ts) for r in records.values()]
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        market[field] = np.vstack([r[field][pos] for r, pos in zip(records.values(), positions)])
+    return market
+
+
+def ts_to_date(ts):
+    return str(np.datetime64(int(ts), 's').astype('datetime64[D]'))
+
+
+class HistoricalBacktest:
+    """로컬 캔들 기반 일별 백테스트"""
+
+    def __init__(self, store, tickers, strategy, lookback=30, interval='day'):
+        """
+        Args:
+            store: CandleStore
+            tickers: 티커 목록
+            strategy: SignalStrategy
+            lookback: 시점별 지표 계산 데이터 길이 (실거래 data_period_days)
+            interval: 캔들 주기
+        """
+        self.store = store
+        self.tickers = tickers
+        self.strategy = strategy
+        self.lookback = lookback
+        self.interval = interval
+
+    def load(self, days, end=None):
+        """
+        백테스트 기간 + 지표 계산 여유분 로드
+
+        Returns:
+            tuple: (market dict, 첫 거래 인덱스) - 데이터 부족 시 (None, None)
+        """
+        market = align_candles(self.store, self.tickers, self.interval, end=end)
+        if market is None:
+            return None, None
+        n = len(market['ts'])
+        first = max(self.lookback - 1, n - days)
+        if first >= n:
+            return None, None
+        return market, first
+
+    def run(self, days, initial_balance=1000000, end=None, verbose=False):
+        """
+        백테스트 실행
+
+        Args:
+            days: 백테스트 일수
+            initial_balance: 초기 자본
+            end: 종료 시점 (None이면 저장된 마지막 캔들)
+            verbose: 거래 출력 여부
+
+        Returns:
+            dict: {'initial_balance', 'final_balance', 'trades', 'daily_balance', 'equity',
+                   'max_drawdown', 'total_trades', 'elapsed'} (데이터 부족 시 None)
+        """
+        started = time.time()
+        market, first = self.load(days, end)
+        if market is None:
+            return None
+
+        coins = market['coins']
+        close, volume = market['close'], market['volume']
+        state = {'balance': float(initial_balance), 'holdings': {coin: 0.0 for coin in coins}, 'trades': []}
+        daily_balance = []
+
+        for i in range(first, len(market['ts'])):
+            date = ts_to_date(market['ts'][i])
+            window = slice(max(0, i - self.lookback + 1), i + 1)
+            prices = close[:, i]
+            total_value = state['balance'] + sum(state['holdings'][c] * p for c, p in zip(coins, prices))
+
+            for c, coin in enumerate(coins):
+                indicators = indicator_snapshot(close[c, window], volume[c, window])
+                result = self.strategy.signal(coin, indicators)
+                self.strategy.apply(state, date, coin, result['signal'], result['confidence'],
+                                    float(prices[c]), total_value, verbose)
+
+            equity = state['balance'] + float(np.dot([state['holdings'][c] for c in coins], prices))
+            daily_balance.append({'date': date, 'balance': equity, 'cash': state['balance']})
+
+        return self._results(initial_balance, state, daily_balance, started)
+
+    @staticmethod
+    def _results(initial_balance, state, daily_balance, started):
+        equity = np.array([d['balance'] for d in daily_balance], dtype=float)
+        peaks = np.maximum.accumulate(equity) if len(equity) else equity
+        max_drawdown = float(((peaks - equity) / peaks).max() * 100) if len(equity) else 0.0
+        return {
+            'initial_balance': initial_balance,
+            'final_balance': float(equity[-1]) if len(equity) else initial_balance,
+            'trades': state['trades'],
+            'daily_balance': daily_balance,
+            'equity': equity,
+            'holdings': state['holdings'],
+            'max_drawdown': max_drawdown,
+            'total_trades': len(state['trades']),
+            'elapsed': time.time() - started
+        }
@@ -0,0 +1,184 @@
+"""
+이벤트 기반 백테스트
+- 실거래 매매 함수(포트폴리오 사이클 / 신규코인 체크)를 그대로 호출
+- 모의 거래소(PaperExchange) + 캔들 합성 호가 + 가상 시계로 실행 → 쿨다운/집중도/약세장 방어/부분 매도 포함
+- 각 핸들러가 반환한 다음 실행 간격으로 이벤트 예약 (대기는 가상 시계만 전진)
+"""
+
+import os
+import time
+import heapq
+import logging
+import contextlib
+import numpy as np
+import pandas as pd
+from backtest.engine import HistoricalBacktest
+from backtest.replay import VirtualClock, HistoricalMarket, replay, candle_start
+from trading.paper_exchange import PaperExchange, UPBIT_FEE_RATE, UPBIT_MIN_ORDER_KRW
+
+
+# datetime.now()를 사용하는 봇 모듈 (가상 시계로 교체)
+DATETIME_MODULES = ('trading.paper_exchange', 'trading.trendcoin_trader')
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """콘솔 출력 / 로그 억제 (실거래 함수의 상세 출력이 백테스트 속도를 지배하지 않도록)"""
+    if not enabled:
+        yield
+        return
+    previous = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(previous)
+
+
+def exchange_trades(exchange):
+    """모의 거래소 주문 → 체결 기록 [{'date', 'type', 'coin', 'amount', 'price', 'value', 'fee'}]"""
+    trades = []
+    for order in exchange.orders.values():
+        volume = order['executed_volume']
+        if volume <= 0:
+            continue
+        value = sum(float(t['funds']) for t in order['trades'])
+        trades.append({
+            'date': order['created_at'][:19],
+            'type': 'BUY' if order['side'] == 'bid' else 'SELL',
+            'coin': order['market'].split('-')[1],
+            'amount': volume,
+            'price': value / volume,
+            'value': value,
+            'fee': order['paid_fee']
+        })
+    return trades
+
+
+class EventDrivenBacktest:
+    """실거래 매매 경로 재생 백테스트"""
+
+    def __init__(self, store, tickers, handlers, base_interval='minute60', initial_krw=1000000,
+                 fee_rate=UPBIT_FEE_RATE, min_order_krw=UPBIT_MIN_ORDER_KRW, depth_ratio=0.02,
+                 datetime_modules=(), patches=()):
+        """
+        Args:
+            store: CandleStore (기준 주기 캔들 필요)
+            tickers: 기간 산정 기준 티커 (포트폴리오 코인)
+            handlers: {이름: (함수(upbit, 실행 횟수) → 다음 간격(초) 또는 None, 기본 간격(초))}
+            base_interval: 기준 캔들 주기 (이보다 짧은 간격은 기준 주기로 올림 - 가격 변화 없음)
+            initial_krw: 초기 자본
+            fee_rate: 수수료율
+            min_order_krw: 최소 주문 금액
+            depth_ratio: 합성 호가 깊이 비율 (HistoricalMarket 참조)
+            datetime_modules: 가상 시계로 교체할 추가 모듈 (봇 메인 모듈 등)
+            patches: 추가 교체 [(객체, 속성명, 값), ...] (과거 재현 불가 외부 호출 차단)
+        """
+        self.store = store
+        self.tickers = tickers
+        self.handlers = handlers
+        self.base_interval = base_interval
+        self.initial_krw = initial_krw
+        self.fee_rate = fee_rate
+        self.min_order_krw = min_order_krw
+        self.depth_ratio = depth_ratio
+        self.datetime_modules = DATETIME_MODULES + tuple(datetime_modules)
+        self.patches = patches
+
+    def period(self, days, end=None):
+        """백테스트 구간 (시작, 종료) - 종료는 기준 티커 공통 마지막 캔들 마감 시각 (end 지정 시 end가 속한 캔들 마감)"""
+        market = HistoricalMarket(self.store, VirtualClock(0), self.base_interval)
+        last = [market._load(t)[1][-1] for t in self.tickers if len(market._load(t)[1])]
+        if len(last) < len(self.tickers):
+            return None, None
+        end_ts = float(min(last) + market.base_seconds)
+        if end is not None:
+            end_ts = min(end_ts, candle_start(pd.Timestamp(end).value // 10**9, market.base_seconds) + market.base_seconds)
+        return end_ts - days * 86400, end_ts
+
+    def run(self, days, end=None, verbose=False):
+        """
+        백테스트 실행
+
+        Args:
+            days: 시뮬레이션 일수
+            end: 종료 시점 (None이면 저장된 마지막 캔들)
+            verbose: 실거래 함수 출력 표시 여부
+
+        Returns:
+            dict: HistoricalBacktest 결과 형식 + {'cycles', 'errors', 'simulated_days', 'days_per_second',
+                   'exchange_stats', 'market_calls'} (데이터 부족 시 None)
+        """
+        started = time.time()
+        start_ts, end_ts = self.period(days, end)
+        if start_ts is None:
+            return None
+
+        clock = VirtualClock(start_ts)
+        market = HistoricalMarket(self.store, clock, self.base_interval, depth_ratio=self.depth_ratio)
+        exchange = PaperExchange(self.initial_krw, self.fee_rate, self.min_order_krw,
+                                 orderbook_source=market.orderbook)
+
+        queue = [(start_ts, order, name) for order, name in enumerate(self.handlers)]
+        heapq.heapify(queue)
+        counts = {name: 0 for name in self.handlers}
+        errors = []
+        daily_balance = []
+        day_end = None
+
+        with replay(market, self.datetime_modules, self.patches), quiet(not verbose):
+            while queue:
+                at, order, name = heapq.heappop(queue)
+                if at >= end_ts:
+                    break
+                clock.advance_to(at)
+
+                # 일 경계를 넘으면 직전 일 마감 자산 기록
+                while day_end is not None and clock.now >= day_end:
+                    self._record_day(daily_balance, exchange, day_end - 86400)
+                    day_end += 86400
+                if day_end is None:
+                    day_end = candle_start(clock.now, 86400) + 86400
+
+                func, default_interval = self.handlers[name]
+                try:
+                    interval = func(exchange, counts[name])
+                except Exception as e:
+                    errors.append({'time': clock.datetime().isoformat(), 'handler': name, 'error': str(e)})
+                    interval = None
+                counts[name] += 1
+
+                interval = max(interval or default_interval, market.base_seconds)
+                heapq.heappush(queue, (max(at + interval, clock.now), order, name))
+
+            # 남은 일 마감 + 진행 중인 마지막 일 기록
+            clock.advance_to(end_ts)
+            while day_end is not None and clock.now >= day_end:
+                self._record_day(daily_balance, exchange, day_end - 86400)
+                day_end += 86400
+            if day_end is not None and day_end - 86400 < end_ts:
+                self._record_day(daily_balance, exchange, day_end - 86400)
+            holdings = {currency: account['balance'] + account['locked']
+                        for currency, account in exchange.accounts.items()}
+            exchange_stats = dict(exchange.stats)
+
+        state = {'trades': exchange_trades(exchange), 'holdings': holdings}
+        results = HistoricalBacktest._results(self.initial_krw, state, daily_balance, started)
+        results.update({
+            'cycles': counts,
+            'errors': errors,
+            'simulated_days': (end_ts - start_ts) / 86400,
+            'days_per_second': (end_ts - start_ts) / 86400 / max(results['elapsed'], 1e-9),
+            'exchange_stats': exchange_stats,
+            'market_calls': dict(market.stats)
+        })
+        return results
+
+    @staticmethod
+    def _record_day(daily_balance, exchange, day_start):
+        """일봉 구간(KST 09:00 시작) 마감 자산 기록"""
+        total_value = exchange.get_total_value()
+        date = str(np.datetime64(int(day_start), 's').astype('datetime64[D]'))
+        daily_balance.append({'date': date, 'balance': total_value,
+                              'cash': exchange.accounts['KRW']['balance'] + exchange.accounts['KRW']['locked']})
@@ -0,0 +1,57 @@
+"""
+백테스트용 기술적 지표 (NumPy)
+- 시점별 스냅샷: 해당 시점까지의 종가 뷰만으로 계산 (미래 데이터 미사용)
+- 값과 결측 처리 규칙은 실거래 로컬 모델 입력과 동일 (RSI 14, MA5/MA20, 볼린저 20/2σ)
+"""
+
+import numpy as np
+
+
+RSI_PERIOD = 14
+BB_PERIOD = 20
+BB_STD = 2
+
+
+def _rsi_from_deltas(deltas):
+    """단순 이동평균 RSI (손실 0이면 100, 변동 없음이면 결측 → 50)"""
+    gain = np.clip(deltas, 0, None).mean()
+    loss = np.clip(-deltas, 0, None).mean()
+    if loss == 0:
+        return 100.0 if gain > 0 else 50.0
+    return float(100 - 100 / (1 + gain / loss))
+
+
+def indicator_snapshot(close, volume=None):
+    """
+    시점 스냅샷 지표 (close[-1]이 현재 시점)
+
+    Args:
+        close: 현재 시점까지의 종가 배열 (뷰)
+        volume: 현재 시점까지의 거래량 배열 (선택)
+
+    Returns:
+        dict: {'rsi', 'ma5', 'ma20', 'current_price', 'bb_upper', 'bb_lower', 'volume'}
+    """
+    current_price = float(close[-1])
+    n = len(close)
+
+    rsi = _rsi_from_deltas(np.diff(close[-(RSI_PERIOD + 1):])) if n > RSI_PERIOD else 50.0
+    ma5 = float(close[-5:].mean()) if n >= 5 else current_price
+    ma20 = float(close[-20:].mean()) if n >= 20 else current_price
+    if n >= BB_PERIOD:
+        window = close[-BB_PERIOD:]
+        bb_ma = window.mean()
+        bb_std = window.std(ddof=1)
+        bb_upper, bb_lower = float(bb_ma + bb_std * BB_STD), float(bb_ma - bb_std * BB_STD)
+    else:
+        bb_upper, bb_lower = current_price * 1.02, current_price * 0.98
+
+    return {
+        'rsi': rsi,
+        'ma5': ma5,
+        'ma20': ma20,
+        'current_price': current_price,
+        'bb_upper': bb_upper,
+        'bb_lower': bb_lower,
+        'volume': float(volume[-1]) if volume is not None and len(volume) else 0
+    }
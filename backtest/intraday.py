@@ -0,0 +1,295 @@
+"""
+장중 해상도 백테스트
+- 일봉 신호(벡터화 신호 배열)는 다음 날 첫 장중 캔들 시가에 체결 (지표는 마감된 일봉만 사용)
+- 보유 코인 손절 / 단계별 익절은 1시간 / 5분 / 1분 캔들 고가·저가로 장중 체결 판정 (갭은 시가 체결)
+- 장중 캔들은 메모리 맵 뷰에서 필요한 구간만 슬라이스 → 수백만 개 캔들도 메모리 부담 없음
+- 자산 곡선은 장중 주기로 기록 → 장중 최대 낙폭 반영
+"""
+
+import time
+import numpy as np
+from backtest.engine import HistoricalBacktest
+from backtest.vectorized import signal_arrays, SIGNAL_NAMES
+from data.candle_store import INTERVAL_SECONDS
+
+
+class ExitRules:
+    """보유 포지션 청산 규칙 (평균 매입가 대비 손절 / 단계별 익절)"""
+
+    def __init__(self, stop_loss=None, stages=(), stage_min_value=0, min_order_krw=5000, ambiguous='stop'):
+        """
+        Args:
+            stop_loss: 손절 수익률 (예: -0.05, None이면 손절 없음)
+            stages: [(수익률, 매도 비율), ...] 수익률 오름차순 (비율 1.0 = 전량)
+            stage_min_value: 부분 익절 실행 최소 평가금액 (미만이면 익절 없이 다음 단계까지 보유)
+            min_order_krw: 최소 주문 금액 (부분 익절 후 남는 평가금액이 미만이면 전량 매도, 매도 금액이 미만이면 보유 유지)
+            ambiguous: 한 캔들 안에서 손절가/익절가 모두 도달 시 가정 ('stop': 손절 우선 - 보수적, 'target': 익절 우선)
+        """
+        self.stop_loss = stop_loss
+        self.stages = sorted(tuple(stage) for stage in stages)
+        self.stage_min_value = stage_min_value
+        self.min_order_krw = min_order_krw
+        self.ambiguous = ambiguous
+
+    @classmethod
+    def trend_coin(cls):
+        """신규/트렌드 코인 청산 규칙 (trendcoin_trader 손절 / 분할익절 / 최소 투자금 상수)"""
+        from trading import trendcoin_trader as trader
+        return cls(
+            stop_loss=trader.STOP_LOSS_THRESHOLD,
+            stages=[(stage['threshold'], stage['sell_ratio']) for stage in trader.PROFIT_TAKE_STAGES.values()],
+            stage_min_value=trader.MIN_TRADE_AMOUNT
+        )
+
+    @classmethod
+    def from_config(cls, config):
+        """config.json 값으로 생성 (backtest.intraday_* / trading.stop_loss_percent)"""
+        backtest = config.get('backtest', {})
+        stop_loss_percent = backtest.get('intraday_stop_loss_percent',
+                                         config.get('trading', {}).get('stop_loss_percent'))
+        return cls(
+            stop_loss=-abs(stop_loss_percent) / 100 if stop_loss_percent else None,
+            stages=backtest.get('intraday_take_profit', []),
+            min_order_krw=config.get('trading', {}).get('min_trade_amount', 5000),
+            ambiguous=backtest.get('intraday_ambiguous', 'stop')
+        )
+
+    def levels(self, avg_price, stage):
+        """현재 단계의 (손절가, 익절가) - 없으면 None"""
+        lower = avg_price * (1 + self.stop_loss) if self.stop_loss is not None else None
+        upper = avg_price * (1 + self.stages[stage][0]) if stage < len(self.stages) else None
+        return lower, upper
+
+
+def bar_arrays(records):
+    """캔들 구조화 배열(메모리 맵) → 필드별 뷰 (복사 없음)"""
+    return {field: records[field] for field in ('ts', 'open', 'high', 'low', 'close')}
+
+
+def first_touch(bars, lo, hi, lower, upper, chunk=2048):
+    """
+    [lo, hi) 구간에서 저가 ≤ lower 또는 고가 ≥ upper 인 첫 캔들 (구간을 점점 늘려가며 배열 비교)
+
+    Returns:
+        int: 캔들 인덱스 (없으면 -1)
+    """
+    start = lo
+    while start < hi:
+        stop = min(hi, start + chunk)
+        hit = np.zeros(stop - start, dtype=bool)
+        if lower is not None:
+            hit |= bars['low'][start:stop] <= lower
+        if upper is not None:
+            hit |= bars['high'][start:stop] >= upper
+        index = int(hit.argmax())
+        if hit[index]:
+            return start + index
+        start = stop
+        chunk *= 2
+    return -1
+
+
+def resolve_exits(bars, lo, hi, position, rules):
+    """
+    포지션 1개의 [lo, hi) 구간 장중 청산 판정 (position의 quantity / stage 갱신)
+
+    체결가: 시가가 이미 손절가/익절가를 넘었으면 시가(갭), 아니면 해당 가격.
+    한 캔들에서 둘 다 도달하면 rules.ambiguous 가정. 부분 익절 후에는 같은 캔들부터 다음 단계를 이어서 판정.
+
+    Args:
+        bars: bar_arrays 결과
+        lo, hi: 판정 구간 (캔들 인덱스)
+        position: {'quantity', 'avg_price', 'stage'}
+        rules: ExitRules
+
+    Returns:
+        list: [{'index', 'price', 'quantity', 'reason'}] 체결 순
+    """
+    fills = []
+    while position['quantity'] > 0 and lo < hi:
+        lower, upper = rules.levels(position['avg_price'], position['stage'])
+        if lower is None and upper is None:
+            break
+        index = first_touch(bars, lo, hi, lower, upper)
+        if index < 0:
+            break
+
+        open_price = float(bars['open'][index])
+        hit_lower = lower is not None and float(bars['low'][index]) <= lower
+        hit_upper = upper is not None and float(bars['high'][index]) >= upper
+        if lower is not None and open_price <= lower:
+            stop = True
+        elif upper is not None and open_price >= upper:
+            stop = False
+        else:
+            stop = hit_lower and (not hit_upper or rules.ambiguous == 'stop')
+
+        if stop:
+            price = min(open_price, lower)
+            if position['quantity'] * price < rules.min_order_krw:
+                break  # 최소 주문 금액 미만 - 손절 불가 (실거래와 같이 관리 중단)
+            fills.append({'index': index, 'price': price, 'quantity': position['quantity'], 'reason': 'stop_loss'})
+            position['quantity'] = 0.0
+            break
+
+        price = max(open_price, upper)
+        stage = position['stage']
+        ratio = rules.stages[stage][1]
+        value = position['quantity'] * price
+        if ratio >= 1 and value < rules.min_order_krw:
+            lo = index + 1  # 전량 익절 불가 - 보유 유지 후 다음 캔들부터 재판정
+            continue
+        position['stage'] += 1
+        if ratio < 1 and value < rules.stage_min_value:
+            lo = index  # 부분 익절 최소 금액 미달 - 다음 단계 목표까지 보유
+            continue
+        quantity = position['quantity'] * ratio
+        if ratio >= 1 or (position['quantity'] - quantity) * price < rules.min_order_krw:
+            quantity = position['quantity']
+        fills.append({'index': index, 'price': price, 'quantity': quantity, 'reason': f'take_profit_{stage + 1}'})
+        position['quantity'] -= quantity
+        lo = index
+    return fills
+
+
+class IntradayBacktest(HistoricalBacktest):
+    """일봉 신호 + 장중 캔들 손절/익절 백테스트 (1시간 / 5분 / 1분)"""
+
+    def __init__(self, store, tickers, strategy, lookback=30, interval='minute60', exit_rules=None,
+                 equity_interval='minute60'):
+        """
+        Args:
+            store: CandleStore (일봉 + 장중 주기 캔들 필요)
+            tickers: 티커 목록
+            strategy: SignalStrategy (신호 체결 규칙)
+            lookback: 일봉 지표 여유분
+            interval: 장중 캔들 주기 ('minute60' / 'minute5' / 'minute1' 등)
+            exit_rules: ExitRules (None이면 장중 청산 없음)
+            equity_interval: 자산 기록 주기 (장중 낙폭 해상도)
+        """
+        super().__init__(store, tickers, strategy, lookback, 'day')
+        self.bar_interval = interval
+        self.bar_seconds = INTERVAL_SECONDS[interval]
+        self.exit_rules = exit_rules
+        self.equity_seconds = max(INTERVAL_SECONDS[equity_interval], self.bar_seconds)
+
+    def run(self, days, initial_balance=1000000, end=None, verbose=False):
+        """
+        백테스트 실행 (일봉 i의 신호 → i+1일 첫 장중 캔들 시가 체결 → 당일 장중 청산 판정)
+
+        Returns:
+            dict: HistoricalBacktest 결과 형식 (daily_balance는 장중 자산 기록, date = 'YYYY-MM-DDTHH:MM:SS')
+                  + {'simulated_days', 'bars', 'exits'} (데이터 부족 시 None)
+        """
+        started = time.time()
+        market, first = self.load(days, end)
+        if market is None:
+            return None
+
+        coins = market['coins']
+        tickers = [t for t in self.tickers if t.split('-')[1] in coins]
+        signal, confidence = signal_arrays(coins, market['close'])
+        bars = [bar_arrays(self.store.load(ticker, self.bar_interval)) for ticker in tickers]
+        if any(not len(b['ts']) for b in bars):
+            return None
+
+        state = {'balance': float(initial_balance), 'holdings': {coin: 0.0 for coin in coins}, 'trades': []}
+        holdings = state['holdings']
+        positions = [{'quantity': 0.0, 'avg_price': 0.0, 'stage': 0} for _ in coins]
+        last_price = market['close'][:, first].astype(float).copy()
+        records, exits, bar_count, simulated_seconds = [], 0, 0, 0
+        rules = self.exit_rules
+
+        for i in range(first, len(market['ts'])):
+            day_start = int(market['ts'][i]) + 86400
+            bounds = [(int(np.searchsorted(b['ts'], day_start)), int(np.searchsorted(b['ts'], day_start + 86400)))
+                      for b in bars]
+            if all(lo >= hi for lo, hi in bounds):
+                break
+            date = str(np.datetime64(day_start, 's').astype('datetime64[D]'))
+
+            # 1) 전일 일봉 신호 → 첫 캔들 시가 체결
+            for c, (lo, hi) in enumerate(bounds):
+                if lo < hi:
+                    last_price[c] = float(bars[c]['open'][lo])
+            total_value = state['balance'] + sum(holdings[coin] * p for coin, p in zip(coins, last_price))
+            for c, coin in enumerate(coins):
+                if not signal[c, i] or bounds[c][0] >= bounds[c][1]:
+                    continue
+                before = holdings[coin]
+                self.strategy.apply(state, date, coin, SIGNAL_NAMES[int(signal[c, i])], float(confidence[c, i]),
+                                    float(last_price[c]), total_value, verbose)
+                if holdings[coin] > before:
+                    position = positions[c]
+                    position['avg_price'] = (before * position['avg_price'] +
+                                             (holdings[coin] - before) * last_price[c]) / holdings[coin]
+                    position['stage'] = 0
+                positions[c]['quantity'] = holdings[coin]
+
+            # 2) 장중 손절/익절 (보유 코인만, 당일 캔들 구간)
+            events = []
+            for c, coin in enumerate(coins):
+                lo, hi = bounds[c]
+                bar_count += hi - lo
+                if rules is None or holdings[coin] <= 0 or lo >= hi:
+                    continue
+                for fill in resolve_exits(bars[c], lo, hi, positions[c], rules):
+                    value = fill['quantity'] * fill['price']
+                    fee = value * self.strategy.fee_rate
+                    holdings[coin] = max(0.0, holdings[coin] - fill['quantity'])
+                    state['balance'] += value - fee
+                    events.append((int(bars[c]['ts'][fill['index']]), c, fill['quantity'], value - fee))
+                    ts = np.datetime64(int(bars[c]['ts'][fill['index']]), 's')
+                    state['trades'].append({'date': str(ts), 'type': 'SELL', 'coin': coin, 'amount': fill['quantity'],
+                                            'price': fill['price'], 'value': value, 'fee': fee,
+                                            'reason': fill['reason']})
+                    exits += 1
+                    if verbose:
+                        print(f"    🎯 {ts} {coin} {fill['reason']}: {fill['quantity']:.6f}개 @ {fill['price']:,.0f}원")
+                positions[c]['quantity'] = holdings[coin]
+
+            # 3) 장중 자산 기록 (기록 시각까지 체결된 청산 반영, 마지막 부분 일자는 저장된 마지막 캔들 마감까지)
+            day_end = max(int(b['ts'][hi - 1]) + self.bar_seconds for b, (lo, hi) in zip(bars, bounds) if lo < hi)
+            day_end = min(day_end, day_start + 86400)
+            simulated_seconds += day_end - day_start
+            records += self._intraday_equity(day_start, day_end, bars, bounds, coins, holdings, state['balance'],
+                                             events, last_price)
+
+        results = self._results(initial_balance, state, records, started)
+        results.update({
+            'simulated_days': simulated_seconds / 86400,
+            'bars': bar_count,
+            'exits': exits
+        })
+        return results
+
+    def _intraday_equity(self, day_start, day_end, bars, bounds, coins, holdings, balance, events, last_price):
+        """
+        당일 자산 기록 [{'date', 'balance', 'cash'}] (기록 시각 = 구간 끝, 청산 전 수량/현금 역산)
+        - 기록 시각은 day_end(당일 마지막 캔들 마감)까지만 - 마지막 부분 일자를 고정 가격으로 늘리지 않음
+        """
+        samples = day_start + self.equity_seconds * np.arange(1, 86400 // self.equity_seconds + 1)
+        samples = np.unique(np.minimum(samples, day_end))
+        cash = np.full(len(samples), balance)
+        value = np.zeros(len(samples))
+        for c, coin in enumerate(coins):
+            quantity = np.full(len(samples), holdings[coin])
+            for at, e, sold, proceeds in events:
+                if e == c:
+                    before = samples <= at
+                    quantity[before] += sold
+                    cash[before] -= proceeds
+            lo, hi = bounds[c]
+            if lo < hi:
+                # 기록 시각 이전에 마감된 마지막 캔들 종가 (당일 첫 캔들 마감 전은 시가)
+                index = np.searchsorted(bars[c]['ts'][lo:hi], samples - self.bar_seconds, side='right') - 1
+                closes = np.asarray(bars[c]['close'][lo:hi], dtype=float)
+                prices = np.where(index >= 0, closes[np.maximum(index, 0)], last_price[c])
+                last_price[c] = float(closes[-1])
+            else:
+                prices = np.full(len(samples), last_price[c])
+            value += quantity * prices
+
+        total = cash + value
+        stamps = samples.astype('datetime64[s]').astype(str).tolist()
+        return [{'date': d, 'balance': float(b), 'cash': float(k)} for d, b, k in zip(stamps, total, cash)]
@@ -0,0 +1,204 @@
+"""
+백테스트 성과 지표
+- 자산 곡선: CAGR / 변동성 / 샤프 / 소르티노 / 칼마 / 최대 낙폭 + 낙폭 지속 기간 (배열 연산)
+- 거래: FIFO 매칭 왕복 거래 실현 손익 → 승률 / 손익비, 회전율 / 수수료 부담
+- 결과 1건당 배열 연산만 수행 → 수천 건 탐색 결과에도 부담 없음, JSON / CSV 저장
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+
+def periods_per_year(dates, default=365):
+    """자산 기록 시각 간격 → 연간 기록 수 (일별 365, 시간별 8760)"""
+    if len(dates) < 2:
+        return default
+    stamps = np.array(dates, dtype='datetime64[s]').astype('i8')
+    span = stamps[-1] - stamps[0]
+    return (len(stamps) - 1) / span * 365 * 86400 if span > 0 else default
+
+
+def equity_metrics(equity, initial_balance, annual_periods=365):
+    """
+    자산 곡선 지표
+
+    Args:
+        equity: 기록 시점별 총자산 배열 (초기 자본 제외)
+        initial_balance: 초기 자본 (첫 수익률 기준)
+        annual_periods: 연간 기록 수
+
+    Returns:
+        dict: {'total_return', 'cagr', 'volatility', 'sharpe', 'sortino', 'calmar',
+               'max_drawdown', 'max_drawdown_duration'} (수익률/낙폭 %, 지속 기간 일)
+    """
+    equity = np.concatenate([[float(initial_balance)], np.asarray(equity, dtype=float)])
+    returns = equity[1:] / equity[:-1] - 1
+    years = len(returns) / annual_periods
+    total_return = equity[-1] / equity[0] - 1
+    cagr = (equity[-1] / equity[0]) ** (1 / years) - 1 if years > 0 and equity[-1] > 0 else 0.0
+
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2)) if len(returns) else 0.0
+    mean = returns.mean() if len(returns) else 0.0
+
+    # 낙폭: 직전 고점 대비 하락률, 지속 기간 = 고점 회복 전까지 연속 기록 수
+    peaks = np.maximum.accumulate(equity)
+    drawdown = 1 - equity / peaks
+    max_drawdown = float(drawdown.max())
+    at_peak = np.flatnonzero(drawdown <= 0)
+    underwater = np.diff(np.append(at_peak, len(equity))) - 1
+    duration = int(underwater.max()) if len(underwater) else 0
+
+    return {
+        'total_return': total_return * 100,
+        'cagr': cagr * 100,
+        'volatility': std * np.sqrt(annual_periods) * 100,
+        'sharpe': float(mean / std * np.sqrt(annual_periods)) if std > 0 else 0.0,
+        'sortino': float(mean / downside * np.sqrt(annual_periods)) if downside > 0 else 0.0,
+        'calmar': float(cagr / max_drawdown) if max_drawdown > 0 else 0.0,
+        'max_drawdown': max_drawdown * 100,
+        'max_drawdown_duration': duration * 365 / annual_periods
+    }
+
+
+def trade_arrays(trades):
+    """
+    체결 기록 → 배열 (매수 원가 = 수량 × 가격 + 수수료, 매도 대금 = 수량 × 가격 - 수수료)
+
+    Returns:
+        dict: {'coin', 'buy' (bool), 'amount', 'notional', 'fee', 'cash'} (cash: 매수 원가 / 매도 대금)
+    """
+    amount = np.array([t['amount'] for t in trades], dtype=float)
+    price = np.array([t['price'] for t in trades], dtype=float)
+    fee = np.array([t.get('fee', 0.0) for t in trades], dtype=float)
+    buy = np.array([t['type'] == 'BUY' for t in trades], dtype=bool)
+    notional = amount * price
+    return {
+        'coin': np.array([t['coin'] for t in trades]),
+        'buy': buy,
+        'amount': amount,
+        'notional': notional,
+        'fee': fee,
+        'cash': np.where(buy, notional + fee, notional - fee)
+    }
+
+
+def round_trip_pnl(arrays):
+    """
+    FIFO 매칭 왕복 거래 실현 손익 (매도 1건 = 왕복 1건, 부분 매도 포함)
+
+    코인별 누적 매수/매도 수량 구간을 겹쳐 매칭 구간마다 (매도 단가 - 매입 단가) × 수량 계산.
+    매수 이력보다 많이 매도한 수량(초기 보유분)은 제외.
+
+    Args:
+        arrays: trade_arrays 결과
+
+    Returns:
+        tuple: (매도별 실현 손익 배열, 매도별 매칭 원가 배열) - 체결 순서
+    """
+    sell_index = np.flatnonzero(~arrays['buy'])
+    pnl = np.zeros(len(sell_index))
+    basis = np.zeros(len(sell_index))
+    if not len(sell_index):
+        return pnl, basis
+    sell_position = np.empty(len(arrays['buy']), dtype=int)
+    sell_position[sell_index] = np.arange(len(sell_index))
+
+    for coin in np.unique(arrays['coin'][sell_index]):
+        is_coin = arrays['coin'] == coin
+        buys = np.flatnonzero(is_coin & arrays['buy'])
+        sells = np.flatnonzero(is_coin & ~arrays['buy'])
+        if not len(buys):
+            continue
+        buy_end = np.cumsum(arrays['amount'][buys])
+        sell_end = np.cumsum(arrays['amount'][sells])
+        buy_unit = arrays['cash'][buys] / arrays['amount'][buys]
+        sell_unit = arrays['cash'][sells] / arrays['amount'][sells]
+
+        matched = min(buy_end[-1], sell_end[-1])
+        edges = np.unique(np.concatenate([[0.0], buy_end, sell_end]))
+        edges = edges[edges <= matched]
+        start, size = edges[:-1], np.diff(edges)
+        b = np.minimum(np.searchsorted(buy_end, start, side='right'), len(buys) - 1)
+        s = np.minimum(np.searchsorted(sell_end, start, side='right'), len(sells) - 1)
+
+        target = sell_position[sells]
+        pnl[target] = np.bincount(s, size * (sell_unit[s] - buy_unit[b]), minlength=len(sells))
+        basis[target] = np.bincount(s, size * buy_unit[b], minlength=len(sells))
+    return pnl, basis
+
+
+def trade_metrics(trades, average_equity, years):
+    """
+    거래 지표
+
+    Returns:
+        dict: {'trades', 'round_trips', 'win_rate', 'profit_factor', 'avg_win', 'avg_loss',
+               'turnover', 'fees', 'fee_drag'} (승률/평균 손익 %, 회전율 연환산 배, 수수료 부담 연 %)
+    """
+    metrics = {'trades': len(trades), 'round_trips': 0, 'win_rate': 0.0, 'profit_factor': 0.0,
+               'avg_win': 0.0, 'avg_loss': 0.0, 'turnover': 0.0, 'fees': 0.0, 'fee_drag': 0.0}
+    if not trades:
+        return metrics
+
+    arrays = trade_arrays(trades)
+    pnl, basis = round_trip_pnl(arrays)
+    closed = basis > 0
+    pnl, returns = pnl[closed], pnl[closed] / basis[closed] * 100
+    wins, losses = pnl > 0, pnl < 0
+    fees = float(arrays['fee'].sum())
+    metrics.update({
+        'round_trips': int(closed.sum()),
+        'win_rate': float(wins.mean() * 100) if len(pnl) else 0.0,
+        'profit_factor': float(pnl[wins].sum() / -pnl[losses].sum()) if losses.any() else 0.0,
+        'avg_win': float(returns[wins].mean()) if wins.any() else 0.0,
+        'avg_loss': float(returns[losses].mean()) if losses.any() else 0.0,
+        'fees': fees
+    })
+    if average_equity > 0 and years > 0:
+        metrics['turnover'] = float(arrays['notional'].sum() / average_equity / years)
+        metrics['fee_drag'] = fees / average_equity / years * 100
+    return metrics
+
+
+def performance_report(results):
+    """
+    백테스트 결과 → 성과 지표 (HistoricalBacktest / VectorizedBacktest / EventDrivenBacktest 결과 형식)
+
+    Returns:
+        dict: JSON 직렬화 가능한 지표 (equity_metrics + trade_metrics + 기간/자본)
+    """
+    daily_balance = results.get('daily_balance') or []
+    equity = np.asarray(results['equity'], dtype=float)
+    initial_balance = float(results['initial_balance'])
+    annual_periods = periods_per_year([d['date'] for d in daily_balance]) if daily_balance else 365
+    years = len(equity) / annual_periods
+
+    report = {
+        'start': daily_balance[0]['date'] if daily_balance else None,
+        'end': daily_balance[-1]['date'] if daily_balance else None,
+        'days': years * 365,
+        'initial_balance': initial_balance,
+        'final_balance': float(equity[-1]) if len(equity) else initial_balance
+    }
+    report.update(equity_metrics(equity, initial_balance, annual_periods))
+    average_equity = float(equity.mean()) if len(equity) else initial_balance
+    report.update(trade_metrics(results.get('trades') or [], average_equity, years))
+    return report
+
+
+def save_report(report, path):
+    """지표 JSON 저장"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=float)
+
+
+def append_reports_csv(reports, path):
+    """지표 행을 CSV에 추가 (실행 간 비교용, 파일이 없으면 머리글 포함 생성)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    exists = os.path.exists(path)
+    pd.DataFrame(reports).to_csv(path, mode='a', header=not exists, index=False,
+                                 encoding='utf-8' if exists else 'utf-8-sig')
@@ -0,0 +1,257 @@
+"""
+몬테카를로 강건성 검증
+- 가격 경로 재표본: 과거 일간 로그 수익률 부트스트랩 / 블록 부트스트랩 (같은 날짜를 전 코인에 적용 → 코인 간 상관 유지)
+- 진입 시점 교란: 경로 × 코인별 신호 지연 (0 ~ max_delay일)
+- 경로 축 벡터화 백테스트 (지표/신호/포트폴리오 상태를 경로 × 코인 배열로 계산) + 프로세스 풀 청크 병렬
+- 최종 수익률 / 최대 낙폭 분포, 파산 확률 (자산이 초기 자본 × (1 - ruin_level) 이하로 하락한 경로 비율)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from backtest.vectorized import signal_arrays
+
+
+def resample_indices(rng, count, paths, length, block_size=1):
+    """
+    재표본 수익률 인덱스 (block_size > 1이면 이동 블록 부트스트랩 - 변동성 군집/추세 보존)
+
+    Returns:
+        np.ndarray: (paths, length) 인덱스 (0 ~ count-1)
+    """
+    block_size = max(1, min(block_size, count))
+    if block_size == 1:
+        return rng.integers(0, count, size=(paths, length))
+    blocks = -(-length // block_size)
+    starts = rng.integers(0, count - block_size + 1, size=(paths, blocks))
+    return (starts[:, :, None] + np.arange(block_size)).reshape(paths, -1)[:, :length]
+
+
+def synthetic_close(close, first, indices):
+    """
+    재표본 가격 경로 (first 이전은 실제 가격 - 지표 계산 여유분, 이후는 재표본 수익률 누적)
+
+    Args:
+        close: 실제 종가 (코인 × 기간)
+        first: 첫 거래 인덱스 (≥ 1)
+        indices: resample_indices 결과 (경로 × 거래 일수) - 거래 구간 수익률 기준 인덱스
+
+    Returns:
+        np.ndarray: (경로 × 코인 × 기간) 종가
+    """
+    returns = np.log(close[:, first:] / close[:, first - 1:-1])
+    paths = np.exp(np.cumsum(returns[:, indices], axis=-1)).transpose(1, 0, 2) * close[None, :, first - 1:first]
+    history = np.broadcast_to(close[None, :, :first], (len(indices),) + close[:, :first].shape)
+    return np.concatenate([history, paths], axis=-1)
+
+
+def delay_signals(signal, confidence, rng, max_delay):
+    """경로 × 코인별 신호 지연 (d일 전 신호를 오늘 가격으로 체결, 지연 전 구간은 관망)"""
+    paths, coins, length = signal.shape
+    delay = rng.integers(0, max_delay + 1, size=(paths, coins, 1))
+    source = np.arange(length) - delay
+    valid = source >= 0
+    source = np.maximum(source, 0)
+    path_index = np.arange(paths)[:, None, None]
+    coin_index = np.arange(coins)[None, :, None]
+    return (np.where(valid, signal[path_index, coin_index, source], 0),
+            np.where(valid, confidence[path_index, coin_index, source], 0.5))
+
+
+def simulate_paths(close, signal, confidence, first, strategy, initial_balance):
+    """
+    경로 축 벡터화 포트폴리오 상태 루프 (SignalStrategy.apply와 동일 규칙, 일 × 코인 순서)
+
+    Args:
+        close, signal, confidence: (경로 × 코인 × 기간) 배열
+        first: 첫 거래 인덱스
+        strategy: SignalStrategy
+        initial_balance: 초기 자본
+
+    Returns:
+        dict: 경로별 {'final_balance', 'max_drawdown' (%), 'min_equity', 'trades'}
+    """
+    paths, coins, length = close.shape
+    balance = np.full(paths, float(initial_balance))
+    holdings = np.zeros((paths, coins))
+    trades = np.zeros(paths, dtype=int)
+    peak = np.full(paths, float(initial_balance))
+    min_equity = peak.copy()
+    max_drawdown = np.zeros(paths)
+
+    for i in range(first, length):
+        prices = close[:, :, i]
+        total_value = balance + (holdings * prices).sum(axis=1)
+        for c in range(coins):
+            price = prices[:, c]
+            buy = (signal[:, c, i] == 1) & (confidence[:, c, i] > strategy.buy_confidence)
+            if buy.any():
+                trade_amount = np.minimum(balance * strategy.base_trade_ratio, balance * strategy.max_cash_use)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    coin_ratio = np.where(total_value > 0, holdings[:, c] * price / total_value, 0)
+                buy &= (trade_amount > strategy.min_trade_amount) & (balance > trade_amount)
+                buy &= coin_ratio <= strategy.max_coin_ratio
+                fee = trade_amount * strategy.fee_rate
+                holdings[:, c] += np.where(buy, (trade_amount - fee) / price, 0)
+                balance -= np.where(buy, trade_amount, 0)
+                trades += buy
+
+            sell = (signal[:, c, i] == -1) & (holdings[:, c] > 0)
+            if sell.any():
+                conf = confidence[:, c, i]
+                amount = holdings[:, c] * np.where(conf > 0.6, conf, 0.3)
+                value = amount * price
+                sell &= value > strategy.min_trade_amount
+                holdings[:, c] -= np.where(sell, amount, 0)
+                balance += np.where(sell, value - value * strategy.fee_rate, 0)
+                trades += sell
+
+        equity = balance + (holdings * prices).sum(axis=1)
+        np.maximum(peak, equity, out=peak)
+        np.minimum(min_equity, equity, out=min_equity)
+        np.maximum(max_drawdown, (peak - equity) / peak, out=max_drawdown)
+
+    return {'final_balance': equity, 'max_drawdown': max_drawdown * 100,
+            'min_equity': min_equity, 'trades': trades}
+
+
+def distribution(values, percentiles=(1, 5, 25, 50, 75, 95, 99)):
+    """분포 요약 {'mean', 'std', 'p1', ...}"""
+    summary = {'mean': float(values.mean()), 'std': float(values.std())}
+    summary.update({f'p{p}': float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))})
+    return summary
+
+
+# 워커 프로세스 상태 (초기화 시 1회 구성)
+_WORKER = {}
+
+
+def _init_worker(settings):
+    _WORKER.clear()
+    _WORKER.update(settings)
+
+
+def _simulate_chunk(seed, paths):
+    rng = np.random.default_rng(seed)
+    close, first = _WORKER['close'], _WORKER['first']
+    if _WORKER['method'] in ('bootstrap', 'block'):
+        block_size = _WORKER['block_size'] if _WORKER['method'] == 'block' else 1
+        indices = resample_indices(rng, close.shape[1] - first, paths, close.shape[1] - first, block_size)
+        path_close = synthetic_close(close, first, indices)
+        signal, confidence = signal_arrays(_WORKER['coins'], path_close)
+    else:
+        path_close = np.broadcast_to(close, (paths,) + close.shape)
+        signal = np.broadcast_to(_WORKER['signal'], path_close.shape)
+        confidence = np.broadcast_to(_WORKER['confidence'], path_close.shape)
+    if _WORKER['max_delay'] > 0:
+        signal, confidence = delay_signals(signal, confidence, rng, _WORKER['max_delay'])
+    return simulate_paths(path_close, signal, confidence, first, _WORKER['strategy'], _WORKER['initial_balance'])
+
+
+class MonteCarloBacktest:
+    """벡터화 백테스트 몬테카를로 (경로 축 벡터화 + 프로세스 풀)"""
+
+    def __init__(self, market, first, strategy, initial_balance=1000000, method='block', block_size=10,
+                 max_delay=0, ruin_level=0.5, workers=None, chunk_size=500):
+        """
+        Args:
+            market: 정렬 캔들 (HistoricalBacktest.load 결과)
+            first: 첫 거래 인덱스
+            strategy: SignalStrategy
+            initial_balance: 초기 자본
+            method: 'bootstrap' (일간 수익률 독립 재표본) / 'block' (블록 재표본) / 'timing' (실제 가격, 신호 지연만)
+            block_size: 블록 길이 (일)
+            max_delay: 최대 신호 지연 (일, 0이면 지연 없음 - 모든 방식에 적용)
+            ruin_level: 파산 기준 손실률 (초기 자본 대비)
+            workers: 프로세스 수 (None/0이면 CPU 코어 수)
+            chunk_size: 작업 1건당 경로 수 (메모리 ≈ 경로 × 코인 × 기간 × 수십 바이트)
+        """
+        self.market = market
+        self.first = max(1, first)
+        self.strategy = strategy
+        self.initial_balance = initial_balance
+        self.method = method
+        self.block_size = block_size
+        self.max_delay = max_delay
+        self.ruin_level = ruin_level
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+
+    def historical(self):
+        """실제 가격 / 지연 없는 기준 경로 (simulate_paths 1개 경로 - VectorizedBacktest.simulate와 동일)"""
+        close = self.market['close'][None]
+        signal, confidence = signal_arrays(self.market['coins'], close)
+        result = simulate_paths(close, signal, confidence, self.first, self.strategy, self.initial_balance)
+        return {key: float(value[0]) for key, value in result.items()}
+
+    def run(self, paths=10000, seed=None):
+        """
+        몬테카를로 실행
+
+        Args:
+            paths: 시뮬레이션 경로 수
+            seed: 난수 시드 (재현용, None이면 매번 다름)
+
+        Returns:
+            dict: {'paths': 경로별 DataFrame, 'summary': 분포 요약 dict}
+        """
+        started = time.perf_counter()
+        close = np.ascontiguousarray(self.market['close'])
+        settings = {
+            'close': close,
+            'first': self.first,
+            'coins': self.market['coins'],
+            'method': self.method,
+            'block_size': self.block_size,
+            'max_delay': self.max_delay,
+            'strategy': self.strategy,
+            'initial_balance': self.initial_balance
+        }
+        if self.method == 'timing':
+            settings['signal'], settings['confidence'] = signal_arrays(self.market['coins'], close)
+
+        sizes = [min(self.chunk_size, paths - start) for start in range(0, paths, self.chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        print(f"🎲 몬테카를로: 경로 {paths:,}개 ({self.method}, 블록 {self.block_size}일, 지연 최대 {self.max_delay}일) | "
+              f"거래 {close.shape[1] - self.first}일 | 프로세스 {self.workers}개")
+
+        chunks = []
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(settings,)) as executor:
+            futures = [executor.submit(_simulate_chunk, s, n) for s, n in zip(seeds, sizes)]
+            step = max(1, len(futures) // 5)
+            for done, future in enumerate(as_completed(futures), 1):
+                chunks.append(future.result())
+                if done % step == 0 or done == len(futures):
+                    print(f"  ⏳ {done}/{len(futures)} 청크 완료 ({time.perf_counter() - started:.1f}초)")
+
+        results = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+        table = pd.DataFrame({
+            'final_return': (results['final_balance'] / self.initial_balance - 1) * 100,
+            'max_drawdown': results['max_drawdown'],
+            'min_equity_ratio': results['min_equity'] / self.initial_balance,
+            'trades': results['trades']
+        })
+
+        historical = self.historical()
+        historical_return = (historical['final_balance'] / self.initial_balance - 1) * 100
+        summary = {
+            'paths': paths,
+            'method': self.method,
+            'block_size': self.block_size,
+            'max_delay': self.max_delay,
+            'final_return': distribution(table['final_return'].to_numpy()),
+            'max_drawdown': distribution(table['max_drawdown'].to_numpy()),
+            'loss_probability': float((table['final_return'] < 0).mean() * 100),
+            'ruin_level': self.ruin_level,
+            'ruin_probability': float((table['min_equity_ratio'] <= 1 - self.ruin_level).mean() * 100),
+            'historical': {
+                'final_return': historical_return,
+                'max_drawdown': historical['max_drawdown'],
+                'return_percentile': float((table['final_return'] < historical_return).mean() * 100)
+            },
+            'elapsed': time.perf_counter() - started
+        }
+        print(f"✅ 몬테카를로 완료: {summary['elapsed']:.1f}초 ({paths / summary['elapsed']:,.0f}경로/초)")
+        return {'paths': table, 'summary': summary}
@@ -0,0 +1,255 @@
+"""
+과거 시세 재생 (이벤트 기반 백테스트용)
+- 가상 시계: time.time / time.sleep / datetime.now 를 시뮬레이션 시각으로 대체 (대기는 즉시 시각만 전진)
+- 캔들 저장소 기반 시세: pyupbit.get_ohlcv / get_current_price / get_orderbook / get_tickers 대체
+- 시점 이후 데이터는 노출하지 않음 (현재가 = 마지막 완성 기준 캔들 종가, 상위 주기 캔들은 진행 중 캔들 포함)
+"""
+
+import sys
+import time
+import contextlib
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pyupbit
+from data.candle_store import CANDLE_DTYPE, INTERVAL_SECONDS, records_to_frame
+
+
+# 캔들 ts는 KST 기준 epoch 초 (실제 epoch = ts - 9시간)
+KST_OFFSET = 9 * 3600
+KST = timezone(timedelta(hours=9))
+EPOCH = datetime(1970, 1, 1)
+
+# 업비트 캔들 구간 시작 기준 (일봉 KST 09:00)
+CANDLE_ANCHOR = 9 * 3600
+
+
+class VirtualClock:
+    """시뮬레이션 시계 (now = KST 기준 epoch 초, 캔들 ts와 동일 기준)"""
+
+    def __init__(self, start):
+        self.now = float(start)
+
+    def time(self):
+        """time.time 대체 (실제 epoch 초)"""
+        return self.now - KST_OFFSET
+
+    def sleep(self, seconds):
+        """time.sleep 대체 (대기 없이 시각만 전진)"""
+        if seconds and seconds > 0:
+            self.now += seconds
+
+    def advance_to(self, ts):
+        self.now = max(self.now, float(ts))
+
+    def datetime(self):
+        return EPOCH + timedelta(seconds=self.now)
+
+    def datetime_class(self):
+        """now()/today()가 시뮬레이션 시각(KST)을 반환하는 datetime 대체 클래스"""
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                current = clock.datetime()
+                return current if tz is None else current.replace(tzinfo=KST).astimezone(tz)
+
+            @classmethod
+            def today(cls):
+                return clock.datetime()
+
+        return VirtualDatetime
+
+
+def candle_start(ts, seconds):
+    """ts가 속한 캔들 구간 시작 시각 (업비트 구간 기준)"""
+    return ts - (ts - CANDLE_ANCHOR) % seconds
+
+
+def resample_records(records, seconds):
+    """기준 캔들 → 상위 주기 캔들 (마지막 구간은 진행 중 캔들)"""
+    ts = records['ts']
+    buckets = candle_start(ts, seconds)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    out = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    out['ts'] = buckets[starts]
+    out['open'] = records['open'][starts]
+    out['close'] = records['close'][ends]
+    out['high'] = np.maximum.reduceat(records['high'], starts)
+    out['low'] = np.minimum.reduceat(records['low'], starts)
+    out['volume'] = np.add.reduceat(records['volume'], starts)
+    out['value'] = np.add.reduceat(records['value'], starts)
+    return out
+
+
+class HistoricalMarket:
+    """캔들 저장소 기반 시점별 시세/호가 (pyupbit 시세 함수와 동일한 시그니처/응답 형식)"""
+
+    def __init__(self, store, clock, base_interval='minute60', tickers=None, depth_ratio=0.02,
+                 min_depth_krw=10_000_000, spread=0.0005, levels=15):
+        """
+        Args:
+            store: CandleStore
+            clock: VirtualClock
+            base_interval: 기준 캔들 주기 (가격 변화 최소 단위, 상위 주기는 이 캔들로 합성)
+            tickers: 거래 가능 티커 목록 (None이면 저장소의 기준 주기 티커 전체)
+            depth_ratio: 호가 한쪽 총 깊이 = 1시간 거래대금 × depth_ratio
+            min_depth_krw: 호가 한쪽 최소 깊이 (거래대금 정보 없는 캔들 대비)
+            spread: 호가 단계 간격 (현재가 대비 비율, 1호가 = ±spread)
+            levels: 호가 단계 수
+        """
+        self.store = store
+        self.clock = clock
+        self.base_interval = base_interval
+        self.base_seconds = INTERVAL_SECONDS[base_interval]
+        self.tickers = list(tickers or store.tickers(base_interval))
+        self.depth_ratio = depth_ratio
+        self.min_depth_krw = min_depth_krw
+        self.spread = spread
+        self.levels = levels
+        self._series = {}
+        self._books = {}
+        self._frames = {}
+        self.stats = {'ohlcv': 0, 'price': 0, 'orderbook': 0}
+
+    def _load(self, ticker):
+        series = self._series.get(ticker)
+        if series is None:
+            records = self.store.load(ticker, self.base_interval)
+            series = (records, np.ascontiguousarray(records['ts']))
+            self._series[ticker] = series
+        return series
+
+    def _closed_index(self, ticker):
+        """현재 시각 기준 마지막 완성 캔들 인덱스 (없으면 -1)"""
+        _, ts = self._load(ticker)
+        return int(np.searchsorted(ts, self.clock.now - self.base_seconds, side='right')) - 1
+
+    def price(self, ticker):
+        index = self._closed_index(ticker)
+        return float(self._load(ticker)[0]['close'][index]) if index >= 0 else None
+
+    def orderbook(self, ticker):
+        """현재가 주변 합성 호가 (단계별 동일 금액, 같은 캔들 안에서는 캐시)"""
+        index = self._closed_index(ticker)
+        if index < 0:
+            return None
+        cached = self._books.get(ticker)
+        if cached and cached[0] == index:
+            return cached[1]
+
+        candle = self._load(ticker)[0][index]
+        price = float(candle['close'])
+        value = float(candle['value']) or price * float(candle['volume'])
+        depth = max(value * min(1.0, 3600 / self.base_seconds) * self.depth_ratio, self.min_depth_krw)
+        size = depth / self.levels / price
+
+        offsets = self.spread * np.arange(1, self.levels + 1)
+        units = [{'ask_price': pyupbit.get_tick_size(price * (1 + o), 'ceil'),
+                  'bid_price': pyupbit.get_tick_size(price * (1 - o), 'floor'),
+                  'ask_size': size,
+                  'bid_size': size} for o in offsets]
+        book = {
+            'market': ticker,
+            'timestamp': int(self.clock.time() * 1000),
+            'total_ask_size': size * self.levels,
+            'total_bid_size': size * self.levels,
+            'orderbook_units': units
+        }
+        self._books[ticker] = (index, book)
+        return book
+
+    # ------------------------------------------------------------------
+    # pyupbit 시세 함수 대체
+    # ------------------------------------------------------------------
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None, period=0.1):
+        """
+        시점까지의 캔들 (상위 주기는 기준 캔들로 합성, 마지막 캔들은 진행 중)
+
+        Returns:
+            DataFrame: pyupbit 형식 (기준 주기보다 짧은 주기/데이터 없음은 None)
+        """
+        self.stats['ohlcv'] += 1
+        seconds = INTERVAL_SECONDS.get(interval)
+        if seconds is None or seconds < self.base_seconds or seconds % self.base_seconds:
+            return None
+        records, ts = self._load(ticker)
+        end = self._closed_index(ticker) + 1
+        if end <= 0:
+            return None
+        key = (ticker, seconds, count, end)
+        cached = self._frames.get(key)
+        if cached is not None:
+            return cached.copy()
+
+        if seconds == self.base_seconds:
+            window = records[max(0, end - count):end]
+        else:
+            first_bucket = candle_start(ts[end - 1], seconds) - (count - 1) * seconds
+            start = int(np.searchsorted(ts, first_bucket, side='left'))
+            window = resample_records(records[start:end], seconds)
+        if not len(window):
+            return None
+
+        # 같은 캔들 안의 반복 조회는 캐시 사본 반환 (한도 초과 시 캐시 전체 폐기)
+        if len(self._frames) > 4096:
+            self._frames.clear()
+        frame = records_to_frame(window)
+        self._frames[key] = frame
+        return frame.copy()
+
+    def get_current_price(self, ticker="KRW-BTC", limit_info=False, verbose=False):
+        self.stats['price'] += 1
+        if isinstance(ticker, list):
+            prices = {t: self.price(t) for t in ticker}
+            return {t: p for t, p in prices.items() if p is not None}
+        return self.price(ticker)
+
+    def get_orderbook(self, ticker="KRW-BTC", limit_info=False):
+        self.stats['orderbook'] += 1
+        if isinstance(ticker, list):
+            return [book for book in (self.orderbook(t) for t in ticker) if book]
+        return self.orderbook(ticker)
+
+    def get_tickers(self, fiat="", is_details=False, limit_info=False, verbose=False):
+        """시점 기준 거래 가능 티커 (해당 시각 이전 캔들이 있는 티커)"""
+        return [t for t in self.tickers if t.startswith(fiat) and self._closed_index(t) >= 0]
+
+
+@contextlib.contextmanager
+def replay(market, datetime_modules=(), patches=()):
+    """
+    pyupbit 시세 함수 / time / datetime 을 재생 시장으로 교체 (종료 시 원복)
+
+    Args:
+        market: HistoricalMarket
+        datetime_modules: 'from datetime import datetime'을 사용하는 모듈 이름 목록
+        patches: 추가 교체 [(객체, 속성명, 값), ...]
+    """
+    clock = market.clock
+    replacements = [
+        (pyupbit, 'get_ohlcv', market.get_ohlcv),
+        (pyupbit, 'get_current_price', market.get_current_price),
+        (pyupbit, 'get_orderbook', market.get_orderbook),
+        (pyupbit, 'get_tickers', market.get_tickers),
+        (time, 'time', clock.time),
+        (time, 'sleep', clock.sleep)
+    ]
+    virtual_datetime = clock.datetime_class()
+    for name in datetime_modules:
+        module = sys.modules.get(name)
+        if module is not None and getattr(module, 'datetime', None) is datetime:
+            replacements.append((module, 'datetime', virtual_datetime))
+    replacements += list(patches)
+
+    originals = [(target, attr, getattr(target, attr)) for target, attr, _ in replacements]
+    try:
+        for target, attr, value in replacements:
+            setattr(target, attr, value)
+        yield market
+    finally:
+        for target, attr, value in reversed(originals):
+            setattr(target, attr, value)
@@ -0,0 +1,121 @@
+"""
+백테스트 매매 규칙 (로컬 신호 모델 기반)
+- 신호: analysis.signal_engine.score_indicators (실거래 로컬 모델과 동일 점수)
+- 매수: 신뢰도 기준 이상 BUY → 현금 × 기본 거래 비율 (현금 사용 상한, 코인 비중 상한)
+- 매도: SELL → 보유량 × 신뢰도 비율 (신뢰도 낮으면 30%)
+- 거래 수수료 반영
+"""
+
+import zlib
+from analysis.signal_engine import score_indicators
+
+
+def coin_thresholds(coin):
+    """
+    코인별 매수/매도 신호 점수 기준 (코인명 기반 고정 분류)
+
+    Returns:
+        tuple: (threshold_buy, threshold_sell)
+    """
+    coin_factor = zlib.crc32(coin.encode('utf-8')) % 3  # 실행마다 달라지지 않는 해시
+    if coin_factor == 0:  # 보수적
+        return 3, 2
+    return 2, 2
+
+
+class SignalStrategy:
+    """로컬 신호 기반 일봉 매매 규칙"""
+
+    def __init__(self, base_trade_ratio=0.1, min_trade_amount=5000, buy_confidence=0.6,
+                 max_coin_ratio=0.5, max_cash_use=0.8, fee_rate=0.0005):
+        """
+        Args:
+            base_trade_ratio: 매수 시 현금 대비 거래 비율
+            min_trade_amount: 최소 거래 금액
+            buy_confidence: 매수 신호 최소 신뢰도
+            max_coin_ratio: 코인 비중 상한 (초과 시 추가 매수 금지)
+            max_cash_use: 1회 매수 현금 사용 상한
+            fee_rate: 거래 수수료율
+        """
+        self.base_trade_ratio = base_trade_ratio
+        self.min_trade_amount = min_trade_amount
+        self.buy_confidence = buy_confidence
+        self.max_coin_ratio = max_coin_ratio
+        self.max_cash_use = max_cash_use
+        self.fee_rate = fee_rate
+
+    @classmethod
+    def from_config(cls, config):
+        """config.json 값으로 생성 (trading / backtest 섹션)"""
+        trading = config.get('trading', {})
+        backtest = config.get('backtest', {})
+        return cls(
+            base_trade_ratio=trading.get('base_trade_ratio', 0.1),
+            min_trade_amount=trading.get('min_trade_amount', 5000),
+            buy_confidence=backtest.get('buy_confidence', 0.6),
+            max_coin_ratio=backtest.get('max_coin_ratio', 0.5),
+            fee_rate=backtest.get('fee_rate', 0.0005)
+        )
+
+    def signal(self, coin, indicators):
+        """코인 1개 신호 (score_indicators 결과)"""
+        threshold_buy, threshold_sell = coin_thresholds(coin)
+        return score_indicators(indicators, threshold_buy, threshold_sell)
+
+    def apply(self, state, date, coin, signal, confidence, price, total_value, verbose=False):
+        """
+        신호 1건을 포트폴리오 상태에 반영
+
+        Args:
+            state: {'balance', 'holdings': {coin: 수량}, 'trades': []}
+            date: 거래일 문자열
+            coin: 코인명
+            signal: 'BUY' / 'SELL' / 'HOLD'
+            confidence: 신뢰도
+            price: 체결 가격 (당일 종가)
+            total_value: 당일 시작 시점 총자산 (비중 계산용)
+            verbose: 거래 출력 여부
+        """
+        holdings = state['holdings']
+        if signal in ('STRONG_BUY', 'BUY') and confidence > self.buy_confidence:
+            multiplier = 1.5 if signal == 'STRONG_BUY' and confidence > 0.8 else 1.0
+            balance = state['balance']
+            trade_amount = min(balance * self.base_trade_ratio * multiplier, balance * self.max_cash_use)
+            if trade_amount <= self.min_trade_amount or balance <= trade_amount:
+                return
+            coin_ratio = holdings[coin] * price / total_value if total_value > 0 else 0
+            if coin_ratio > self.max_coin_ratio:
+                return
+            fee = trade_amount * self.fee_rate
+            amount = (trade_amount - fee) / price
+            holdings[coin] += amount
+            state['balance'] -= trade_amount
+            self._record(state, date, 'BUY', coin, amount, price, trade_amount, fee, confidence, verbose)
+
+        elif signal == 'SELL' and holdings[coin] > 0:
+            sell_ratio = confidence if confidence > 0.6 else 0.3
+            amount = holdings[coin] * sell_ratio
+            value = amount * price
+            if value <= self.min_trade_amount:
+                return
+            fee = value * self.fee_rate
+            holdings[coin] -= amount
+            state['balance'] += value - fee
+            self._record(state, date, 'SELL', coin, amount, price, value, fee, confidence, verbose)
+
+    @staticmethod
+    def _record(state, date, side, coin, amount, price, value, fee, confidence, verbose):
+        state['trades'].append({
+            'date': date,
+            'type': side,
+            'coin': coin,
+            'amount': amount,
+            'price': price,
+            'value': value,
+            'fee': fee,
+            'confidence': confidence
+        })
+        if verbose:
+            icon = '💰' if side == 'BUY' else '💸'
+            print(f"    {icon} {date} {coin} {'매수' if side == 'BUY' else '매도'}: {amount:.6f}개 "
+                  f"(가격: {price:,.0f}원, 금액: {value:,.0f}원) | 현금: {state['balance']:,.0f}원")
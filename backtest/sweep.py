@@ -0,0 +1,267 @@
+"""
+병렬 파라미터 탐색
+- config.json 키(점 표기 경로, 예: "trading.stop_loss_percent") 단위 그리드 / 랜덤 탐색 공간
+- 캔들 / 사전 계산 신호 배열은 공유 메모리로 1회 게시 → 워커는 복사/피클링 없이 읽기 (후보마다 설정 변경분만 전달)
+- ProcessPoolExecutor로 전 코어 병렬 백테스트 → 수익률 / 최대 낙폭 / 샤프 순위표 저장 (전체 성과 지표 포함)
+"""
+
+import os
+import copy
+import time
+import contextlib
+import random
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from data.candle_store import SharedCandleStore, share_candles, share_arrays, attach_arrays, release_shared
+from backtest.strategy import SignalStrategy
+from backtest.vectorized import VectorizedBacktest, vectorized_arrays
+from backtest.metrics import performance_report
+
+
+def apply_overrides(config, overrides):
+    """
+    설정 사본에 변경분 적용
+
+    Args:
+        config: 기준 설정 dict
+        overrides: {"section.key": 값} (점 표기 경로)
+
+    Returns:
+        dict: 변경분이 반영된 설정 사본
+    """
+    config = copy.deepcopy(config)
+    for path, value in overrides.items():
+        *parents, key = path.split('.')
+        node = config
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return config
+
+
+def _range_values(spec):
+    """범위 지정 {"min", "max", "steps"} → 균등 간격 값 목록 (정수 범위는 정수)"""
+    values = np.linspace(spec['min'], spec['max'], spec.get('steps', 5))
+    if isinstance(spec['min'], int) and isinstance(spec['max'], int):
+        return sorted(set(int(round(v)) for v in values))
+    return [round(float(v), 6) for v in values]
+
+
+def grid_space(space):
+    """
+    그리드 탐색 후보 (전체 조합)
+
+    Args:
+        space: {"section.key": [값, ...] 또는 {"min", "max", "steps"}}
+
+    Returns:
+        list: [{"section.key": 값, ...}, ...]
+    """
+    keys = [key for key in space if not key.startswith('_')]
+    axes = [space[key] if isinstance(space[key], list) else _range_values(space[key]) for key in keys]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*axes)]
+
+
+def random_space(space, samples=100, seed=None):
+    """
+    랜덤 탐색 후보 (목록은 균등 선택, 범위는 균등 분포 - 정수 범위는 정수, "log": true면 로그 균등)
+
+    Returns:
+        list: 중복 제거된 후보 최대 samples개
+    """
+    rng = random.Random(seed)
+    keys = [key for key in space if not key.startswith('_')]
+    candidates, seen = [], set()
+    for _ in range(samples * 10):
+        if len(candidates) >= samples:
+            break
+        candidate = {}
+        for key in keys:
+            spec = space[key]
+            if isinstance(spec, list):
+                candidate[key] = rng.choice(spec)
+            elif isinstance(spec['min'], int) and isinstance(spec['max'], int):
+                candidate[key] = rng.randint(spec['min'], spec['max'])
+            elif spec.get('log'):
+                candidate[key] = round(float(np.exp(rng.uniform(np.log(spec['min']), np.log(spec['max'])))), 6)
+            else:
+                candidate[key] = round(rng.uniform(spec['min'], spec['max']), 6)
+        signature = tuple(candidate.items())
+        if signature not in seen:
+            seen.add(signature)
+            candidates.append(candidate)
+    return candidates
+
+
+def rank_results(rows):
+    """
+    순위표 정렬 - 수익률(높을수록) / 최대 낙폭(낮을수록) / 샤프(높을수록) 순위 평균
+
+    Returns:
+        DataFrame: rank 열 포함, 평균 순위 오름차순
+    """
+    table = pd.DataFrame(rows)
+    if table.empty or 'total_return' not in table:
+        return table
+    valid = table['total_return'].notna()
+    table.loc[valid, 'rank_return'] = table.loc[valid, 'total_return'].rank(ascending=False)
+    table.loc[valid, 'rank_drawdown'] = table.loc[valid, 'max_drawdown'].rank(ascending=True)
+    table.loc[valid, 'rank_sharpe'] = table.loc[valid, 'sharpe'].rank(ascending=False)
+    table['rank'] = table[['rank_return', 'rank_drawdown', 'rank_sharpe']].mean(axis=1)
+    return table.sort_values(['rank', 'total_return'], ascending=[True, False], na_position='last').reset_index(drop=True)
+
+
+# 워커 프로세스 상태 (초기화 시 1회 구성)
+_WORKER = {}
+
+
+def _init_worker(handles, array_handles, evaluate, base_config, days):
+    arrays, blocks = attach_arrays(array_handles)
+    _WORKER.clear()
+    _WORKER.update(store=SharedCandleStore(handles), arrays=arrays, blocks=blocks,
+                   evaluate=evaluate, base_config=base_config, days=days)
+
+
+def _run_candidate(key, overrides, days=None, end=None, detail=False):
+    started = time.perf_counter()
+    row = {'id': key, **overrides}
+    try:
+        config = apply_overrides(_WORKER['base_config'], overrides)
+        results = _WORKER['evaluate'](_WORKER['store'], config, days or _WORKER['days'], end)
+        if results:
+            row.update(performance_report(results))
+            if detail:
+                row.update(initial_balance=results['initial_balance'], daily_balance=results['daily_balance'])
+        else:
+            row['error'] = '데이터 부족'
+    except Exception as e:
+        row['error'] = str(e)
+    row['elapsed'] = time.perf_counter() - started
+    return row
+
+
+def evaluate_vectorized(store, config, days, end=None):
+    """
+    신호 전략 벡터화 백테스트 평가 (전 기간 신호 배열을 종료 시점까지 잘라 사용 - 후보마다 상태 루프만 실행)
+
+    Args:
+        store: CandleStore / SharedCandleStore
+        config: 후보 설정
+        days: 백테스트 일수
+        end: 종료 시점 (None이면 저장된 마지막 캔들)
+    """
+    tickers = config['coins']['list']
+    lookback = config['technical_analysis']['data_period_days']
+    engine = VectorizedBacktest(store, tickers, SignalStrategy.from_config(config), lookback=lookback)
+
+    # 공유 메모리 신호 배열 (코인 목록이 같을 때) → 없으면 워커별 1회 계산
+    cache = _WORKER.setdefault('signals', {})
+    key = tuple(tickers)
+    if key not in cache:
+        shared = _WORKER.get('arrays')
+        if shared and shared['tickers'].tolist() == list(tickers):
+            cache[key] = shared
+        else:
+            cache[key] = vectorized_arrays(store, tickers)
+    arrays = cache[key]
+    if arrays is None:
+        return None
+
+    ts = arrays['ts']
+    stop = len(ts) if end is None else int(np.searchsorted(ts, pd.Timestamp(end).value // 10**9, side='right'))
+    first = max(lookback - 1, stop - days)
+    if first >= stop:
+        return None
+    market = {'coins': arrays['coins'].tolist(), 'ts': ts[:stop], 'close': arrays['close'][:, :stop]}
+    return engine.simulate(market, first, arrays['signal'][:, :stop], arrays['confidence'][:, :stop],
+                           config.get('backtest', {}).get('initial_balance', 1000000))
+
+
+class ParameterSweep:
+    """공유 메모리 캔들 + 프로세스 풀 병렬 파라미터 탐색"""
+
+    def __init__(self, store, tickers, evaluate, base_config, days, intervals=('day',), workers=None, arrays=None):
+        """
+        Args:
+            store: CandleStore (게시 대상 캔들 원본)
+            tickers: 공유할 티커 목록
+            evaluate: 최상위 함수 (store, config, days, end) → 백테스트 결과 dict (워커로 피클링)
+            base_config: 기준 설정 (config.json)
+            days: 백테스트 일수
+            intervals: 공유할 캔들 주기
+            workers: 프로세스 수 (None/0이면 CPU 코어 수)
+            arrays: 함께 게시할 사전 계산 배열 {이름: ndarray} (vectorized_arrays 결과 등)
+        """
+        self.store = store
+        self.tickers = tickers
+        self.evaluate = evaluate
+        self.base_config = base_config
+        self.days = days
+        self.intervals = intervals
+        self.workers = workers or os.cpu_count()
+        self.arrays = arrays or {}
+
+    @contextlib.contextmanager
+    def pool(self):
+        """캔들 / 배열 공유 메모리 게시 + 워커 풀 (종료 시 블록 해제)"""
+        handles, blocks = share_candles(self.store, self.tickers, self.intervals)
+        array_handles, array_blocks = share_arrays(self.arrays)
+        blocks += array_blocks
+        shared_mb = sum(block.size for block in blocks) / 1024 ** 2
+        print(f"🧵 프로세스 {self.workers}개 | 공유 캔들 {len(handles)}개 + 배열 {len(array_handles)}개 ({shared_mb:.1f}MB)")
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(handles, array_handles, self.evaluate,
+                                               self.base_config, self.days)) as executor:
+                yield executor
+        finally:
+            release_shared(blocks)
+
+    @staticmethod
+    def collect(executor, tasks, label="평가"):
+        """
+        작업 병렬 실행 + 진행 출력
+
+        Args:
+            executor: pool()이 반환한 실행기
+            tasks: [(키, 변경분, 일수, 종료 시점, 상세 여부), ...] (뒤쪽 인자는 생략 가능)
+            label: 진행 출력 이름
+
+        Returns:
+            list: 완료 순 결과 행
+        """
+        started = time.perf_counter()
+        futures = [executor.submit(_run_candidate, *task) for task in tasks]
+        step = max(1, len(futures) // 10)
+        rows = []
+        for done, future in enumerate(as_completed(futures), 1):
+            rows.append(future.result())
+            if done % step == 0 or done == len(futures):
+                print(f"  ⏳ {label} {done}/{len(futures)} 완료 ({time.perf_counter() - started:.0f}초)")
+        return rows
+
+    def run(self, candidates, output=None):
+        """
+        후보 전체 병렬 평가
+
+        Args:
+            candidates: [{"section.key": 값}, ...] (grid_space / random_space)
+            output: 순위표 CSV 경로 (None이면 저장 안 함)
+
+        Returns:
+            DataFrame: 순위표 (rank_results)
+        """
+        started = time.perf_counter()
+        print(f"🔎 파라미터 탐색: 후보 {len(candidates)}개")
+        with self.pool() as executor:
+            rows = self.collect(executor, list(enumerate(candidates)))
+
+        table = rank_results(rows)
+        if output:
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            table.to_csv(output, index=False, encoding='utf-8-sig')
+            print(f"💾 순위표 저장: {output}")
+        print(f"✅ 탐색 완료: {len(rows)}개 후보 | {time.perf_counter() - started:.1f}초")
+        return table
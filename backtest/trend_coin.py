@@ -0,0 +1,421 @@
+"""
+신규/트렌드 코인 전략 전 종목 백테스트 (execute_new_coin_trades 재현)
+- 전 KRW 마켓 1시간 캔들을 일 경계 정렬 공통 격자(코인 × 시각)로 구성 → 시점별 당일 누적 거래대금 / 변동률 순위 복원
+  (거래대금 상위 30 → 변동률 상위 5, 변동률 -30 ~ +50%, 거래대금 10억+, 호가 깊이 대용: 1시간 거래대금 × 비율)
+- 과거 뉴스 재현 불가 → 실거래 뉴스 없음 경로(기술적 분석 RSI(6) / 거래량 급증 판정)를 전 종목 배열로 계산
+- 최대 보유 10개, 손절 -5% / 1차 +10% 70% / 2차 +15% 전량 익절은 ExitRules + 장중 고가/저가 체결
+- 기본은 단일 구간 실행 (실행 환경과 무관한 결정적 결과) + 코인별 집계
+- segments 지정 시 날짜 구간 프로세스 풀 병렬 실행 (캔들 격자는 공유 메모리) → 구간 자산 곡선 연결 (경계 정산 근사)
+"""
+
+import os
+import time
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from backtest.engine import HistoricalBacktest
+from backtest.replay import candle_start
+from backtest.intraday import ExitRules, resolve_exits
+from backtest.metrics import trade_arrays, round_trip_pnl
+from data.candle_store import INTERVAL_SECONDS, share_arrays, attach_arrays, release_shared
+
+UNIVERSE_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'value')
+
+
+def universe_arrays(store, tickers, interval='minute60'):
+    """
+    전 종목 캔들 → 일 경계(09:00 KST) 정렬 공통 격자 배열 (거래 없는 시각 / 상장 전후는 NaN)
+
+    Returns:
+        dict: {'tickers', 'ts', 'first', 'last' (코인별 첫/마지막 캔들 격자 인덱스), 'open', ..., 'value'}
+              (데이터 없으면 None)
+    """
+    seconds = INTERVAL_SECONDS[interval]
+    records = {ticker: store.load(ticker, interval) for ticker in tickers}
+    records = {ticker: r for ticker, r in records.items() if len(r)}
+    if not records:
+        return None
+
+    start = candle_start(min(int(r['ts'][0]) for r in records.values()), 86400)
+    end = candle_start(max(int(r['ts'][-1]) for r in records.values()), 86400) + 86400
+    length = (end - start) // seconds
+    arrays = {
+        'tickers': np.array(list(records)),
+        'ts': start + seconds * np.arange(length, dtype=np.int64),
+        'first': np.empty(len(records), dtype=np.int64),
+        'last': np.empty(len(records), dtype=np.int64)
+    }
+    for field in UNIVERSE_FIELDS:
+        arrays[field] = np.full((len(records), length), np.nan)
+    for c, r in enumerate(records.values()):
+        index = (np.asarray(r['ts'], dtype=np.int64) - start) // seconds
+        arrays['first'][c], arrays['last'][c] = index[0], index[-1]
+        for field in UNIVERSE_FIELDS:
+            arrays[field][c, index] = r[field]
+    return arrays
+
+
+def forward_fill(values):
+    """시간 축(마지막 축) 직전 값 채우기 (첫 값 이전은 NaN 유지)"""
+    index = np.where(np.isnan(values), 0, np.arange(values.shape[-1]))
+    np.maximum.accumulate(index, axis=-1, out=index)
+    return np.take_along_axis(values, index, axis=-1)
+
+
+def trend_scan(arrays, lo, hi, per_day, scan_step, params):
+    """
+    [lo, hi) 구간 시점별 트렌드 코인 후보 (get_top_trend_coins + 기술적 분석 판정을 코인 × 시점 배열로 계산)
+
+    당일 일봉은 시점까지의 1시간 캔들 누적 (거래대금 = 현재가 × 당일 누적 거래량, 변동률 = 전일 종가 대비).
+    기술적 분석은 전일까지 6개 일봉 + 당일 진행 일봉 (RSI 6일 평균, 거래량 = 이전 6일 평균 대비).
+
+    Args:
+        arrays: universe_arrays 결과 (lo, hi는 일 경계 격자 인덱스)
+        per_day: 하루 캔들 수
+        scan_step: 탐색 간격 (캔들 수)
+        params: 필터 설정 dict (TrendCoinBacktest.params)
+
+    Returns:
+        dict: {'index': 탐색 시점 격자 인덱스, 'top': (n × 시점) 후보 코인 인덱스 (없으면 -1),
+               'allow': (코인 × 시점) 기술적 분석 매수 허용, 'blocked': 시점별 급락장 매수 중단,
+               'price': (코인 × 시점) 현재가, 'close': (코인 × 구간) 평가용 종가 (상장폐지 후 마지막 체결가 유지)}
+    """
+    warmup = min(lo, 7 * per_day)
+    start = lo - warmup
+    coins = len(arrays['tickers'])
+    days = (hi - start) // per_day
+
+    last_close = forward_fill(arrays['close'][:, start:hi])
+    grid = np.arange(start, hi)
+    listed = (grid >= arrays['first'][:, None]) & (grid <= arrays['last'][:, None])
+    close = np.where(listed, last_close, np.nan)
+
+    daily_close = close.reshape(coins, days, per_day)[:, :, -1]
+    volume = np.nan_to_num(arrays['volume'][:, start:hi]).reshape(coins, days, per_day)
+    daily_volume = volume.sum(axis=2)
+    day_volume = volume.cumsum(axis=2).reshape(coins, -1)
+
+    # 탐색 시점 (구간 내 일 경계 이후, 시점 캔들 마감 기준)
+    index = np.arange(lo, hi, scan_step)
+    column = index - start
+    day = column // per_day
+    price = close[:, column]
+    previous = np.where(day >= 1, daily_close[:, np.maximum(day - 1, 0)], np.nan)
+    trade_value = price * day_volume[:, column]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (price / previous - 1) * 100
+    depth = np.nan_to_num(arrays['value'][:, index]) * params['depth_ratio']
+
+    eligible = ((trade_value >= params['min_trade_value']) & (depth >= params['min_orderbook_depth']) &
+                (change >= params['change_range'][0]) & (change <= params['change_range'][1]))
+
+    # 1단계: 거래대금 상위 top_value → 2단계: 그 중 변동률 상위 top_n
+    ranked_value = np.where(eligible, trade_value, -np.inf)
+    by_value = np.argsort(-ranked_value, axis=0, kind='stable')[:params['top_value']]
+    ranked_change = np.where(np.take_along_axis(eligible, by_value, axis=0),
+                             np.take_along_axis(change, by_value, axis=0), -np.inf)
+    order = np.argsort(-ranked_change, axis=0, kind='stable')[:params['top_n']]
+    top = np.take_along_axis(by_value, order, axis=0)
+    top = np.where(np.take_along_axis(ranked_change, order, axis=0) > -np.inf, top, -1)
+
+    # 기술적 분석 (일봉 7개 미만이면 분석 실패 → 실거래와 같이 위험 키워드 없음으로 매수 진행)
+    gains = np.maximum(np.diff(daily_close, axis=1), 0)
+    losses = np.maximum(-np.diff(daily_close, axis=1), 0)
+    gains = np.concatenate([np.zeros((coins, 1)), np.nancumsum(gains, axis=1)], axis=1)
+    losses = np.concatenate([np.zeros((coins, 1)), np.nancumsum(losses, axis=1)], axis=1)
+    volumes = np.concatenate([np.zeros((coins, 1)), daily_volume.cumsum(axis=1)], axis=1)
+    back = np.maximum(day - 6, 0)
+    today = price - previous
+    gain = (gains[:, np.maximum(day - 1, 0)] - gains[:, back] + np.maximum(today, 0)) / 6
+    loss = (losses[:, np.maximum(day - 1, 0)] - losses[:, back] + np.maximum(-today, 0)) / 6
+    average_volume = (volumes[:, day] - volumes[:, np.maximum(day - 6, 0)]) / 6
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + gain / loss)
+        spike = np.where(average_volume > 0, (day_volume[:, column] / average_volume - 1) * 100, 0)
+    analyzed = (day >= 6) & ~np.isnan(np.where(day >= 6, daily_close[:, np.maximum(day - 6, 0)], np.nan))
+    # 안전(RSI<40 + 거래량 50%↑) / 주의(RSI<35 + 30%↑) / 과매수(RSI>80, 차단 키워드 없음) / 신호 부족 재확인(RSI<45 또는 40%↑)
+    allow = ~analyzed | (rsi < 45) | (spike > 40) | (rsi > 80)
+
+    # 급락장 방어: 포트폴리오 코인 평균 변동률 이하 시 신규 매수 중단
+    blocked = np.zeros(len(index), dtype=bool)
+    portfolio = params['portfolio_index']
+    if len(portfolio):
+        values = change[portfolio]
+        counts = (~np.isnan(values)).sum(axis=0)
+        average_change = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0)
+        blocked = average_change <= params['market_block_change']
+
+    return {'index': index, 'top': top, 'allow': allow, 'blocked': blocked, 'price': price,
+            'close': last_close[:, warmup:]}
+
+
+def simulate_range(arrays, lo, hi, per_day, params, rules, initial_balance):
+    """
+    [lo, hi) 구간 트렌드 코인 매매 (구간 시작 전액 현금, 구간 끝 미청산 포지션은 평가금액)
+
+    포지션 청산 경로는 현금/슬롯과 무관 → 매수 시점에 resolve_exits로 구간 끝까지 체결을 미리 계산하고
+    체결 시각에 현금 / 보유 슬롯 반영 (탐색 시점은 해당 캔들 청산 처리 후 마감가 매수).
+
+    Returns:
+        dict: HistoricalBacktest 결과 형식 (daily_balance: 일 마감 자산)
+    """
+    started = time.time()
+    scan_step = max(1, params['scan_step'])
+    scan = trend_scan(arrays, lo, hi, per_day, scan_step, params)
+    tickers = arrays['tickers']
+    ts = arrays['ts']
+    fee_rate = params['fee_rate']
+    portfolio = set(params['portfolio_index'].tolist())
+
+    cash = float(initial_balance)
+    held = {}  # 코인 인덱스 → 남은 수량
+    pending = []  # (격자 인덱스, 순번, 코인, 수량, 대금) 청산 체결 대기
+    cash_events, positions, trades = [], [], []
+    top = scan['top'].T.tolist()
+    blocked = scan['blocked'].tolist()
+
+    for j, t in enumerate(scan['index'].tolist()):
+        while pending and pending[0][0] <= t:
+            _, _, c, quantity, proceeds = heapq.heappop(pending)
+            cash += proceeds
+            held[c] -= quantity
+            if held[c] <= 1e-12:
+                del held[c]
+        if blocked[j] or len(held) >= params['max_holdings']:
+            continue
+        candidates = [c for c in top[j] if c >= 0]
+        if not candidates:
+            continue
+
+        max_invest = cash * params['invest_ratio'] / len(candidates)
+        for c in candidates:
+            if len(held) >= params['max_holdings']:
+                break
+            if c in portfolio or c in held or not scan['allow'][c, j]:
+                continue
+            price = float(scan['price'][c, j])
+            trade_amount = max(max_invest, params['min_trade_amount'])
+            if cash < trade_amount:
+                continue
+            fee = trade_amount * fee_rate
+            quantity = (trade_amount - fee) / price
+            cash -= trade_amount
+            held[c] = quantity
+            cash_events.append((t, -trade_amount))
+            coin = tickers[c].split('-')[1]
+            trades.append((t, len(trades), {'date': str(np.datetime64(int(ts[t]), 's')), 'type': 'BUY', 'coin': coin,
+                                            'amount': quantity, 'price': price, 'value': trade_amount, 'fee': fee,
+                                            'reason': 'trend_entry'}))
+
+            bars = {field: arrays[field][c] for field in ('open', 'high', 'low')}
+            position = {'quantity': quantity, 'avg_price': price, 'stage': 0}
+            fills = resolve_exits(bars, t + 1, hi, position, rules)
+            for fill in fills:
+                value = fill['quantity'] * fill['price']
+                proceeds = value - value * fee_rate
+                heapq.heappush(pending, (fill['index'], len(trades), c, fill['quantity'], proceeds))
+                cash_events.append((fill['index'], proceeds))
+                trades.append((fill['index'], len(trades), {
+                    'date': str(np.datetime64(int(ts[fill['index']]), 's')), 'type': 'SELL', 'coin': coin,
+                    'amount': fill['quantity'], 'price': fill['price'], 'value': value, 'fee': value * fee_rate,
+                    'reason': fill['reason']}))
+            positions.append((c, t, quantity, [(f['index'], f['quantity']) for f in fills]))
+
+    # 일 마감 자산 (현금 이벤트 누적 + 포지션 수량 × 직전 종가)
+    samples = np.arange(lo + per_day - 1, hi, per_day)
+    events = sorted(cash_events)
+    at = np.array([e[0] for e in events], dtype=np.int64)
+    flows = np.cumsum([0.0] + [e[1] for e in events])
+    cash_curve = float(initial_balance) + flows[np.searchsorted(at, samples, side='right')]
+    value_curve = np.zeros(len(samples))
+    holdings = {}
+    for c, t, quantity, fills in positions:
+        sold = np.cumsum([0.0] + [q for _, q in fills])
+        remaining = quantity - sold[np.searchsorted([i for i, _ in fills], samples, side='right')]
+        prices = np.nan_to_num(scan['close'][c, samples - lo])
+        value_curve += np.where(samples >= t, remaining * prices, 0)
+        if quantity - sold[-1] > 1e-12:
+            coin = tickers[c].split('-')[1]
+            holdings[coin] = holdings.get(coin, 0.0) + quantity - sold[-1]
+
+    dates = ts[samples - per_day + 1].astype('datetime64[s]').astype('datetime64[D]').astype(str).tolist()
+    daily_balance = [{'date': d, 'balance': float(b), 'cash': float(k)}
+                     for d, b, k in zip(dates, cash_curve + value_curve, cash_curve)]
+    state = {'trades': [trade for _, _, trade in sorted(trades, key=lambda x: (x[0], x[1]))], 'holdings': holdings}
+    return HistoricalBacktest._results(initial_balance, state, daily_balance, started)
+
+
+def coin_summary(trades):
+    """
+    코인별 성과 (매수 횟수, 청산 사유별 횟수, FIFO 실현 손익 / 승률)
+
+    Returns:
+        DataFrame: 코인별 행, 실현 손익 내림차순
+    """
+    if not trades:
+        return pd.DataFrame()
+    arrays = trade_arrays(trades)
+    pnl, basis = round_trip_pnl(arrays)
+    frame = pd.DataFrame({'coin': arrays['coin'], 'buy': arrays['buy'], 'cash': arrays['cash'],
+                          'reason': [t.get('reason', t['type']) for t in trades]})
+    sells = frame[~frame['buy']].assign(pnl=pnl, basis=basis)
+
+    table = frame[frame['buy']].groupby('coin').agg(entries=('cash', 'size'), invested=('cash', 'sum'))
+    table = table.join(pd.crosstab(sells['coin'], sells['reason']), how='outer')
+    grouped = sells.groupby('coin')
+    table['realized_pnl'] = grouped['pnl'].sum()
+    table['win_rate'] = grouped['pnl'].apply(lambda p: float((p > 0).mean() * 100))
+    table['return'] = table['realized_pnl'] / grouped['basis'].sum() * 100
+    table = table.fillna(0)
+    return table.sort_values('realized_pnl', ascending=False).reset_index()
+
+
+# 워커 프로세스 상태 (초기화 시 1회 구성)
+_WORKER = {}
+
+
+def _init_worker(handles, settings):
+    arrays, blocks = attach_arrays(handles)
+    _WORKER.clear()
+    _WORKER.update(settings, arrays=arrays, blocks=blocks)
+
+
+def _simulate_chunk(lo, hi):
+    return simulate_range(_WORKER['arrays'], lo, hi, _WORKER['per_day'], _WORKER['params'],
+                          _WORKER['rules'], _WORKER['initial_balance'])
+
+
+class TrendCoinBacktest:
+    """신규/트렌드 코인 전략 전 종목 백테스트 (날짜 구간 프로세스 풀 병렬)"""
+
+    def __init__(self, store, tickers, portfolio_coins=(), exit_rules=None, invest_ratio=0.15,
+                 min_trade_amount=25000, max_holdings=10, top_value=30, top_n=5, min_trade_value=1_000_000_000,
+                 min_orderbook_depth=5_000_000, depth_ratio=0.02, change_range=(-30, 50), market_block_change=-5,
+                 scan_hours=1, fee_rate=0.0005, interval='minute60', workers=None):
+        """
+        Args:
+            store: CandleStore (전 종목 장중 캔들)
+            tickers: 백테스트 유니버스 (KRW 마켓 티커 전체)
+            portfolio_coins: 포트폴리오 코인 (순위에는 포함, 매수 제외, 급락장 판단 기준)
+            exit_rules: ExitRules (None이면 ExitRules.trend_coin())
+            invest_ratio: 탐색 1회 투자 비중 (현금 × 비중 / 후보 수, 실거래 trend_coin_ratio)
+            min_trade_amount: 최소 투자금 (trendcoin_trader.MIN_TRADE_AMOUNT)
+            max_holdings: 최대 보유 코인 수 (trendcoin_trader.MAX_NEW_COIN_HOLDINGS)
+            top_value, top_n: 거래대금 상위 / 변동률 상위 개수
+            min_trade_value: 최소 당일 거래대금
+            min_orderbook_depth: 최소 호가 깊이 (1시간 거래대금 × depth_ratio로 대체)
+            depth_ratio: 호가 깊이 대용 비율 (backtest.event_depth_ratio와 같은 가정)
+            change_range: 허용 변동률 범위 (%)
+            market_block_change: 포트폴리오 평균 변동률이 이하이면 신규 매수 중단 (%)
+            scan_hours: 탐색 간격 (캔들 수 - 1시간 캔들 기준 시간)
+            fee_rate: 거래 수수료율
+            interval: 캔들 주기
+            workers: 프로세스 수 (None/0이면 CPU 코어 수)
+        """
+        self.store = store
+        self.tickers = list(tickers)
+        self.portfolio_coins = list(portfolio_coins)
+        self.exit_rules = exit_rules or ExitRules.trend_coin()
+        self.interval = interval
+        self.workers = workers or os.cpu_count()
+        self.params = {
+            'invest_ratio': invest_ratio,
+            'min_trade_amount': min_trade_amount,
+            'max_holdings': max_holdings,
+            'top_value': top_value,
+            'top_n': top_n,
+            'min_trade_value': min_trade_value,
+            'min_orderbook_depth': min_orderbook_depth,
+            'depth_ratio': depth_ratio,
+            'change_range': tuple(change_range),
+            'market_block_change': market_block_change,
+            'scan_step': scan_hours * 3600 // INTERVAL_SECONDS[interval],
+            'fee_rate': fee_rate
+        }
+
+    @classmethod
+    def from_config(cls, store, tickers, config, portfolio_coins=()):
+        """config.json trend_backtest 섹션 + 실거래 신규코인 상수로 생성"""
+        from trading import trendcoin_trader as trader
+        section = config.get('trend_backtest', {})
+        return cls(
+            store, tickers, portfolio_coins,
+            exit_rules=ExitRules.trend_coin(),
+            invest_ratio=config.get('coins', {}).get('trend_coin_ratio', 0.15),
+            min_trade_amount=trader.MIN_TRADE_AMOUNT,
+            max_holdings=trader.MAX_NEW_COIN_HOLDINGS,
+            top_value=section.get('top_value', 30),
+            top_n=section.get('top_n', 5),
+            min_trade_value=section.get('min_trade_value', 1_000_000_000),
+            min_orderbook_depth=section.get('min_orderbook_depth', 5_000_000),
+            depth_ratio=config.get('backtest', {}).get('event_depth_ratio', 0.02),
+            change_range=(section.get('min_change', -30), section.get('max_change', 50)),
+            market_block_change=section.get('market_block_change', -5),
+            scan_hours=section.get('scan_hours', 1),
+            fee_rate=config.get('backtest', {}).get('fee_rate', 0.0005),
+            workers=section.get('workers')
+        )
+
+    def run(self, days, initial_balance=1000000, segments=None):
+        """
+        백테스트 실행 (최근 days일을 segments개 날짜 구간으로 나눠 병렬 실행 → 자산 곡선 연결)
+
+        Args:
+            days: 백테스트 일수 (순위 복원용 여유 7일은 데이터에서 추가 사용)
+            initial_balance: 초기 자본
+            segments: 날짜 구간 수 (None/0이면 1 = 경계 정산 없는 단일 구간, 결과가 실행 환경과 무관)
+                      2 이상은 구간 끝 포지션을 평가금액으로 넘기는 근사 (구간 수에 따라 결과가 달라짐)
+
+        Returns:
+            dict: HistoricalBacktest 결과 형식 + {'coins': 코인별 DataFrame, 'universe', 'segments',
+                  'simulated_days'} (데이터 부족 시 None)
+        """
+        started = time.time()
+        arrays = universe_arrays(self.store, self.tickers, self.interval)
+        if arrays is None:
+            return None
+        per_day = 86400 // INTERVAL_SECONDS[self.interval]
+        total_days = len(arrays['ts']) // per_day
+        days = min(days, total_days - 7)
+        if days <= 0:
+            return None
+
+        coins = [ticker.split('-')[1] for ticker in arrays['tickers']]
+        params = dict(self.params, portfolio_index=np.array(
+            [c for c, ticker in enumerate(arrays['tickers']) if ticker in self.portfolio_coins], dtype=np.int64))
+        segments = max(1, min(segments or 1, days))
+        bounds = np.linspace(total_days - days, total_days, segments + 1).round().astype(int) * per_day
+        ranges = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+        print(f"🔥 트렌드 코인 백테스트: 유니버스 {len(coins)}개 | {days}일 ({self.interval}) | "
+              f"구간 {len(ranges)}개 | 프로세스 {min(self.workers, len(ranges))}개")
+
+        if len(ranges) == 1:
+            parts = [simulate_range(arrays, *ranges[0], per_day, params, self.exit_rules, initial_balance)]
+        else:
+            handles, blocks = share_arrays(arrays)
+            settings = {'per_day': per_day, 'params': params, 'rules': self.exit_rules,
+                        'initial_balance': initial_balance}
+            try:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges)), initializer=_init_worker,
+                                         initargs=(handles, settings)) as executor:
+                    parts = list(executor.map(_simulate_chunk, *zip(*ranges)))
+            finally:
+                release_shared(blocks)
+
+        # 구간 연결: 다음 구간은 직전 구간 마감 자산으로 재시작 (거래 금액도 같은 배율로 환산)
+        daily_balance, trades, capital = [], [], float(initial_balance)
+        for part in parts:
+            scale = capital / initial_balance
+            daily_balance += [dict(day, balance=day['balance'] * scale, cash=day['cash'] * scale)
+                              for day in part['daily_balance']]
+            trades += [dict(t, amount=t['amount'] * scale, value=t['value'] * scale, fee=t['fee'] * scale)
+                       for t in part['trades']]
+            capital = daily_balance[-1]['balance'] if daily_balance else capital
+
+        state = {'trades': trades, 'holdings': parts[-1]['holdings']}
+        results = HistoricalBacktest._results(initial_balance, state, daily_balance, started)
+        results.update({'coins': coin_summary(trades), 'universe': len(coins), 'segments': len(ranges),
+                        'simulated_days': days})
+        print(f"✅ 트렌드 코인 백테스트 완료: {results['elapsed']:.1f}초 (거래 {len(trades)}건)")
+        return results
@@ -0,0 +1,183 @@
+"""
+벡터화 백테스트
+- 티커별 지표 시계열을 전체 기간에 대해 1회 계산 (RSI 14, MA5/MA20, 볼린저 20/2σ)
+- 전 기간 신호/신뢰도를 배열 연산으로 산출 (score_indicators와 동일 점수 규칙)
+- 포트폴리오 상태만 일별 루프로 갱신 → 비용 O(일수)
+"""
+
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from backtest.engine import HistoricalBacktest, align_candles, ts_to_date
+from backtest.indicators import RSI_PERIOD, BB_PERIOD, BB_STD
+from backtest.strategy import coin_thresholds
+
+
+SIGNAL_NAMES = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+
+
+def rolling_mean(values, window):
+    """마지막 축 기준 이동평균 (앞쪽 window-1개는 NaN)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        cumsum = np.cumsum(values, axis=-1)
+        cumsum = np.concatenate([np.zeros(values.shape[:-1] + (1,)), cumsum], axis=-1)
+        out[..., window - 1:] = (cumsum[..., window:] - cumsum[..., :-window]) / window
+    return out
+
+
+def rolling_std(values, window):
+    """마지막 축 기준 이동 표준편차 (ddof=1)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = sliding_window_view(values, window, axis=-1).std(axis=-1, ddof=1)
+    return out
+
+
+def indicator_arrays(close):
+    """
+    전체 기간 지표 배열 (코인 × 기간, 결측 처리는 indicator_snapshot과 동일)
+
+    Args:
+        close: 종가 행렬 (코인 × 기간)
+
+    Returns:
+        dict: {'rsi', 'ma5', 'ma20', 'bb_upper', 'bb_lower'} 배열
+    """
+    deltas = np.diff(close, axis=-1)
+    gain = rolling_mean(np.clip(deltas, 0, None), RSI_PERIOD)
+    loss = rolling_mean(np.clip(-deltas, 0, None), RSI_PERIOD)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+    rsi = np.where(np.isnan(gain), 50.0, rsi)
+    rsi = np.concatenate([np.full(close.shape[:-1] + (1,), 50.0), rsi], axis=-1)
+
+    ma5 = rolling_mean(close, 5)
+    ma20 = rolling_mean(close, 20)
+    bb_ma = rolling_mean(close, BB_PERIOD)
+    bb_std = rolling_std(close, BB_PERIOD)
+
+    return {
+        'rsi': rsi,
+        'ma5': np.where(np.isnan(ma5), close, ma5),
+        'ma20': np.where(np.isnan(ma20), close, ma20),
+        'bb_upper': np.where(np.isnan(bb_ma), close * 1.02, bb_ma + bb_std * BB_STD),
+        'bb_lower': np.where(np.isnan(bb_ma), close * 0.98, bb_ma - bb_std * BB_STD)
+    }
+
+
+def score_arrays(close, indicators, threshold_buy, threshold_sell):
+    """
+    전 기간 신호 점수 (score_indicators 벡터화)
+
+    Args:
+        close: 종가 배열
+        indicators: indicator_arrays 결과 (같은 형태)
+        threshold_buy, threshold_sell: 신호 점수 기준 (스칼라 또는 코인별 열 벡터)
+
+    Returns:
+        tuple: (signal 배열 - 1 매수 / -1 매도 / 0 관망, confidence 배열)
+    """
+    rsi, ma5, ma20 = indicators['rsi'], indicators['ma5'], indicators['ma20']
+
+    buy = np.select([rsi < 25, rsi < 35, rsi < 40], [3, 2, 1], 0)
+    sell = np.select([rsi < 40, rsi > 75, rsi > 65, rsi > 60], [0, 3, 2, 1], 0)
+
+    buy = buy + (close > ma5) + (ma5 > ma20)
+    sell = sell + (close < ma5) + (ma5 < ma20)
+
+    near_lower = close <= indicators['bb_lower'] * 1.02
+    buy = buy + near_lower
+    sell = sell + (~near_lower & (close >= indicators['bb_upper'] * 0.98))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change = np.where(ma20 != 0, (close - ma20) / ma20 * 100, 0)
+    buy = buy + (price_change < -3)
+    sell = sell + (price_change > 3)
+
+    is_buy = buy >= threshold_buy
+    is_sell = ~is_buy & (sell >= threshold_sell)
+    signal = np.where(is_buy, 1, np.where(is_sell, -1, 0))
+    confidence = np.where(is_buy, np.minimum(0.85, 0.65 + buy * 0.05),
+                          np.where(is_sell, np.minimum(0.85, 0.65 + sell * 0.05), 0.5))
+    return signal, confidence
+
+
+def signal_arrays(coins, close):
+    """코인별 기준을 적용한 전 기간 신호/신뢰도 (코인 × 기간)"""
+    thresholds = np.array([coin_thresholds(coin) for coin in coins], dtype=float)
+    return score_arrays(close, indicator_arrays(close), thresholds[:, :1], thresholds[:, 1:])
+
+
+def vectorized_arrays(store, tickers, interval='day'):
+    """
+    전체 기간 정렬 캔들 + 신호 배열 (지표는 과거 데이터만 사용 → 임의 종료 시점으로 잘라 재사용 가능)
+
+    Returns:
+        dict: {'tickers', 'coins', 'ts', 'close', 'signal', 'confidence'} 배열 (데이터 없으면 None)
+    """
+    market = align_candles(store, tickers, interval)
+    if market is None:
+        return None
+    signal, confidence = signal_arrays(market['coins'], market['close'])
+    return {
+        'tickers': np.array(tickers),
+        'coins': np.array(market['coins']),
+        'ts': market['ts'],
+        'close': market['close'],
+        'signal': signal.astype(np.int8),
+        'confidence': confidence
+    }
+
+
+class VectorizedBacktest(HistoricalBacktest):
+    """지표/신호 사전 계산 + 상태 루프만 실행하는 백테스트 (lookback ≥ 21이면 HistoricalBacktest와 결과 동일)"""
+
+    def run(self, days, initial_balance=1000000, end=None, verbose=False, market=None):
+        """
+        백테스트 실행
+
+        Args:
+            days: 백테스트 일수
+            initial_balance: 초기 자본
+            end: 종료 시점
+            verbose: 거래 출력 여부
+            market: 이미 정렬된 캔들 (align_candles 결과, 재사용 시 저장소 로드 생략)
+        """
+        started = time.time()
+        if market is None:
+            market, first = self.load(days, end)
+            if market is None:
+                return None
+        else:
+            first = max(self.lookback - 1, len(market['ts']) - days)
+
+        coins = market['coins']
+        close = market['close']
+        signal, confidence = signal_arrays(coins, close)
+        return self.simulate(market, first, signal, confidence, initial_balance, verbose, started)
+
+    def simulate(self, market, first, signal, confidence, initial_balance, verbose=False, started=None):
+        """사전 계산된 신호로 포트폴리오 상태 루프 실행"""
+        started = started or time.time()
+        coins = market['coins']
+        close = market['close']
+        state = {'balance': float(initial_balance), 'holdings': {coin: 0.0 for coin in coins}, 'trades': []}
+        holdings = state['holdings']
+        daily_balance = []
+        strategy = self.strategy
+
+        active = signal[:, first:] != 0
+        for i in range(first, close.shape[1]):
+            prices = close[:, i].tolist()
+            date = ts_to_date(market['ts'][i])
+            total_value = state['balance'] + sum(holdings[c] * p for c, p in zip(coins, prices))
+            if active[:, i - first].any():
+                for c, coin in enumerate(coins):
+                    if signal[c, i]:
+                        strategy.apply(state, date, coin, SIGNAL_NAMES[int(signal[c, i])], float(confidence[c, i]),
+                                       prices[c], total_value, verbose)
+            equity = state['balance'] + sum(holdings[c] * p for c, p in zip(coins, prices))
+            daily_balance.append({'date': date, 'balance': equity, 'cash': state['balance']})
+
+        return self._results(initial_balance, state, daily_balance, started)
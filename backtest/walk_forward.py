@@ -0,0 +1,221 @@
+"""
+워크포워드 최적화
+- 학습/검증 구간을 이력 전체에 걸쳐 굴리며 학습 구간 최적 설정 선택 → 바로 뒤 검증 구간(표본 외)에서 평가
+- 검증 구간 자산 곡선을 이어 붙인 표본 외 성과로 설정 변경 효과 판단 (현재 설정 기준선 동시 평가)
+- 전 구간 학습/검증 평가를 ParameterSweep 프로세스 풀로 병렬 실행 (캔들 / 신호 배열 공유 메모리)
+"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from backtest.engine import ts_to_date
+from backtest.replay import candle_start
+from backtest.sweep import ParameterSweep, rank_results
+from backtest.metrics import performance_report
+from data.candle_store import INTERVAL_SECONDS
+
+
+def data_range(store, tickers, interval='day'):
+    """
+    티커 공통 캔들 기간 (시작 캔들 시각, 마지막 완성 일 경계)
+
+    Returns:
+        tuple: (start_ts, end_ts) - 데이터 없는 티커가 있으면 (None, None)
+    """
+    firsts, lasts = [], []
+    for ticker in tickers:
+        ts = store.load(ticker, interval)['ts']
+        if not len(ts):
+            return None, None
+        firsts.append(int(ts[0]))
+        lasts.append(int(ts[-1]) + INTERVAL_SECONDS[interval])
+    return max(firsts), candle_start(min(lasts), 86400)
+
+
+def walk_forward_windows(start_ts, end_ts, train_days, test_days, step_days=None, count=None):
+    """
+    학습/검증 구간 목록 (마지막 검증 구간이 데이터 끝에 맞도록 뒤에서부터 배치)
+
+    Args:
+        start_ts, end_ts: 사용 가능 기간 (KST 기준 epoch 초, 지표 여유분 제외한 시작)
+        train_days: 학습 구간 일수
+        test_days: 검증 구간 일수
+        step_days: 구간 이동 간격 (None이면 test_days - 검증 구간이 겹치지 않음)
+        count: 최대 구간 수 (None이면 기간 전체)
+
+    Returns:
+        list: [{'train_start', 'test_start', 'test_end'}, ...] 시간 순
+    """
+    step = (step_days or test_days) * 86400
+    windows = []
+    test_end = end_ts
+    while count is None or len(windows) < count:
+        test_start = test_end - test_days * 86400
+        train_start = test_start - train_days * 86400
+        if train_start < start_ts:
+            break
+        windows.append({'train_start': train_start, 'test_start': test_start, 'test_end': test_end})
+        test_end -= step
+    return windows[::-1]
+
+
+def boundary_end(ts):
+    """구간 경계 → 평가 함수 종료 시점 (경계 시각 캔들 제외)"""
+    return str(np.datetime64(int(ts) - 1, 's'))
+
+
+def stitch_equity(segments):
+    """
+    검증 구간 자산 곡선 연결 (각 구간은 초기 자본에서 재시작 → 직전 구간 마감 자산 기준으로 환산)
+
+    Args:
+        segments: [(initial_balance, daily_balance), ...] 시간 순
+
+    Returns:
+        list: [{'date', 'balance'}]
+    """
+    curve = []
+    capital = None
+    for initial_balance, daily_balance in segments:
+        if not daily_balance:
+            continue
+        capital = capital or initial_balance
+        scale = capital / initial_balance
+        curve += [{'date': day['date'], 'balance': day['balance'] * scale} for day in daily_balance]
+        capital = curve[-1]['balance']
+    return curve
+
+
+def curve_summary(curve, initial_balance, trades=0):
+    """연결 자산 곡선 → 성과 지표 (performance_report, 거래 수는 구간 합계)"""
+    report = performance_report({'initial_balance': initial_balance, 'daily_balance': curve,
+                                 'equity': [day['balance'] for day in curve]})
+    report['trades'] = trades
+    return report
+
+
+class WalkForward(ParameterSweep):
+    """구간별 학습(파라미터 탐색) → 표본 외 검증 병렬 파이프라인"""
+
+    def __init__(self, store, tickers, evaluate, base_config, train_days, test_days, step_days=None,
+                 intervals=('day',), workers=None, arrays=None, warmup_days=30):
+        """
+        Args:
+            store, tickers, evaluate, base_config, intervals, workers, arrays: ParameterSweep 참조
+            train_days: 학습 구간 일수
+            test_days: 검증 구간 일수
+            step_days: 구간 이동 간격 (None이면 test_days)
+            warmup_days: 데이터 시작 후 지표 계산 여유 일수 (학습 구간 시작 하한)
+        """
+        super().__init__(store, tickers, evaluate, base_config, train_days, intervals, workers, arrays)
+        self.train_days = train_days
+        self.test_days = test_days
+        self.step_days = step_days
+        self.warmup_days = warmup_days
+
+    def windows(self, count=None, tickers=None):
+        """데이터 기간 기준 학습/검증 구간 (tickers: 기간 산정 티커, None이면 공유 티커 전체)"""
+        start_ts, end_ts = data_range(self.store, tickers or self.tickers, self.intervals[0])
+        if start_ts is None:
+            return []
+        return walk_forward_windows(start_ts + self.warmup_days * 86400, end_ts,
+                                    self.train_days, self.test_days, self.step_days, count)
+
+    def run(self, candidates, windows, output_dir=None):
+        """
+        워크포워드 실행
+
+        Args:
+            candidates: 학습 구간 탐색 후보 [{"section.key": 값}, ...]
+            windows: windows() 결과
+            output_dir: 구간표 / 표본 외 자산 곡선 CSV 저장 경로 (None이면 저장 안 함)
+
+        Returns:
+            dict: {'windows': 구간표 DataFrame, 'equity': 표본 외 자산 곡선 DataFrame,
+                   'optimized' / 'baseline': 표본 외 요약, 'efficiency': 표본 외 / 표본 내 평균 수익률 비,
+                   'latest': 마지막 학습 구간 최적 변경분} (구간 없으면 None)
+        """
+        if not windows:
+            print("❌ 워크포워드 구간 없음 (데이터 기간 부족)")
+            return None
+        started = time.perf_counter()
+        print(f"🚶 워크포워드: 구간 {len(windows)}개 (학습 {self.train_days}일 / 검증 {self.test_days}일) | "
+              f"후보 {len(candidates)}개")
+
+        with self.pool() as executor:
+            # 1단계: 전 구간 × 전 후보 학습 평가
+            train_tasks = [((w, c), overrides, self.train_days, boundary_end(window['test_start']))
+                           for w, window in enumerate(windows) for c, overrides in enumerate(candidates)]
+            train_rows = self.collect(executor, train_tasks, "학습")
+
+            best = []
+            for w in range(len(windows)):
+                table = rank_results([row for row in train_rows if row['id'][0] == w])
+                valid = table[table['total_return'].notna()] if 'total_return' in table else table.iloc[:0]
+                best.append(valid.iloc[0].to_dict() if len(valid) else None)
+
+            # 2단계: 구간별 최적 설정 + 현재 설정(기준선) 표본 외 평가
+            test_tasks = []
+            for w, window in enumerate(windows):
+                end = boundary_end(window['test_end'])
+                if best[w] is not None:
+                    overrides = candidates[best[w]['id'][1]]
+                    test_tasks.append((('optimized', w), overrides, self.test_days, end, True))
+                test_tasks.append((('baseline', w), {}, self.test_days, end, True))
+            test_rows = {row['id']: row for row in self.collect(executor, test_tasks, "검증")}
+
+        rows, segments = [], {'optimized': [], 'baseline': []}
+        for w, window in enumerate(windows):
+            row = {
+                'window': w,
+                'train_start': ts_to_date(window['train_start']),
+                'test_start': ts_to_date(window['test_start']),
+                'test_end': ts_to_date(window['test_end'] - 86400)
+            }
+            if best[w] is not None:
+                row.update(candidates[best[w]['id'][1]])
+                row['train_return'] = best[w]['total_return']
+            for name in ('optimized', 'baseline'):
+                result = test_rows.get((name, w))
+                if result is None or 'daily_balance' not in result:
+                    continue
+                row[f'{name}_return'] = result['total_return']
+                row[f'{name}_drawdown'] = result['max_drawdown']
+                row[f'{name}_trades'] = result['trades']
+                segments[name].append((result['initial_balance'], result['daily_balance']))
+            rows.append(row)
+        table = pd.DataFrame(rows)
+
+        initial_balance = self.base_config.get('backtest', {}).get('initial_balance', 1000000)
+        curves = {name: stitch_equity(segments[name]) for name in segments}
+        equity = pd.DataFrame({name: pd.Series({d['date']: d['balance'] for d in curve})
+                               for name, curve in curves.items()})
+        equity.index.name = 'date'
+        summaries = {name: curve_summary(curves[name], initial_balance,
+                                         int(table.get(f'{name}_trades', pd.Series(dtype=float)).sum()))
+                     for name in curves}
+
+        # 표본 외 / 표본 내 평균 수익률 비 (1에 가까울수록 과최적화 적음)
+        efficiency = None
+        if 'train_return' in table and 'optimized_return' in table:
+            in_sample = (table['train_return'] / self.train_days).mean()
+            out_sample = (table['optimized_return'] / self.test_days).mean()
+            efficiency = float(out_sample / in_sample) if in_sample else None
+
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            stamp = time.strftime('%Y%m%d_%H%M%S')
+            table.to_csv(os.path.join(output_dir, f"walkforward_windows_{stamp}.csv"), index=False, encoding='utf-8-sig')
+            equity.to_csv(os.path.join(output_dir, f"walkforward_equity_{stamp}.csv"), encoding='utf-8-sig')
+            print(f"💾 워크포워드 결과 저장: {output_dir}/walkforward_*_{stamp}.csv")
+        print(f"✅ 워크포워드 완료: {time.perf_counter() - started:.1f}초")
+
+        return {
+            'windows': table,
+            'equity': equity,
+            'optimized': summaries['optimized'],
+            'baseline': summaries['baseline'],
+            'efficiency': efficiency,
+            'latest': candidates[best[-1]['id'][1]] if best[-1] is not None else None
+        }
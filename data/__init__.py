@@ -4,6 +4,7 @@
 
 from .market_data import get_portfolio_data, calculate_rsi, get_fear_greed_index
 from .news_collector import get_news_headlines, get_free_crypto_news, analyze_news_sentiment
+from .candle_store import CandleStore, SharedCandleStore, share_candles, share_arrays, attach_arrays, release_shared
 
 __all__ = [
     'get_portfolio_data',
@@ -12,4 +13,10 @@ __all__ = [
     'get_news_headlines',
     'get_free_crypto_news',
     'analyze_news_sentiment',
+    'CandleStore',
+    'SharedCandleStore',
+    'share_candles',
+    'share_arrays',
+    'attach_arrays',
+    'release_shared',
 ]
@@ -0,0 +1,248 @@
+"""
+로컬 캔들 저장소 (백테스트용)
+- 티커/주기별 OHLCV를 NumPy 구조화 배열(.npy)로 저장
+- 메모리 맵으로 1회 로드 → 기간 슬라이스는 복사 없는 뷰
+- 네트워크 조회는 sync/ensure 호출 시에만 (백테스트 진행 중에는 조회 없음)
+- 병렬 백테스트용 공유 메모리 저장소 (워커 프로세스가 복사 없이 읽기 전용 접근)
+"""
+
+import os
+import logging
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import pyupbit
+
+
+# 캔들 레코드 형식 (ts = 캔들 시작 시각, KST 기준 epoch 초)
+CANDLE_DTYPE = np.dtype([
+    ('ts', 'i8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+    ('value', 'f8')
+])
+
+# 주기별 캔들 길이 (초)
+INTERVAL_SECONDS = {
+    'day': 86400,
+    'minute240': 14400,
+    'minute60': 3600,
+    'minute30': 1800,
+    'minute15': 900,
+    'minute5': 300,
+    'minute1': 60
+}
+
+
+def frame_to_records(df):
+    """pyupbit OHLCV DataFrame → 구조화 배열"""
+    records = np.empty(len(df), dtype=CANDLE_DTYPE)
+    records['ts'] = df.index.values.astype('datetime64[s]').astype('i8')
+    for field in CANDLE_DTYPE.names[1:]:
+        records[field] = df[field].to_numpy(dtype=float) if field in df.columns else 0.0
+    return records
+
+
+def records_to_frame(records):
+    """구조화 배열 → pyupbit 형식 DataFrame (DatetimeIndex)"""
+    index = pd.DatetimeIndex(records['ts'].astype('datetime64[s]'))
+    return pd.DataFrame({field: records[field] for field in CANDLE_DTYPE.names[1:]}, index=index)
+
+
+class CandleStore:
+    """티커/주기별 로컬 캔들 저장소"""
+
+    def __init__(self, root='candles'):
+        """
+        Args:
+            root: 저장 디렉터리 (티커별 {ticker}_{interval}.npy)
+        """
+        self.root = root
+        self._cache = {}
+
+    def path(self, ticker, interval):
+        return os.path.join(self.root, f"{ticker}_{interval}.npy")
+
+    def has(self, ticker, interval='day'):
+        return os.path.exists(self.path(ticker, interval))
+
+    def tickers(self, interval='day'):
+        """저장된 티커 목록 (해당 주기 파일 기준)"""
+        if not os.path.isdir(self.root):
+            return []
+        suffix = f"_{interval}.npy"
+        return sorted(name[:-len(suffix)] for name in os.listdir(self.root) if name.endswith(suffix))
+
+    def save(self, ticker, interval, records):
+        """기존 데이터와 병합(시각 기준 중복 제거, 신규 우선) 후 원자적 저장"""
+        os.makedirs(self.root, exist_ok=True)
+        if self.has(ticker, interval):
+            existing = np.load(self.path(ticker, interval))
+            records = np.concatenate([records, existing])
+        _, first = np.unique(records['ts'], return_index=True)
+        records = records[np.sort(first)]
+        records = records[np.argsort(records['ts'], kind='stable')]
+
+        tmp_path = self.path(ticker, interval) + '.tmp.npy'
+        np.save(tmp_path, records)
+        os.replace(tmp_path, self.path(ticker, interval))
+        self._cache.pop((ticker, interval), None)
+        return len(records)
+
+    def sync(self, ticker, interval='day', count=400):
+        """
+        최근 캔들 count개를 API에서 받아 저장 (pyupbit가 200개 단위로 분할 조회)
+
+        Returns:
+            int: 저장된 전체 캔들 수 (실패 시 0)
+        """
+        df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
+        if df is None or df.empty:
+            logging.warning(f"CANDLE_SYNC_FAILED - {ticker} {interval}")
+            return 0
+        total = self.save(ticker, interval, frame_to_records(df))
+        logging.info(f"CANDLE_SYNC - {ticker} {interval}: {len(df)}개 수신 (저장 {total}개)")
+        return total
+
+    def ensure(self, ticker, interval='day', count=400):
+        """
+        저장된 캔들이 count개 미만이면 동기화, 충분하지만 마지막 캔들이 한 주기 이상 지났으면 최근 구간만 추가 동기화
+
+        Returns:
+            bool: 캔들 사용 가능 여부 (최근 구간 갱신 실패 시 기존 캔들로 진행)
+        """
+        records = self.load(ticker, interval)
+        if len(records) < count:
+            return self.sync(ticker, interval, count) > 0
+
+        # ts는 KST 기준 epoch 초 → 현재 시각도 KST 벽시계 기준으로 비교
+        seconds = INTERVAL_SECONDS.get(interval, 86400)
+        now = pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None).value // 10**9
+        elapsed = now - int(records['ts'][-1])
+        if elapsed <= seconds:
+            return True
+        missing = int(elapsed // seconds) + 1  # 공백 구간 전체 + 진행 중이던 마지막 캔들 재수신
+        if self.sync(ticker, interval, missing) == 0:
+            logging.warning(f"CANDLE_TAIL_STALE - {ticker} {interval}: 최근 {missing}개 갱신 실패 (기존 캔들 사용)")
+        return True
+
+    def load(self, ticker, interval='day', start=None, end=None, mmap=True):
+        """
+        캔들 로드 (메모리 맵, 기간 슬라이스는 복사 없는 뷰)
+
+        Args:
+            ticker: 티커
+            interval: 주기
+            start, end: 기간 (datetime/문자열, end 포함)
+            mmap: 메모리 맵 사용 여부
+
+        Returns:
+            np.ndarray: CANDLE_DTYPE 구조화 배열 (없으면 빈 배열)
+        """
+        key = (ticker, interval)
+        records = self._cache.get(key)
+        if records is None:
+            if not self.has(ticker, interval):
+                return np.empty(0, dtype=CANDLE_DTYPE)
+            records = np.load(self.path(ticker, interval), mmap_mode='r' if mmap else None)
+            self._cache[key] = records
+
+        lo, hi = 0, len(records)
+        if start is not None:
+            lo = np.searchsorted(records['ts'], pd.Timestamp(start).value // 10**9, side='left')
+        if end is not None:
+            hi = np.searchsorted(records['ts'], pd.Timestamp(end).value // 10**9, side='right')
+        return records[lo:hi]
+
+    def load_frame(self, ticker, interval='day', start=None, end=None):
+        """캔들 로드 (pyupbit 형식 DataFrame)"""
+        return records_to_frame(self.load(ticker, interval, start, end))
+
+
+def share_arrays(arrays):
+    """
+    배열을 공유 메모리 블록으로 게시 (병렬 백테스트 워커 간 복사/피클링 없이 공유)
+
+    Args:
+        arrays: {키: np.ndarray}
+
+    Returns:
+        tuple: (handles {키: (블록 이름, shape, dtype)}, blocks [SharedMemory] - 사용 후 release_shared)
+    """
+    handles, blocks = {}, []
+    for key, array in arrays.items():
+        if not array.size:
+            continue
+        block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        handles[key] = (block.name, array.shape, array.dtype)
+        blocks.append(block)
+    return handles, blocks
+
+
+def attach_arrays(handles):
+    """
+    게시된 공유 메모리 배열 연결 (읽기 전용)
+
+    Returns:
+        tuple: ({키: np.ndarray}, blocks - 배열 사용 중 유지)
+    """
+    arrays, blocks = {}, []
+    for key, (name, shape, dtype) in handles.items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.flags.writeable = False
+        arrays[key] = array
+    return arrays, blocks
+
+
+def release_shared(blocks):
+    """게시한 공유 메모리 블록 해제"""
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def share_candles(store, tickers, intervals=('day',)):
+    """
+    캔들을 공유 메모리 블록으로 게시
+
+    Args:
+        store: CandleStore
+        tickers: 티커 목록
+        intervals: 주기 목록
+
+    Returns:
+        tuple: (handles {(ticker, interval): (블록 이름, shape, dtype)}, blocks)
+    """
+    return share_arrays({(ticker, interval): np.asarray(store.load(ticker, interval))
+                         for interval in intervals for ticker in tickers})
+
+
+class SharedCandleStore(CandleStore):
+    """공유 메모리 캔들 저장소 (워커용 읽기 전용, CandleStore.load 인터페이스 동일)"""
+
+    def __init__(self, handles):
+        """
+        Args:
+            handles: share_candles가 반환한 {(ticker, interval): (블록 이름, shape, dtype)}
+        """
+        super().__init__(root=None)
+        records, self._blocks = attach_arrays(handles)
+        self._cache.update(records)
+
+    def has(self, ticker, interval='day'):
+        return (ticker, interval) in self._cache
+
+    def tickers(self, interval='day'):
+        return sorted(ticker for ticker, i in self._cache if i == interval)
+
+    def save(self, ticker, interval, records):
+        raise RuntimeError("공유 메모리 캔들 저장소는 읽기 전용입니다")
+
+    def sync(self, ticker, interval='day', count=400):
+        return len(self._cache.get((ticker, interval), ()))
@@ -15,7 +15,7 @@ from openai import OpenAI
 import json
 import time
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
 import threading
 from utils.delisted_coins import is_delisted
@@ -27,6 +27,10 @@ from utils.delisted_coins import is_delisted
 # === 유틸리티 모듈 ===
 from utils.api_helpers import get_safe_orderbook, get_total_portfolio_value
 from utils.logger import log_decision
+from utils.ai_cost_ledger import ai_cost_ledger, CALL_SITE_PORTFOLIO
+from utils.slippage import max_notional_under_slippage
+from utils.emergency_stop import emergency_system
+from data.candle_store import CandleStore, INTERVAL_SECONDS
 
 # === 데이터 수집 모듈 ===
 from data.market_data import get_portfolio_data, calculate_rsi, get_fear_greed_index
@@ -35,7 +39,21 @@ from data.news_collector import get_news_headlines, get_free_crypto_news, analyz
 # === 분석 모듈 ===
 from analysis.portfolio_analyzer import analyze_multi_timeframe, calculate_trend_alignment, make_portfolio_summary
 from analysis.market_condition import analyze_market_condition, detect_bear_market
+from analysis.ai_prompt import build_portfolio_messages, get_prompt_version
+from analysis.signal_engine import TieredSignalEngine, generate_local_signals
+from analysis.risk_metrics import risk_position_multiplier
 from trading.trendcoin_trader import execute_new_coin_trades
+import trading.trendcoin_trader as trendcoin_trader
+from trading.execution_engine import OrderExecutionEngine
+from trading.resting_orders import RestingOrderManager
+from trading.order_planner import OrderPlanner
+from trading.order_slicer import SlicingExecutor
+from trading.paper_exchange import PaperExchange
+from trading.risk_engine import RiskEngine, PortfolioSnapshot
+from backtest import (HistoricalBacktest, VectorizedBacktest, SignalStrategy, EventDrivenBacktest, vectorized_arrays,
+                      ParameterSweep, grid_space, random_space, evaluate_vectorized, WalkForward,
+                      performance_report, save_report, append_reports_csv, MonteCarloBacktest,
+                      IntradayBacktest, ExitRules, TrendCoinBacktest)
 
 # ============================================================================
 # 전역 변수 및 상태 관리
@@ -139,6 +157,7 @@ BASE_TRADE_RATIO = CONFIG["trading"]["base_trade_ratio"]
 STOP_LOSS_PERCENT = CONFIG["trading"]["stop_loss_percent"]
 MIN_TRADE_AMOUNT = CONFIG["trading"]["min_trade_amount"]
 MAX_POSITION_MULTIPLIER = CONFIG["trading"]["max_position_multiplier"]
+MAX_SLIPPAGE = CONFIG["trading"].get("max_slippage", 0.005)
 RSI_OVERSOLD = CONFIG["technical_analysis"]["rsi_oversold"]
 RSI_OVERBOUGHT = CONFIG["technical_analysis"]["rsi_overbought"]
 FEAR_GREED_EXTREME_FEAR = CONFIG["market_conditions"]["fear_greed_extreme_fear"]
@@ -177,81 +196,39 @@ LAST_MARKET_SUMMARY = None
 # AI 신호 생성 함수
 # ============================================================================
 
-def get_portfolio_ai_signals(portfolio_summary, max_retries=3):
-    """포트폴리오 기반 AI 신호 시스템 - Rate Limiting 포함"""
+def get_portfolio_ai_signals(portfolio_summary, max_retries=3, default_on_failure=True):
+    """포트폴리오 기반 AI 신호 시스템 - Rate Limiting 포함
+    
+    default_on_failure=False면 모든 재시도 실패 시 None 반환 (계층형 신호 엔진이 로컬 모델로 대체)
+    """
     client = OpenAI()
     
-    # 개선된 포트폴리오 전용 프롬프트 - 뉴스/이벤트 반영 + 리스크 관리 강화
-    prompt = (
-        "You're a cryptocurrency portfolio trading AI expert managing a diversified portfolio of BTC, ETH, SOL, and XRP. "
-        "Your strategy focuses on: "
-        "1. Event-driven analysis with real-time news sentiment integration "
-        "2. Multi-timeframe technical analysis with adaptive market regime recognition "
-        "3. Enhanced momentum trading with volatility-adjusted position sizing "
-        "4. Dynamic correlation analysis and intelligent diversification "
-        "5. Explicit risk management with stop-loss and take-profit guidance "
-        "\n"
-        "🚨 CRITICAL: Analyze news headlines for market-moving events with severity weighting: "
-        "- Regulatory developments (SEC/government approvals, bans, lawsuits, legal clarity) "
-        "- Institutional adoption (ETF flows, corporate treasury adds, whale movements) "
-        "- Technical/security events (network upgrades, hacks, outages) "
-        "- Macro catalysts (Fed policy, inflation data, geopolitical tensions) "
-        "\n"
-        "For each coin, provide comprehensive analysis: "
-        "- Signal: STRONG_BUY, BUY, HOLD, SELL, EMERGENCY_SELL "
-        "- Confidence: 0.0-1.0 (weight news impact + technical confluence) "
-        "- Reasoning: Combine news sentiment + technical analysis + market context "
-        "- Stop_Loss: Suggested downside risk protection (percentage) "
-        "- Take_Profit: Suggested profit-taking level (percentage) "
-        "- Recommended_Size: Allocation ratio based on signal confidence and volatility "
-        "\n"
-        f"Enhanced Guidelines: "
-        f"📊 Technical Analysis - TREND FIRST STRATEGY: "
-        f"- RSI < {RSI_OVERSOLD}: Strong oversold (BUY if no negative news) "
-        f"- RSI 70~85 + strong_bullish_alignment: HOLD or BUY (trend > RSI indicator, ride the wave!) "
-        f"- RSI > 85 + weak trend: SELL (extreme overbought, take profits) "
-        f"- RSI > {RSI_OVERBOUGHT} + bearish trend: SELL (momentum reversal) "
-        f"- Multi-timeframe alignment: Confirm day/4hr/1hr trend direction "
-        f"- Volume validation: >150% average confirms breakouts/breakdowns "
-        f"� Trend Priority Rules (CRITICAL): "
-        f"- strong_bullish_alignment + RSI 70-85: Ignore RSI, recommend HOLD or BUY (강한 상승 추세는 RSI 무시) "
-        f"- strong_bullish_alignment + price surge >5%: Consider BUY even at high RSI (추세 지속 포착) "
-        f"- BTC/ETH major coins: Prefer HOLD during uptrends (주요 코인은 상승장에서 보유 우선) "
-        f"- weak/mixed signals + RSI >70: SELL cautiously (약한 추세만 RSI 우선) "
-        f"�📰 News Sentiment Integration: "
-        f"- Positive regulatory/institutional news: Increase BUY confidence +0.2 "
-        f"- Negative regulatory/security news: Increase SELL confidence +0.3 "
-        f"- Major partnerships/upgrades: Boost STRONG_BUY signals "
-        f"📈 Market Psychology: "
-        f"- Fear & Greed < {FEAR_GREED_EXTREME_FEAR}: Contrarian opportunity (if no bad news) "
-        f"- Fear & Greed > {FEAR_GREED_EXTREME_GREED}: Distribution zone (take profits only if trend weakens) "
-        f"- High market correlation (>0.8): Reduce diversification assumptions "
-        f"⚡ Enhanced Signals: "
-        f"- EMERGENCY_SELL: Major hacks, severe regulatory crackdowns, 15%+ drops with bad news "
-        f"- STRONG_BUY: ETF approvals + oversold + volume surge + positive news confluence "
-        f"- BUY: Strong uptrend + RSI 70-85 + volume surge (상승 추세 지속) "
-        f"- HOLD: Strong uptrend + RSI >70 but <85 (추세 지속 중 보유) "
-        f"- Adapt to volatility: High vol = smaller positions but faster reactions "
-        f"- If any coin allocation exceeds {MAX_SINGLE_COIN_RATIO:.0%}, recommend SELL or HOLD to rebalance portfolio "
-        "\n"
-        "Please provide analysis in JSON format with enhanced reasoning and risk management: "
-        "{"
-        "  \"BTC\": {\"signal\": \"STRONG_BUY\", \"confidence\": 0.9, \"reason\": \"ETF inflow surge + RSI(25) oversold + bullish MA cross + institutional FOMO\", \"stop_loss\": -0.05, \"take_profit\": 0.12, \"recommended_size\": 0.25}, "
-        "  \"ETH\": {\"signal\": \"HOLD\", \"confidence\": 0.6, \"reason\": \"Neutral technicals, awaiting staking rewards clarity\", \"stop_loss\": -0.03, \"take_profit\": 0.08, \"recommended_size\": 0.25}, "
-        "  \"SOL\": {\"signal\": \"BUY\", \"confidence\": 0.8, \"reason\": \"Ecosystem growth + volume breakout + oversold bounce\", \"stop_loss\": -0.04, \"take_profit\": 0.1, \"recommended_size\": 0.3}, "
-        "  \"XRP\": {\"signal\": \"SELL\", \"confidence\": 0.7, \"reason\": \"Regulatory uncertainty + overbought RSI(75) + distribution pattern\", \"stop_loss\": -0.02, \"take_profit\": 0.07, \"recommended_size\": 0.2}"
-        "}"
-    )
+    # 정적 프리픽스 + 임계값/시장 데이터 서픽스 (프롬프트 캐싱 최적화)
+    thresholds = {
+        "rsi_oversold": RSI_OVERSOLD,
+        "rsi_overbought": RSI_OVERBOUGHT,
+        "fear_greed_extreme_fear": FEAR_GREED_EXTREME_FEAR,
+        "fear_greed_extreme_greed": FEAR_GREED_EXTREME_GREED,
+        "max_single_coin_ratio": MAX_SINGLE_COIN_RATIO
+    }
+    messages = build_portfolio_messages(portfolio_summary, thresholds)
+    prompt_version = get_prompt_version(thresholds)
+    
+    # 일일 AI 예산 초과 시 호출 생략
+    if ai_cost_ledger.is_over_budget(CALL_SITE_PORTFOLIO):
+        print(f"💸 일일 AI 예산 초과 ({ai_cost_ledger.get_daily_cost():,.0f}원) - AI 호출 생략")
+        logging.warning(f"AI_BUDGET_EXCEEDED - {CALL_SITE_PORTFOLIO}: {ai_cost_ledger.get_daily_cost():,.0f}원")
+        if not default_on_failure:
+            return None
+        return {coin: {"signal": "HOLD", "confidence": 0.5, "reason": "AI budget exceeded - default hold"}
+                for coin in portfolio_summary.get('coins', {})}
     
     # Rate Limiting과 재시도 로직
     for attempt in range(max_retries):
         try:
             response = client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": json.dumps(portfolio_summary)}
-                ],
+                messages=messages,
                 response_format={"type": "json_object"},
                 temperature=0.3,  # 더 일관된 신호를 위해 낮춤
                 max_tokens=800
@@ -262,10 +239,13 @@ def get_portfolio_ai_signals(portfolio_summary, max_retries=3):
             
             # AI 사용량 및 비용 계산 (GPT-4o-mini 요금)
             tokens_used = response.usage.total_tokens
-            cost_usd = (response.usage.prompt_tokens * 0.00015 + response.usage.completion_tokens * 0.0006) / 1000
-            cost_krw = cost_usd * 1300  # 대략적인 환율
+            cached_tokens = getattr(getattr(response.usage, 'prompt_tokens_details', None), 'cached_tokens', 0) or 0
+            # 비용 원장 기록 (캐시 적중 입력 토큰 할인 반영)
+            cost = ai_cost_ledger.record_usage(CALL_SITE_PORTFOLIO, "gpt-4o-mini", response.usage)
+            cost_usd = cost['cost_usd']
+            cost_krw = cost['cost_krw']
             
-            print(f"  토큰 사용량: {tokens_used:,}개")
+            print(f"  토큰 사용량: {tokens_used:,}개 (캐시 적중: {cached_tokens:,}개, 프롬프트 v{prompt_version})")
             print(f"  비용: ${cost_usd:.4f} (약 {cost_krw:.0f}원)")
             
             # AI 신호별 상세 로깅
@@ -273,6 +253,8 @@ def get_portfolio_ai_signals(portfolio_summary, max_retries=3):
                 'tokens_used': tokens_used,
                 'cost_usd': cost_usd,
                 'cost_krw': cost_krw,
+                'cached_tokens': cached_tokens,
+                'prompt_version': prompt_version,
                 'model': 'gpt-4o-mini'
             }
             
@@ -312,6 +294,9 @@ def get_portfolio_ai_signals(portfolio_summary, max_retries=3):
                 print(f"⏰ 5초 후 재시도...")
                 time.sleep(5)
             else:
+                if not default_on_failure:
+                    print(f"❌ 모든 재시도 실패")
+                    return None
                 print(f"❌ 모든 재시도 실패, 기본값 사용")
                 # 오류 시 안전한 기본값 반환
                 default_signals = {}
@@ -324,340 +309,24 @@ def get_portfolio_ai_signals(portfolio_summary, max_retries=3):
 # 리스크 관리 함수
 # ============================================================================
 
-def check_cash_shortage_rebalance(upbit, min_cash_ratio=None):
-    """현금 부족 시 자동 리밸런싱 - 15% 미만 시 수익 코인 우선 매도"""
-    if min_cash_ratio is None:
-        min_cash_ratio = 0.15  # 최소 15% 현금 유지 (위험 구간)
-    
-    try:
-        krw_balance = upbit.get_balance("KRW")
-        total_portfolio_value = krw_balance
-        coin_data = []
-        
-        # 전체 포트폴리오 가치 및 수익률 계산
-        for ticker in PORTFOLIO_COINS:
-            coin = ticker.split('-')[1]
-            balance = upbit.get_balance(ticker)
-            if balance > 0:
-                # ✨ 헬퍼 함수 사용: 안전한 호가 조회
-                orderbook = get_safe_orderbook(ticker)
-                if not orderbook:
-                    continue
-                current_price = orderbook['orderbook_units'][0]['bid_price']
-                avg_buy_price = upbit.get_avg_buy_price(ticker)
-                coin_value = balance * current_price
-                total_portfolio_value += coin_value
-                
-                # 수익률 계산
-                profit_percent = 0
-                if avg_buy_price > 0:
-                    profit_percent = ((current_price - avg_buy_price) / avg_buy_price) * 100
-                
-                coin_data.append({
-                    'coin': coin,
-                    'ticker': ticker,
-                    'balance': balance,
-                    'current_price': current_price,
-                    'value': coin_value,
-                    'profit_percent': profit_percent,
-                    'avg_buy_price': avg_buy_price
-                })
-        
-        # 현금 비율 체크
-        cash_ratio = krw_balance / total_portfolio_value if total_portfolio_value > 0 else 0
-        
-        if cash_ratio < min_cash_ratio:  # 현금이 15% 미만일 때 (위험 구간)
-            target_cash_ratio = 0.20  # 20% 목표로 복구
-            print(f"🚨 현금 위험 수준 감지! 현재 {cash_ratio:.1%} → 목표 {target_cash_ratio:.0%}")
-            print("💸 긴급 리밸런싱 실행...")
-            
-            # 필요한 현금 금액 계산
-            needed_cash = (total_portfolio_value * target_cash_ratio) - krw_balance
-            
-            # 수익 나는 코인부터 매도 (수익률 높은 순)
-            profitable_coins = [c for c in coin_data if c['profit_percent'] > 2]  # 2% 이상 수익
-            profitable_coins.sort(key=lambda x: x['profit_percent'], reverse=True)
-            
-            if profitable_coins:
-                # 가장 수익률 높은 코인 매도
-                target_coin = profitable_coins[0]
-                sell_amount = min(needed_cash / target_coin['current_price'], target_coin['balance'] * 0.5)
-                
-                if sell_amount * target_coin['current_price'] >= MIN_TRADE_AMOUNT:
-                    result = upbit.sell_market_order(target_coin['ticker'], sell_amount)
-                    if result:
-                        sell_value = sell_amount * target_coin['current_price']
-                        print(f"  ✅ {target_coin['coin']} 수익실현 매도")
-                        print(f"     수익률: {target_coin['profit_percent']:+.1f}% | 금액: {sell_value:,.0f}원")
-                        print(f"     예상 현금 비중: {cash_ratio:.1%} → {target_cash_ratio:.0%}")
-                        logging.info(f"CASH_REBALANCE - {target_coin['coin']}: {cash_ratio:.1%} → {target_cash_ratio:.0%} (수익실현: {sell_value:,.0f}원)")
-                        return True
-            else:
-                # 수익 코인이 없으면 가장 비중 높은 코인 일부 매도
-                coin_data.sort(key=lambda x: x['value'], reverse=True)
-                if coin_data:
-                    target_coin = coin_data[0]
-                    sell_amount = min(needed_cash / target_coin['current_price'], target_coin['balance'] * 0.3)
-                    
-                    if sell_amount * target_coin['current_price'] >= MIN_TRADE_AMOUNT:
-                        result = upbit.sell_market_order(target_coin['ticker'], sell_amount)
-                        if result:
-                            sell_value = sell_amount * target_coin['current_price']
-                            print(f"  ⚠️ {target_coin['coin']} 현금확보 매도")
-                            print(f"     수익률: {target_coin['profit_percent']:+.1f}% | 금액: {sell_value:,.0f}원")
-                            print(f"     예상 현금 비중: {cash_ratio:.1%} → {target_cash_ratio:.0%}")
-                            logging.info(f"CASH_REBALANCE - {target_coin['coin']}: {cash_ratio:.1%} → {target_cash_ratio:.0%} (현금확보: {sell_value:,.0f}원)")
-                            return True
-                    
-        return False
-        
-    except Exception as e:
-        print(f"❌ 현금 부족 체크 오류: {e}")
-        return False
-
-def check_portfolio_concentration_limits(upbit, max_single_position=None):
-    """포트폴리오 집중도 제한 체크 - 28% 초과 시 자동 매도 (악순환 방지 강화)"""
-    if max_single_position is None:
-        max_single_position = MAX_SINGLE_COIN_RATIO  # 28% 사용
-    
-    global last_rebalance_time  # 쿨다운 시간 기록
-    rebalancing_cooldown = CONFIG.get('safety', {}).get('rebalancing_cooldown_hours', 2) * 3600  # 2시간
-    
-    try:
-        krw_balance = upbit.get_balance("KRW")
-        total_portfolio_value = krw_balance
-        coin_data = []
-        
-        # 포트폴리오 분석
-        for ticker in PORTFOLIO_COINS:
-            coin = ticker.split('-')[1]
-            balance = upbit.get_balance(ticker)
-            if balance > 0:
-                # ✨ 헬퍼 함수 사용: 안전한 호가 조회
-                orderbook = get_safe_orderbook(ticker)
-                if not orderbook:
-                    continue
-                current_price = orderbook['orderbook_units'][0]['bid_price']
-                coin_value = balance * current_price
-                total_portfolio_value += coin_value
-                coin_data.append({
-                    'coin': coin,
-                    'ticker': ticker,
-                    'balance': balance,
-                    'value': coin_value,
-                    'current_price': current_price
-                })
-        
-        # 비중 계산 및 초과 체크
-        for coin_info in coin_data:
-            coin_ratio = coin_info['value'] / total_portfolio_value if total_portfolio_value > 0 else 0
-            
-            # 🔴 리밸런싱 쿨다운 체크 (악순환 방지)
-            if coin_info['coin'] in last_rebalance_time:
-                time_since_rebalance = time.time() - last_rebalance_time[coin_info['coin']]
-                if time_since_rebalance < rebalancing_cooldown:
-                    hours_remaining = (rebalancing_cooldown - time_since_rebalance) / 3600
-                    print(f"⏰ {coin_info['coin']} 리밸런싱 쿨다운 중 (남은 시간: {hours_remaining:.1f}시간)")
-                    continue  # 쿨다운 중이면 리밸런싱 건너뜀
-            
-            # 28% 초과 시 25%로 조정
-            if coin_ratio > max_single_position:
-                target_ratio = 0.25  # 25% 목표 (안전 마진 3%)
-                print(f"⚖️ {coin_info['coin']} 비중 초과 감지: {coin_ratio:.1%} → {target_ratio:.0%} 목표")
-                
-                # 초과분 계산 (현재 - 목표)
-                excess_value = coin_info['value'] - (total_portfolio_value * target_ratio)
-                sell_amount = excess_value / coin_info['current_price']
-                
-                # 최소 거래량 체크 (5,000원 이상)
-                if excess_value >= MIN_TRADE_AMOUNT:
-                    result = upbit.sell_market_order(coin_info['ticker'], sell_amount)
-                    if result:
-                        print(f"  ✅ {coin_info['coin']} 집중도 리밸런싱 완료")
-                        print(f"     매도량: {sell_amount:.6f}개 | 금액: {excess_value:,.0f}원")
-                        print(f"     예상 비중: {coin_ratio:.1%} → {target_ratio:.0%}")
-                        logging.info(f"CONCENTRATION_REBALANCE - {coin_info['coin']}: {coin_ratio:.1%} → {target_ratio:.0%} (매도: {excess_value:,.0f}원)")
-                        
-                        # 🔴 리밸런싱 쿨다운 시간 기록 (악순환 방지)
-                        last_rebalance_time[coin_info['coin']] = time.time()
-                        print(f"  ⏰ {coin_info['coin']} 리밸런싱 쿨다운 시작 ({rebalancing_cooldown/3600:.0f}시간)")
-                        
-                        return True
-                else:
-                    print(f"  ⏸️ {coin_info['coin']} 초과분 {excess_value:,.0f}원 - 최소 거래금액 미만")
-        
-        return False
-        
-    except Exception as e:
-        print(f"❌ 포트폴리오 집중도 체크 오류: {e}")
-        logging.error(f"CONCENTRATION_CHECK_ERROR: {e}")
-        return False
-
-def check_portfolio_rebalancing(upbit, deviation_threshold=0.15):
-    """목표 비율 대비 편차가 클 때 리밸런싱 실행"""
-    try:
-        krw_balance = upbit.get_balance("KRW")
-        total_portfolio_value = krw_balance
-        current_allocation = {}
-        
-        # 현재 포트폴리오 비율 계산
-        for ticker in PORTFOLIO_COINS:
-            balance = upbit.get_balance(ticker)
-            if balance > 0:
-                # ✨ 헬퍼 함수 사용: 안전한 호가 조회
-                orderbook = get_safe_orderbook(ticker)
-                if not orderbook:
-                    current_allocation[ticker] = 0
-                    continue
-                current_price = orderbook['orderbook_units'][0]['bid_price']
-                coin_value = balance * current_price
-                total_portfolio_value += coin_value
-                current_allocation[ticker] = coin_value
-            else:
-                current_allocation[ticker] = 0
-        
-        if total_portfolio_value <= 0:
-            return False
-        
-        # 현재 비율을 백분율로 변환
-        for ticker in current_allocation:
-            current_allocation[ticker] = current_allocation[ticker] / total_portfolio_value
-        
-        # 목표 비율과 현재 비율 비교
-        rebalance_needed = False
-        rebalance_actions = []
-        
-        for ticker in PORTFOLIO_COINS:
-            current_ratio = current_allocation[ticker]
-            target_ratio = TARGET_ALLOCATION[ticker]
-            deviation = abs(current_ratio - target_ratio)
-            
-            if deviation > deviation_threshold:
-                rebalance_needed = True
-                coin = ticker.split('-')[1]
-                
-                if current_ratio > target_ratio:
-                    # 목표보다 많이 보유 -> 매도 필요
-                    excess_ratio = current_ratio - target_ratio
-                    rebalance_actions.append({
-                        'action': 'SELL',
-                        'ticker': ticker,
-                        'coin': coin,
-                        'current': f"{current_ratio:.1%}",
-                        'target': f"{target_ratio:.1%}",
-                        'excess': f"{excess_ratio:.1%}"
-                    })
-                else:
-                    # 목표보다 적게 보유 -> 매수 필요
-                    shortage_ratio = target_ratio - current_ratio
-                    rebalance_actions.append({
-                        'action': 'BUY',
-                        'ticker': ticker,
-                        'coin': coin,
-                        'current': f"{current_ratio:.1%}",
-                        'target': f"{target_ratio:.1%}",
-                        'shortage': f"{shortage_ratio:.1%}"
-                    })
-        
-        if rebalance_needed:
-            print(f"\n🔄 포트폴리오 리밸런싱 필요 (편차 {deviation_threshold:.0%} 초과)")
-            print("=" * 60)
-            
-            for action in rebalance_actions:
-                if action['action'] == 'SELL':
-                    print(f"📉 {action['coin']}: {action['current']} → {action['target']} (과보유 {action['excess']})")
-                else:
-                    print(f"📈 {action['coin']}: {action['current']} → {action['target']} (부족 {action['shortage']})")
-            
-            # 실제 리밸런싱 실행 (매도 먼저, 매수 나중)
-            sell_proceeds = 0
-            
-            # 1단계: 과보유 코인 매도
-            for action in rebalance_actions:
-                if action['action'] == 'SELL':
-                    ticker = action['ticker']
-                    current_balance = upbit.get_balance(ticker)
-                    
-                    if current_balance > 0:
-                        # 과보유 비율만큼 매도
-                        current_ratio = current_allocation[ticker]
-                        target_ratio = TARGET_ALLOCATION[ticker]
-                        sell_ratio = (current_ratio - target_ratio) / current_ratio
-                        sell_amount = current_balance * sell_ratio
-                        
-                        if sell_amount > 0:
-                            result = upbit.sell_market_order(ticker, sell_amount)
-                            if result:
-                                print(f"✅ {action['coin']} 리밸런싱 매도: {sell_amount:.6f}")
-                                sell_proceeds += sell_amount * pyupbit.get_orderbook(ticker=ticker)['orderbook_units'][0]['bid_price']
-                            else:
-                                print(f"❌ {action['coin']} 리밸런싱 매도 실패")
-            
-            # 잠깐 대기 (거래 처리 시간)
-            time.sleep(2)
-            
-            # 2단계: 부족한 코인 매수
-            if sell_proceeds > 0:
-                updated_krw = upbit.get_balance("KRW")
-                
-                for action in rebalance_actions:
-                    if action['action'] == 'BUY':
-                        ticker = action['ticker']
-                        current_ratio = current_allocation[ticker]
-                        target_ratio = TARGET_ALLOCATION[ticker]
-                        shortage_ratio = target_ratio - current_ratio
-                        
-                        # 부족한 비율만큼 매수 금액 계산
-                        buy_amount = total_portfolio_value * shortage_ratio
-                        
-                        if buy_amount >= MIN_TRADE_AMOUNT and updated_krw >= buy_amount:
-                            result = upbit.buy_market_order(ticker, buy_amount)
-                            if result:
-                                print(f"✅ {action['coin']} 리밸런싱 매수: {buy_amount:,.0f}원")
-                                updated_krw -= buy_amount
-                            else:
-                                print(f"❌ {action['coin']} 리밸런싱 매수 실패")
-            
-            return True
-        
-        return False
-        
-    except Exception as e:
-        print(f"❌ 포트폴리오 리밸런싱 오류: {e}")
-        return False
-
-def check_stop_loss(upbit, stop_loss_percent=STOP_LOSS_PERCENT):
-    """손절매 로직 - 15% 이상 손실 시 매도"""
-    coins = [coin.split('-')[1] for coin in PORTFOLIO_COINS]
-    stop_loss_executed = False
-    
-    for coin in coins:
-        ticker = f"KRW-{coin}"
-        try:
-            current_balance = upbit.get_balance(ticker)
-            if current_balance > 0:
-                # 평균 매수가 조회
-                avg_buy_price = upbit.get_avg_buy_price(ticker)
-                current_price = pyupbit.get_orderbook(ticker=ticker)['orderbook_units'][0]['bid_price']
-                
-                if avg_buy_price > 0:
-                    loss_percent = ((avg_buy_price - current_price) / avg_buy_price) * 100
-                    
-                    if loss_percent >= stop_loss_percent:
-                        print(f"🚨 {coin} 손절매 실행: {loss_percent:.1f}% 손실")
-                        result = upbit.sell_market_order(ticker, current_balance)
-                        if result:
-                            print(f"  ✅ {coin} 손절매 완료")
-                            stop_loss_executed = True
-                        else:
-                            print(f"  ❌ {coin} 손절매 실패")
-        except Exception as e:
-            print(f"  ❌ {coin} 손절매 확인 오류: {e}")
-    
-    return stop_loss_executed
+def create_risk_engine():
+    """통합 리스크 엔진 생성 - 손절매/현금 부족/집중도/리밸런싱 규칙 (config 값 사용)"""
+    return RiskEngine(
+        PORTFOLIO_COINS,
+        TARGET_ALLOCATION,
+        stop_loss_percent=STOP_LOSS_PERCENT,
+        max_single_position=MAX_SINGLE_COIN_RATIO,
+        rebalancing_threshold=REBALANCING_DEVIATION_THRESHOLD,
+        min_order_krw=MIN_TRADE_AMOUNT,
+        cooldowns=last_rebalance_time,
+        cooldown_seconds=CONFIG.get('safety', {}).get('rebalancing_cooldown_hours', 2) * 3600
+    )
 
-def calculate_dynamic_position_size(market_condition, base_ratio=BASE_TRADE_RATIO, upbit=None):
-    """시장 상황에 따른 동적 포지션 사이징 - config.json 승수 사용"""
+def calculate_dynamic_position_size(market_condition, base_ratio=None, upbit=None, risk_metrics=None):
+    """시장 상황에 따른 동적 포지션 사이징 - config.json 승수 + 변동성/상관 리스크 지표 사용"""
+    # 기본값은 호출 시점의 전역 설정 (설정 재적용/스윕 워커의 apply_config 반영)
+    if base_ratio is None:
+        base_ratio = BASE_TRADE_RATIO
     condition = market_condition.get("condition", "sideways")
     confidence = market_condition.get("confidence", 0.5)
     avg_change = market_condition.get("avg_change", 0)
@@ -724,6 +393,19 @@ def calculate_dynamic_position_size(market_condition, base_ratio=BASE_TRADE_RATI
         except:
             risk_multiplier = 0.9
     
+    # 리스크 지표 조정 (포트폴리오 변동성 목표 초과 / 고상관 시 축소)
+    risk_config = CONFIG.get('risk_metrics', {})
+    metrics_multiplier, metrics_reasons = risk_position_multiplier(
+        risk_metrics,
+        target_volatility=risk_config.get('target_volatility', 0.8),
+        high_correlation=risk_config.get('high_correlation', 0.8),
+        correlation_multiplier=risk_config.get('high_correlation_multiplier', 0.8),
+        min_multiplier=risk_config.get('min_multiplier', 0.5)
+    )
+    if metrics_reasons:
+        risk_multiplier *= metrics_multiplier
+        print(f"📉 리스크 지표 조정 ({metrics_multiplier:.2f}배): {', '.join(metrics_reasons)}")
+    
     # 신뢰도에 따른 추가 조정 - 범위 확대
     confidence_multiplier = 0.6 + (confidence * 0.6)  # 0.6~1.2
     
@@ -867,18 +549,29 @@ def check_performance_alerts(performance):
 # 거래 실행 함수
 # ============================================================================
 
-def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0, base_trade_ratio=BASE_TRADE_RATIO):
-    """포트폴리오 기반 스마트 매매 실행 - 시장 상황 고려 + 안전장치"""
+def create_order_router(upbit):
+    """봇 주문 경로 생성 - 체결 추적 엔진 + 지정가 주문 관리자 (config resting_orders)"""
+    return RestingOrderManager.from_config(OrderExecutionEngine(upbit), CONFIG.get('resting_orders'), MIN_TRADE_AMOUNT)
+
+def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0, base_trade_ratio=None,
+                             reduce_only=False):
+    """포트폴리오 기반 스마트 매매 실행 - 시장 상황 고려 + 안전장치 (reduce_only: 비상 정지 중 리스크 매도만 실행)"""
+    if base_trade_ratio is None:
+        base_trade_ratio = BASE_TRADE_RATIO  # 호출 시점 전역 설정 (apply_config 반영)
     print(f"\n💰 포트폴리오 매매 실행 시작 (기본 비율: {base_trade_ratio:.1%})")
     
     # 거래 실행 이력 저장용
     executed_trades = []
     
+    # 주문 실행 엔진 (실제 체결가/수수료 추적, 슬리피지 제한 지정가 + 재호가) + 대형 주문 분할 실행기
+    execution_engine = create_order_router(upbit)
+    slicer = SlicingExecutor.from_config(execution_engine, CONFIG.get('order_slicing'), MIN_TRADE_AMOUNT)
+    
     # 🔴 약세장 감지 및 현금 방어 모드 (최우선 체크)
     print("🐻 약세장 감지 중...")
     bear_market_check = detect_bear_market(portfolio_summary)
     
-    if bear_market_check['is_bear_market']:
+    if bear_market_check['is_bear_market'] and not reduce_only:
         print(f"🚨 약세장 감지! (신뢰도: {bear_market_check['confidence']:.1%})")
         print(f"   근거: {bear_market_check.get('reason', '복합 약세 신호')}")
         print(f"   지표: {bear_market_check['indicators']}")
@@ -940,9 +633,19 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                     
                     if sell_value >= MIN_TRADE_AMOUNT:
                         try:
-                            result = upbit.sell_market_order(coin_info['ticker'], sell_amount)
+                            if slicer and slicer.needs_slicing(sell_value):
+                                result = slicer.execute(coin_info['ticker'], 'sell', sell_amount)
+                            else:
+                                result = execution_engine.execute(coin_info['ticker'], 'sell', sell_amount)
                             if result:
-                                cash_secured += sell_value * 0.9995  # 수수료 고려
+                                if result['executed_volume'] > 0:
+                                    # 체결 내역 미확정(unknown)이면 funds가 0 → 체결 수량 × 조회 호가로 추정
+                                    funds = result['executed_volume'] * coin_info['price'] if result.get('unknown') \
+                                        else result['funds']
+                                    sell_value = funds - result['paid_fee']
+                                    cash_secured += sell_value
+                                else:
+                                    cash_secured += sell_value * 0.9995  # 수수료 고려
                                 print(f"   ✅ {coin_info['coin']} 방어 매도: {sell_value:,.0f}원 (수익률: {coin_info['profit_rate']:+.1%})")
                                 logging.info(f"BEAR_DEFENSE_SELL - {coin_info['coin']}: {sell_value:,.0f}원, 수익률 {coin_info['profit_rate']:+.1%}")
                         except Exception as e:
@@ -959,31 +662,42 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
         print(f"   💡 현금 {cash_ratio:.1%} 보유 - 반등 대기")
         return  # 매매 실행하지 않고 종료
     
-    # 1. 손절매 확인
-    print("🛡️ 손절매 확인 중...")
-    stop_loss_executed = check_stop_loss(upbit)
-    
-    # 2. 현금 부족 체크 (신규 추가)
-    print("💰 현금 비율 체크 중...")
-    cash_rebalance_executed = check_cash_shortage_rebalance(upbit)  # config에서 설정한 비율 미만 시 매도
-    
-    # 3. 포트폴리오 집중도 체크 (신규 추가) 
-    print("📊 포트폴리오 집중도 체크 중...")
-    concentration_rebalance_executed = check_portfolio_concentration_limits(upbit)  # config에서 설정한 비율 초과 시 매도
+    # 🧮 주문 계획기: 리스크 단계는 변화량만 제안 → 티커별 넷팅 후 한 번에 실행
+    planner = OrderPlanner(
+        min_order_krw=MIN_TRADE_AMOUNT,
+        cooldowns=last_rebalance_time,
+        cooldown_seconds=CONFIG.get('safety', {}).get('rebalancing_cooldown_hours', 2) * 3600
+    )
     
-    # 4. 포트폴리오 리밸런싱 (매 20사이클마다)
-    portfolio_rebalance_executed = False
-    if cycle_count % 20 == 0:
-        print("⚖️ 포트폴리오 리밸런싱 체크 중...")
-        portfolio_rebalance_executed = check_portfolio_rebalancing(upbit, deviation_threshold=REBALANCING_DEVIATION_THRESHOLD)
+    # 단일 스냅샷(잔고 1회 + 호가 일괄 1회)으로 손절매/현금 부족/집중도/리밸런싱(매 20사이클) 규칙 평가
+    print("🛡️ 리스크 점검 중 (손절매/현금 비율/집중도/리밸런싱)...")
+    try:
+        snapshot = PortfolioSnapshot.capture(upbit, PORTFOLIO_COINS)
+        risk_actions = create_risk_engine().evaluate(snapshot, include_rebalancing=cycle_count % 20 == 0)
+    except Exception as e:
+        print(f"❌ 리스크 점검 오류: {e}")
+        logging.error(f"RISK_CHECK_ERROR: {e}")
+        risk_actions = []
+    if reduce_only:
+        # 비상 정지 중: 손절/현금 확보/집중도 축소 등 매도 제안만 실행하고 종료
+        risk_actions = [action for action in risk_actions if action['delta_krw'] < 0]
+    RiskEngine.propose_all(risk_actions, planner)
+    if reduce_only:
+        if risk_actions:
+            planner.execute(execution_engine, slicer)
+        print("🚨 비상 정지 중 - 리스크 매도만 실행, 신규 매매 생략")
+        return
     
-    if stop_loss_executed or cash_rebalance_executed or concentration_rebalance_executed or portfolio_rebalance_executed:
+    # 넷팅/쿨다운 후 실제 주문이 계획된 경우에만 이번 사이클 신규 매매 생략
+    executed = planner.execute(execution_engine, slicer) if risk_actions else []
+    if executed or planner.planned:
         print("⚠️ 안전장치 실행으로 인해 이번 사이클 신규 매매를 건너뜁니다.")
         return
     
     # 2. 시장 상황 분석
     market_condition = portfolio_summary.get("market_condition", {})
-    dynamic_ratio = calculate_dynamic_position_size(market_condition, base_trade_ratio, upbit=upbit)
+    dynamic_ratio = calculate_dynamic_position_size(market_condition, base_trade_ratio, upbit=upbit,
+                                                    risk_metrics=portfolio_summary.get("risk_metrics"))
     
     print(f"📊 시장 상황: {market_condition.get('condition', 'unknown')}")
     print(f"🎯 조정된 거래 비율: {dynamic_ratio:.1%} (기본: {base_trade_ratio:.1%})")
@@ -1098,7 +812,7 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                         
                         if diversify_amount >= MIN_TRADE_AMOUNT and current_krw >= MIN_TRADE_AMOUNT * 2:
                             try:
-                                result = upbit.buy_market_order(target_ticker, diversify_amount)
+                                result = execution_engine.execute(target_ticker, 'buy', diversify_amount)
                                 if result:
                                     print(f"  ✅ {target_coin_name} 분산 매수 완료: {diversify_amount:,.0f}원")
                                     logging.info(f"DIVERSIFY_BUY - {target_coin_name}: {diversify_amount:,.0f}원 (신호: {target_signal} {target_confidence:.0%}, 원래: {coin} 집중도 초과)")
@@ -1134,7 +848,6 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                     continue
                 
                 # 🔴 리밸런싱 직후 쿨다운 체크 (config에서 읽기)
-                global last_rebalance_time
                 rebalancing_cooldown = CONFIG.get('safety', {}).get('rebalancing_cooldown_hours', 2) * 3600
                 if coin in last_rebalance_time:
                     time_since_rebalance = time.time() - last_rebalance_time[coin]
@@ -1290,9 +1003,19 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                     
                 current_price = buy_orderbook['orderbook_units'][0]['ask_price']
                 
+                # 📉 호가 깊이 기준 슬리피지 한도 내 최대 매수 금액으로 제한
+                max_depth_amount = max_notional_under_slippage(buy_orderbook, 'buy', MAX_SLIPPAGE)
+                if trade_amount > max_depth_amount:
+                    print(f"  📉 슬리피지 한도({MAX_SLIPPAGE:.2%}) 적용: {trade_amount:,.0f}원 → {max_depth_amount:,.0f}원")
+                    logging.info(f"BUY_DEPTH_CAP - {coin}: {trade_amount:,.0f}원 → {max_depth_amount:,.0f}원 (슬리피지 한도 {MAX_SLIPPAGE:.2%})")
+                    trade_amount = max_depth_amount
+                
                 if trade_amount > MIN_TRADE_AMOUNT:  # 최소 거래 금액
-                    result = upbit.buy_market_order(ticker, trade_amount)
+                    result = execution_engine.execute(ticker, 'buy', trade_amount)
                     if result:
+                        # 실제 체결가 반영 (미체결 시 호가 기준 추정 유지)
+                        if result['executed_volume'] > 0 and not result['unknown']:
+                            current_price = result['avg_price']
                         log_decision('BUY', coin, True, '매수 완료', {
                             'trade_amount': f"{trade_amount:,.0f}원",
                             'ai_size_ratio': f"{ai_size_ratio:.1%}",
@@ -1330,9 +1053,10 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                                 'tokens_used': signal_data.get('tokens_used'),
                                 'cost': signal_data.get('cost')
                             }
+                            paid = result['funds'] + result['paid_fee'] if result['filled'] else trade_amount
                             log_detailed_trade(coin, 'BUY', 
-                                                trade_amount / current_price,  # 구매 수량
-                                                current_price, trade_amount, -trade_amount,
+                                                result['executed_volume'] or trade_amount / current_price,  # 구매 수량
+                                                current_price, trade_amount, -paid,
                                                 market_data, ai_signal_data, 
                                                 portfolio_before, portfolio_after)
                         except Exception as e:
@@ -1553,8 +1277,10 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                                        f"추세: {trend} | 상승률: +{change_rate:.1f}% | 거래량: {volume_ratio:.1f}배 | "
                                        f"보유량: {current_balance:.6f} | 매도량: {sell_amount:.6f}")
                             
-                            result = upbit.sell_market_order(ticker, sell_amount)
+                            result = execution_engine.execute(ticker, 'sell', sell_amount)
                             if result:
+                                # 실제 체결 수량 기준 잔여 (부분 체결 시 요청량보다 적게 매도됨)
+                                sell_amount = result['executed_volume']
                                 remaining = current_balance - sell_amount
                                 log_decision('PARTIAL_SELL', coin, True, '부분매도 완료', {
                                     'rsi': f"{rsi:.1f}",
@@ -1622,8 +1348,13 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                     sell_value = sell_amount * current_price
                     
                     if sell_value > MIN_TRADE_AMOUNT:
-                        result = upbit.sell_market_order(ticker, sell_amount)
+                        result = execution_engine.execute(ticker, 'sell', sell_amount)
                         if result:
+                            # 실제 체결가/수령액 반영 (수수료 차감)
+                            if result['executed_volume'] > 0 and not result['unknown']:
+                                current_price = result['avg_price']
+                                sell_amount = result['executed_volume']
+                                sell_value = result['funds'] - result['paid_fee']
                             log_decision('SELL', coin, True, '매도 완료', {
                                 'sell_amount': f"{sell_amount:.6f}",
                                 'sell_ratio': f"{sell_ratio:.1%}",
@@ -1733,7 +1464,7 @@ def execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count=0
                     small_buy_amount = krw_balance * BASE_TRADE_RATIO * 0.5  # 기본 비율의 50%만 매수
                     
                     if small_buy_amount >= MIN_TRADE_AMOUNT:
-                        buy_result = upbit.buy_market_order(ticker, small_buy_amount)
+                        buy_result = execution_engine.execute(ticker, 'buy', small_buy_amount)
                         if buy_result:
                             print(f"  ✅ {coin} HOLD 소량 매수 실행 완료: {small_buy_amount:,.0f} KRW")
                             executed_trades.append({'coin': coin, 'action': 'HOLD_BUY', 'amount': small_buy_amount})
@@ -1830,24 +1561,9 @@ def log_performance_metrics(portfolio_value, daily_return, portfolio_allocation,
         logging.error(f"성과 로깅 실패: {e}")
 
 def calculate_daily_ai_cost():
-    """일일 AI 사용 비용 계산"""
+    """일일 AI 사용 비용 계산 (비용 원장 누적값, 파일 재스캔 없음)"""
     try:
-        signal_file = f'ai_signals_{datetime.now().strftime("%Y%m%d")}.json'
-        if not os.path.exists(signal_file):
-            return 0
-        
-        total_cost = 0
-        with open(signal_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    signal_data = json.loads(line.strip())
-                    cost_info = signal_data.get('cost_info', {})
-                    total_cost += cost_info.get('cost_krw', 0)
-                except (json.JSONDecodeError, KeyError) as e:
-                    logging.debug(f"AI 비용 계산 중 라인 스킵: {e}")
-                    continue
-        
-        return total_cost
+        return ai_cost_ledger.get_daily_cost()
     except Exception as e:
         logging.warning(f"일일 AI 비용 계산 실패: {e}")
         return 0
@@ -2017,6 +1733,9 @@ def setup_detailed_logging():
 # 전역 변수: 관리 중인 신규코인 추적 (봇 재시작 시에도 유지 목적)
 MANAGED_NEW_COINS = set()
 
+# 비상 정지 상태 저장 파일 (재시작 후에도 정지 유지)
+EMERGENCY_STATE_FILE = os.path.join("log", "emergency_stop_state.json")
+
 def trend_coin_trading_loop(upbit, stop_event):
     """
     신규/트렌드 코인 자동 투자 - 독립 스레드 (공격적 적응형 체크 주기)
@@ -2066,6 +1785,11 @@ def trend_coin_trading_loop(upbit, stop_event):
             logger.info(f"🔄 [신규코인] 트렌드 코인 체크 시작")
             print(f"\n🔄 [신규코인] 트렌드 코인 체크 ({datetime.now().strftime('%H:%M:%S')})")
             
+            # 비상 정지 중이면 보유 신규코인 손절/익절만 실행 (신규 매수 생략)
+            reduce_only = not emergency_system.can_trade()
+            if reduce_only:
+                print(f"🚨 [신규코인] 비상 정지 중 ({emergency_system.stop_reason}) - 청산 규칙만 실행")
+            
             # 신규코인 투자/관리 실행 (전역 관리 중인 코인 전달 및 반환)
             current_holdings = execute_new_coin_trades(
                 upbit,
@@ -2074,7 +1798,9 @@ def trend_coin_trading_loop(upbit, stop_event):
                 invest_ratio=TREND_INVEST_RATIO,
                 check_interval_min=5,  # 5분 주기 전달 (분할익절 전략)
                 managed_coins=MANAGED_NEW_COINS,  # 전역 변수 사용
-                market_summary=LAST_MARKET_SUMMARY  # 최신 시장 정보 전달
+                market_summary=LAST_MARKET_SUMMARY,  # 최신 시장 정보 전달
+                order_router=create_order_router(upbit),
+                reduce_only=reduce_only
             )
             
             # 적응형 체크 주기 결정
@@ -2111,8 +1837,19 @@ def trend_coin_trading_loop(upbit, stop_event):
 # 메인 트레이딩 봇 실행 함수
 # ============================================================================
 
-def run_trading_bot():
-    """24시간 자동화 트레이딩 봇 실행"""
+def build_risk_config():
+    """리스크 지표 설정 (config risk_metrics + 목표 비중을 코인별 가중치로)"""
+    risk_config = dict(CONFIG.get('risk_metrics', {}))
+    risk_config['weights'] = {ticker.split('-')[1]: ratio for ticker, ratio in TARGET_ALLOCATION.items()}
+    return risk_config
+
+def run_trading_bot(dry_run=False):
+    """
+    24시간 자동화 트레이딩 봇 실행
+
+    Args:
+        dry_run: True면 실제 주문 대신 로컬 모의 거래소(PaperExchange)로 체결
+    """
     # 설정 파일 로드
     config = load_config()
     
@@ -2131,17 +1868,29 @@ def run_trading_bot():
         MIN_TRADE_AMOUNT = config.get("trading", {}).get("min_trade_amount", MIN_TRADE_AMOUNT)
         print(f"⚙️ 설정 적용: 거래비율={BASE_TRADE_RATIO:.1%}, 손절매={STOP_LOSS_PERCENT}%, 최소거래={MIN_TRADE_AMOUNT:,}원")
     
-    # API 키 로드
-    load_dotenv()
-    access = os.getenv("UPBIT_ACCESS_KEY")
-    secret = os.getenv("UPBIT_SECRET_KEY")
+    if dry_run:
+        # 모의 거래소: 실시간(또는 녹화) 호가로 체결, API 키 불필요
+        upbit = PaperExchange.from_config(CONFIG.get('paper_trading'))
+        print(f"🧪 모의 거래소 연결 완료 (초기자본 {upbit.initial_krw:,.0f}원, 수수료 {upbit.fee_rate:.2%})")
+    else:
+        # API 키 로드
+        load_dotenv()
+        access = os.getenv("UPBIT_ACCESS_KEY")
+        secret = os.getenv("UPBIT_SECRET_KEY")
+        
+        if not access or not secret:
+            print("❌ API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
+            return
+        
+        upbit = pyupbit.Upbit(access, secret)
+        print("✅ 업비트 API 연결 완료")
     
-    if not access or not secret:
-        print("❌ API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
-        return
+    # AI 일일 예산 적용
+    ai_cost_ledger.configure(CONFIG.get('ai_budget', {}))
     
-    upbit = pyupbit.Upbit(access, secret)
-    print("✅ 업비트 API 연결 완료")
+    # 비상 정지 시스템 (모의 실행은 정지 상태를 저장하지 않음)
+    emergency_config = CONFIG.get('emergency_stop', {})
+    emergency_system.configure(emergency_config, state_file=None if dry_run else EMERGENCY_STATE_FILE)
     
     # 신규코인 투자 스레드 시작 (20분마다 독립 실행)
     stop_event = threading.Event()
@@ -2156,6 +1905,29 @@ def run_trading_bot():
     print(f"🚀 [신규코인] 트렌드 코인 투자 스레드 시작 (분할익절 전략: 5분 모니터링)")
     print(f"   📊 손절 -8% | 1차익절 +10%(40%) | 2차익절 +15%(50%) | 3차익절 +20%(100%)")
     
+    # 비상 정지 감시 스레드 (보유/포트폴리오 코인 시세 일괄 샘플링 → 폭락/장애 감지)
+    guard_thread = None
+    if emergency_config.get('guard_enabled', True):
+        guard_thread = threading.Thread(
+            target=emergency_system.guard_loop,
+            args=(upbit, PORTFOLIO_COINS, stop_event),
+            kwargs={
+                'interval': emergency_config.get('guard_interval_seconds', 5),
+                'health_interval': emergency_config.get('health_check_interval_seconds', 60)
+            },
+            daemon=True,
+            name="EmergencyGuardThread"
+        )
+        guard_thread.start()
+        print(f"🛡️ 비상 정지 감시 시작 ({emergency_config.get('guard_interval_seconds', 5)}초 간격)")
+    
+    # 계층형 신호 엔진 (로컬 모델 즉시 산출 + LLM은 마감 시간 내에서만 정제)
+    llm_deadline = CONFIG.get('signal_engine', {}).get('llm_deadline_seconds', 20)
+    signal_engine = TieredSignalEngine(
+        lambda summary: get_portfolio_ai_signals(summary, default_on_failure=False),
+        deadline_seconds=llm_deadline
+    )
+    
     cycle_count = 0
     
     while True:
@@ -2197,7 +1969,13 @@ def run_trading_bot():
                 print(f"📢 주요 이벤트: {', '.join(news_analysis['events'])}")
             
             # 3. 포트폴리오 요약 생성
-            portfolio_summary = make_portfolio_summary(portfolio_data, fng, news, calculate_rsi)
+            portfolio_summary = make_portfolio_summary(portfolio_data, fng, news, calculate_rsi, build_risk_config())
+            
+            risk_metrics = portfolio_summary.get("risk_metrics")
+            if risk_metrics:
+                print(f"📐 리스크 지표: 변동성 {risk_metrics['portfolio_volatility']:.0%} | "
+                      f"평균 상관 {risk_metrics['avg_correlation']:.2f} | "
+                      f"1일 VaR {risk_metrics['var_daily']:.2%} / CVaR {risk_metrics['cvar_daily']:.2%}")
             
             # 🚨 전역 변수 업데이트: 신규코인 스레드에서 참조
             global LAST_MARKET_SUMMARY
@@ -2208,7 +1986,7 @@ def run_trading_bot():
             
             # 4. AI 분석 실행
             print("\n🤖 AI 포트폴리오 분석 중...")
-            ai_signals = get_portfolio_ai_signals(portfolio_summary)
+            ai_signals = signal_engine.get_signals(portfolio_summary)
             
             # 5. 포트폴리오 현황 출력
             print(f"\n💼 현재 포트폴리오 상황:")
@@ -2254,9 +2032,21 @@ def run_trading_bot():
             except Exception as e:
                 logging.error(f"성과 로깅 실패: {e}")
             
-            # 7. 매매 실행
-            print(f"\n💰 스마트 매매 실행:")
-            execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count)
+            # 7. 매매 실행 (비상 정지 중이면 손절 등 리스크 매도만)
+            if emergency_system.can_trade():
+                print(f"\n💰 스마트 매매 실행:")
+                execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count)
+            else:
+                print(f"\n🚨 비상 정지 중 - 리스크 매도만 실행 ({emergency_system.stop_reason})")
+                print("   거래 재개: python mvp.py emergency-reset")
+                execute_portfolio_trades(ai_signals, upbit, portfolio_summary, cycle_count, reduce_only=True)
+            
+            if dry_run:
+                paper = upbit.summary()
+                print(f"\n🧪 모의 거래 현황: 총자산 {paper['total_value']:,.0f}원 ({paper['pnl_percent']:+.2f}%) | "
+                      f"주문 {paper['stats']['orders']}건 | 체결 {paper['stats']['trades']}건 | "
+                      f"수수료 {paper['stats']['fees_krw']:,.0f}원")
+                logging.info(f"PAPER_SUMMARY - {json.dumps(paper, ensure_ascii=False, default=str)}")
 
             # 7-1. 신규/트렌드 코인 투자는 별도 스레드에서 20분마다 실행 중
             # (execute_new_coin_trades는 메인 루프에서 제거됨)
@@ -2274,8 +2064,10 @@ def run_trading_bot():
         except KeyboardInterrupt:
             logger.info("🛑 사용자에 의해 봇이 중단되었습니다.")
             print(f"\n\n🛑 사용자에 의해 봇이 중단되었습니다.")
-            stop_event.set()  # 신규코인 스레드 종료 신호
+            stop_event.set()  # 신규코인/감시 스레드 종료 신호
             trend_thread.join(timeout=5)  # 최대 5초 대기
+            if guard_thread:
+                guard_thread.join(timeout=5)
             break
             
         except requests.exceptions.RequestException as e:
@@ -2291,411 +2083,426 @@ def run_trading_bot():
             time.sleep(30 * 60)  # 기타 오류는 30분 대기
 
 def run_backtest(days_back=30, initial_balance=1000000):
-    """백테스팅 시스템 - 과거 데이터로 전략 검증"""
+    """백테스팅 시스템 - 로컬 캔들 저장소의 실제 과거 데이터로 전략 검증"""
     print("📊 백테스팅 시작!")
     print("=" * 60)
     
-    # 백테스트 결과 저장
-    backtest_results = {
-        'initial_balance': initial_balance,
-        'trades': [],
-        'daily_balance': [],
-        'max_drawdown': 0,
-        'win_rate': 0,
-        'total_trades': 0
-    }
-    
-    # 과거 데이터 수집 (더 긴 기간)
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days_back + DATA_PERIOD)
-    
-    print(f"📅 백테스트 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
+    backtest_config = CONFIG.get('backtest', {})
+    store = CandleStore(backtest_config.get('candle_store_dir', 'candles'))
     
-    # 시뮬레이션 포트폴리오
-    portfolio_balance = initial_balance
-    coin_holdings = {coin.split('-')[1]: 0 for coin in PORTFOLIO_COINS}
-    max_balance = initial_balance
+    # 로컬 저장소에 기간 + 지표 계산 여유분이 없으면 1회 동기화 (이후 백테스트는 네트워크 조회 없음)
+    required = days_back + DATA_PERIOD + 1
+    mode = backtest_config.get('mode', 'vectorized')
+    intraday_interval = backtest_config.get('intraday_interval', 'minute60')
+    for ticker in PORTFOLIO_COINS:
+        if not store.ensure(ticker, 'day', required):
+            print(f"  ❌ {ticker} 캔들 데이터 없음")
+        elif mode == 'intraday':
+            bars = (days_back + 1) * 86400 // INTERVAL_SECONDS[intraday_interval]
+            if not store.ensure(ticker, intraday_interval, bars):
+                print(f"  ❌ {ticker} {intraday_interval} 캔들 데이터 없음")
+    
+    # vectorized: 전 기간 지표/신호 1회 계산 (결과는 stepwise와 동일)
+    # intraday: 일봉 신호 + 장중 캔들 고가/저가로 손절/익절 체결 판정
+    strategy = SignalStrategy.from_config(CONFIG)
+    if mode == 'intraday':
+        engine = IntradayBacktest(store, PORTFOLIO_COINS, strategy, lookback=DATA_PERIOD,
+                                  interval=intraday_interval, exit_rules=ExitRules.from_config(CONFIG),
+                                  equity_interval=backtest_config.get('intraday_equity_interval', 'minute60'))
+    else:
+        engine_class = HistoricalBacktest if mode == 'stepwise' else VectorizedBacktest
+        engine = engine_class(store, PORTFOLIO_COINS, strategy, lookback=DATA_PERIOD)
     
     try:
-        # 일별 백테스트 실행
-        for day in range(days_back):
-            current_date = end_date - timedelta(days=days_back - day)
-            print(f"\n📊 {current_date.strftime('%Y-%m-%d')} 백테스트 중...")
-            
-            # 해당 날짜의 데이터로 시뮬레이션
-            portfolio_data = get_historical_data_for_date(current_date)
-            
-            if not portfolio_data or len(portfolio_data) == 0:
-                print(f"  ❌ {current_date.strftime('%Y-%m-%d')} 데이터 없음")
-                continue
-            
-            # 최소 2개 이상의 코인 데이터가 있을 때만 거래 진행
-            valid_coins = []
-            for coin, data in portfolio_data.items():
-                if data and 'day' in data:
-                    day_data = data['day']
-                    if day_data is not None and hasattr(day_data, 'empty') and not day_data.empty:
-                        valid_coins.append(coin)
-            
-            if len(valid_coins) < 2:
-                print(f"  ⚠️ {current_date.strftime('%Y-%m-%d')} 유효한 코인 데이터 부족 ({len(valid_coins)}개)")
-                continue
-            
-            # 시뮬레이션 거래 실행 (portfolio_data 직접 전달)
-            portfolio_balance, coin_holdings = simulate_trading(
-                portfolio_data, portfolio_balance, coin_holdings, backtest_results
-            )
-            
-            # 일일 잔고 기록
-            backtest_results['daily_balance'].append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'balance': portfolio_balance
-            })
-            
-            # 최대 손실 계산
-            if portfolio_balance > max_balance:
-                max_balance = portfolio_balance
-            
-            drawdown = (max_balance - portfolio_balance) / max_balance * 100
-            if drawdown > backtest_results['max_drawdown']:
-                backtest_results['max_drawdown'] = drawdown
-        
-        # 백테스트 결과 분석
-        analyze_backtest_results(backtest_results)
-        
+        results = engine.run(days_back, initial_balance, verbose=True)
     except Exception as e:
         print(f"❌ 백테스트 오류: {e}")
         return None
     
-    return backtest_results
+    if not results or not results['daily_balance']:
+        print("❌ 백테스트 데이터 부족")
+        return None
+    
+    days = results.get('simulated_days', len(results['daily_balance']))
+    print(f"📅 백테스트 기간: {results['daily_balance'][0]['date']} ~ {results['daily_balance'][-1]['date']} "
+          f"({days:.0f}일, {results['elapsed']:.2f}초)")
+    if mode == 'intraday':
+        print(f"🕐 장중 캔들 {results['bars']:,}개 ({intraday_interval}) | 장중 손절/익절 {results['exits']}회")
+    
+    # 백테스트 결과 분석
+    analyze_backtest_results(results, mode if mode in ('stepwise', 'intraday') else 'vectorized')
+    return results
+
+def reset_trading_state():
+    """매매 쿨다운/관리 코인 등 전역 상태 초기화 (이벤트 백테스트 시작 시)"""
+    global daily_sell_count, last_reset_date, LAST_MARKET_SUMMARY
+    last_partial_sell_time.clear()
+    last_rebalance_time.clear()
+    MANAGED_NEW_COINS.clear()
+    daily_sell_count = {}
+    last_reset_date = None
+    LAST_MARKET_SUMMARY = None
+
+def backtest_portfolio_cycle(upbit, count):
+    """
+    이벤트 백테스트 포트폴리오 사이클 - 메인 루프와 동일한 수집/요약/신호/매매 경로
+    (과거 재현이 불가능한 뉴스/공포탐욕지수/LLM 신호 대신 중립값 + 로컬 모델 신호 사용)
 
-def get_historical_data_for_date(target_date):
-    """특정 날짜 기준 과거 데이터 수집 - 더 현실적인 백테스팅을 위해 날짜별 다른 데이터 시뮬레이션"""
-    import random  # 백테스트용 랜덤 시뮬레이션
+    Returns:
+        int: 다음 사이클까지 간격 (초, calculate_check_interval)
+    """
+    global LAST_MARKET_SUMMARY
+    portfolio_data = get_portfolio_data(PORTFOLIO_COINS, DATA_PERIOD)
+    if not portfolio_data:
+        return None
     
-    portfolio_data = {}
+    fng = {"value": None, "text": None}
+    portfolio_summary = make_portfolio_summary(portfolio_data, fng, [], calculate_rsi, build_risk_config())
+    LAST_MARKET_SUMMARY = {
+        "fear_greed_index": portfolio_summary.get("fear_greed_index", {}),
+        "market_condition": portfolio_summary.get("market_condition", {})
+    }
+    
+    ai_signals = generate_local_signals(portfolio_summary)
+    execute_portfolio_trades(ai_signals, upbit, portfolio_summary, count + 1,
+                             reduce_only=not emergency_system.can_trade())
+    return calculate_check_interval(portfolio_summary)
+
+def backtest_trend_cycle(upbit, count):
+    """
+    이벤트 백테스트 신규코인 체크 - trend_coin_trading_loop 1회분 (과거 뉴스 없음 → 기술적 분석 대체)
+
+    Returns:
+        int: 다음 체크까지 간격 (초, 보유 중 5분 / 미보유 TREND_CHECK_INTERVAL_MIN)
+    """
+    current_holdings = execute_new_coin_trades(
+        upbit,
+        portfolio_coins=PORTFOLIO_COINS,
+        min_trade_amount=MIN_TRADE_AMOUNT,
+        invest_ratio=TREND_INVEST_RATIO,
+        check_interval_min=5,
+        managed_coins=MANAGED_NEW_COINS,
+        market_summary=LAST_MARKET_SUMMARY,
+        order_router=create_order_router(upbit),
+        reduce_only=not emergency_system.can_trade()
+    )
+    return (5 if current_holdings else TREND_CHECK_INTERVAL_MIN) * 60
+
+def disable_news_feed():
+    """과거 뉴스 재현 불가 - 신규코인 뉴스 조회를 빈 피드로 대체 (기술적 분석 경로 사용)"""
+    return []
+
+def create_event_backtest(store, initial_balance=1000000):
+    """이벤트 기반 백테스트 엔진 생성 - 포트폴리오 사이클 + 신규코인 체크 핸들러 (현재 전역 설정 사용)"""
+    backtest_config = CONFIG.get('backtest', {})
+    return EventDrivenBacktest(
+        store,
+        PORTFOLIO_COINS,
+        handlers={
+            'portfolio': (backtest_portfolio_cycle, CHECK_INTERVALS["default_interval"] * 60),
+            'trend': (backtest_trend_cycle, TREND_CHECK_INTERVAL_MIN * 60)
+        },
+        base_interval=backtest_config.get('event_base_interval', 'minute60'),
+        initial_krw=initial_balance,
+        fee_rate=backtest_config.get('fee_rate', 0.0005),
+        min_order_krw=5000,
+        depth_ratio=backtest_config.get('event_depth_ratio', 0.02),
+        datetime_modules=(__name__,),
+        patches=[(trendcoin_trader, 'fetch_news_feed', disable_news_feed)]
+    )
+
+def evaluate_event_config(store, config, days, end=None):
+    """파라미터 탐색 워커용 평가 함수 - 후보 설정을 전역 상수에 반영 후 이벤트 기반 백테스트 1회"""
+    apply_config(config)
+    reset_trading_state()
+    return create_event_backtest(store, config.get('backtest', {}).get('initial_balance', 1000000)).run(days, end)
+
+def sweep_candidates(sweep_config):
+    """sweep 섹션 탐색 공간 → 후보 목록 (grid: 전체 조합, random: samples개)"""
+    space = sweep_config.get('space', {})
+    if sweep_config.get('method', 'random') == 'grid':
+        return grid_space(space)
+    return random_space(space, sweep_config.get('samples', 100), sweep_config.get('seed'))
+
+def prepare_sweep_engine(store, engine, days):
+    """
+    탐색 평가 방식별 캔들 확보 + 공유 대상 구성
     
-    # 날짜 기반 시드로 랜덤 가격 변동 시뮬레이션
-    date_seed = int(target_date.strftime('%Y%m%d'))
-    random.seed(date_seed)
+    Args:
+        store: CandleStore
+        engine: 'event' (실거래 매매 경로 재생 - 모든 설정 반영) / 'vectorized' (신호 전략 - 빠름)
+        days: 필요한 전체 일수 (지표 여유분 제외)
     
+    Returns:
+        tuple: (evaluate 함수, 공유 티커, 캔들 주기, 사전 계산 배열)
+    """
+    if engine == 'event':
+        interval = CONFIG.get('backtest', {}).get('event_base_interval', 'minute60')
+        required = (days + DATA_PERIOD + 1) * 86400 // INTERVAL_SECONDS[interval]
+    else:
+        interval = 'day'
+        required = days + DATA_PERIOD + 1
     for ticker in PORTFOLIO_COINS:
-        try:
-            # 기본 데이터 가져오기
-            df = pyupbit.get_ohlcv(ticker, interval="day", count=DATA_PERIOD)
-            if df is not None and not df.empty:
-                coin_name = ticker.split('-')[1]
-                
-                # 날짜별 가격 변동 시뮬레이션 (±10% 범위)
-                base_price = df['close'].iloc[-1]
-                price_change = random.uniform(-0.1, 0.1)  # -10% ~ +10%
-                simulated_price = base_price * (1 + price_change)
-                
-                # 마지막 가격을 시뮬레이션 가격으로 변경
-                df_copy = df.copy()
-                df_copy['close'].iloc[-1] = simulated_price
-                df_copy['high'].iloc[-1] = max(df_copy['high'].iloc[-1], simulated_price)
-                df_copy['low'].iloc[-1] = min(df_copy['low'].iloc[-1], simulated_price)
-                
-                # RSI 계산을 위해 몇 개 더 가격 조정 (트렌드 생성)
-                trend = random.choice([-1, 0, 1])  # 하락, 횡보, 상승
-                for i in range(-5, 0):  # 마지막 5일 트렌드 생성
-                    if abs(i) < len(df_copy):
-                        trend_change = trend * random.uniform(0.01, 0.03)  # 1-3% 변동
-                        df_copy['close'].iloc[i] *= (1 + trend_change)
-                
-                portfolio_data[coin_name] = {'day': df_copy}
-                
-                # 변동률 계산
-                original_price = base_price
-                change_pct = (simulated_price - original_price) / original_price * 100
-                
-                print(f"  ✅ {coin_name} 데이터 수집: {len(df_copy)}행 (가격변동: {change_pct:+.1f}%)")
-            else:
-                print(f"  ❌ {ticker} 데이터 없음")
-        except Exception as e:
-            print(f"  ❌ {ticker} 히스토리 데이터 오류: {e}")
+        if not store.ensure(ticker, interval, required):
+            print(f"  ❌ {ticker} 캔들 데이터 없음")
+    
+    if engine == 'event':
+        # 신규코인 후보까지 재생하므로 저장소의 기준 주기 티커 전체 공유
+        return evaluate_event_config, sorted(set(store.tickers(interval)) | set(PORTFOLIO_COINS)), interval, None
+    # 전 기간 신호 배열 1회 계산 → 워커 공유 (후보마다 상태 루프만 실행)
+    return evaluate_vectorized, PORTFOLIO_COINS, interval, vectorized_arrays(store, PORTFOLIO_COINS)
+
+def format_overrides(overrides):
+    return ", ".join(f"{key.split('.')[-1]}={value}" for key, value in overrides.items())
+
+def run_parameter_sweep():
+    """config.json sweep 섹션의 탐색 공간으로 병렬 파라미터 탐색 → 순위표 CSV 저장"""
+    sweep_config = CONFIG.get('sweep', {})
+    backtest_config = CONFIG.get('backtest', {})
+    store = CandleStore(backtest_config.get('candle_store_dir', 'candles'))
+    days = sweep_config.get('days', backtest_config.get('default_days', 90))
+    
+    candidates = sweep_candidates(sweep_config)
+    if not candidates:
+        print("❌ 탐색 공간이 비어 있습니다 (config.json sweep.space)")
+        return None
     
-    return portfolio_data
-
-def simulate_trading(portfolio_data, balance, holdings, backtest_results):
-    """시뮬레이션 거래 실행"""
-    # AI 신호 생성 (실제 API 호출하지 않고 로컬 로직 사용)
-    ai_signals = generate_backtest_signals(portfolio_data)
+    evaluate, tickers, interval, arrays = prepare_sweep_engine(store, sweep_config.get('engine', 'event'), days)
+    sweep = ParameterSweep(store, tickers, evaluate, CONFIG, days, intervals=(interval,),
+                           workers=sweep_config.get('workers') or None, arrays=arrays)
+    output = os.path.join(sweep_config.get('output_dir', 'log'), f"sweep_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    table = sweep.run(candidates, output)
     
-    # 현재 포트폴리오 가치 계산
-    total_portfolio_value = balance
-    for coin, amount in holdings.items():
-        if coin in portfolio_data and amount > 0:
-            coin_price = portfolio_data[coin]['day']['close'].iloc[-1]
-            total_portfolio_value += amount * coin_price
+    print(f"\n🏆 상위 후보 (수익률/낙폭/샤프 평균 순위)")
+    print("=" * 60)
+    for row in table.head(10).to_dict('records'):
+        params = format_overrides({key: row[key] for key in candidates[0]})
+        if pd.isna(row.get('total_return')):
+            print(f"  #{row['id']} {params} → 오류: {row.get('error')}")
+            continue
+        print(f"  #{row['id']} {params}")
+        print(f"     수익률 {row['total_return']:+.2f}% | 최대낙폭 {row['max_drawdown']:.2f}% | "
+              f"샤프 {row['sharpe']:.2f} | 거래 {row['trades']:.0f}회")
+    return table
+
+def run_walk_forward():
+    """워크포워드 최적화 - 구간별 학습 탐색 → 표본 외 검증 → 연결 자산 곡선 / 현재 설정 기준선 비교"""
+    wf_config = CONFIG.get('walk_forward', {})
+    sweep_config = CONFIG.get('sweep', {})
+    backtest_config = CONFIG.get('backtest', {})
+    store = CandleStore(backtest_config.get('candle_store_dir', 'candles'))
+    
+    train_days = wf_config.get('train_days', 180)
+    test_days = wf_config.get('test_days', 30)
+    step_days = wf_config.get('step_days') or test_days
+    count = wf_config.get('windows', 6)
+    # 탐색 방식/공간은 walk_forward 섹션 우선, 없으면 sweep 섹션
+    candidates = sweep_candidates({**sweep_config, **wf_config})
+    if not candidates:
+        print("❌ 탐색 공간이 비어 있습니다 (config.json walk_forward.space / sweep.space)")
+        return None
     
-    for coin, signal_data in ai_signals.items():
-        signal = signal_data.get('signal', 'HOLD')
-        confidence = signal_data.get('confidence', 0.5)
-        
-        if signal in ['STRONG_BUY', 'BUY'] and confidence > 0.6:  # 임계값 유지 (신뢰도가 이미 0.65로 상향됨)
-            # 매수 시뮬레이션
-            if signal == 'STRONG_BUY' and confidence > 0.8:  # 조건 완화 (기존 0.9 → 0.8)
-                multiplier = 1.5
-            else:
-                multiplier = 1.0
-            
-            # 잔고 부족 방지를 위한 안전 장치
-            max_trade_amount = balance * 0.8  # 잔고의 80%까지만 사용
-            trade_amount = min(balance * BASE_TRADE_RATIO * multiplier, max_trade_amount)
-            
-            if trade_amount > MIN_TRADE_AMOUNT and balance > trade_amount:
-                # 현재 가격을 DataFrame에서 직접 추출
-                coin_price = portfolio_data[coin]['day']['close'].iloc[-1]
-                
-                # 포트폴리오 밸런싱 체크: 특정 코인이 전체 포트폴리오의 50% 초과하지 않도록
-                current_coin_value = holdings[coin] * coin_price if holdings[coin] > 0 else 0
-                coin_ratio = current_coin_value / total_portfolio_value if total_portfolio_value > 0 else 0
-                
-                if coin_ratio > 0.5:  # 이미 50% 초과 시 매수 제한
-                    print(f"    ⚠️ {coin} 포트폴리오 비중 초과 ({coin_ratio:.1%}), 매수 제한")
-                    continue
-                
-                coin_amount = trade_amount / coin_price
-                holdings[coin] += coin_amount
-                balance -= trade_amount
-                
-                print(f"    💰 {coin} 매수: {coin_amount:.6f}개 (가격: {coin_price:,.0f}원, 총투자: {trade_amount:,.0f}원)")
-                print(f"    📊 잔고: {balance:,.0f}원, {coin} 보유: {holdings[coin]:.6f}개")
-                
-                # 거래 기록
-                backtest_results['trades'].append({
-                    'type': 'BUY',
-                    'coin': coin,
-                    'amount': coin_amount,
-                    'price': coin_price,
-                    'value': trade_amount,
-                    'confidence': confidence
-                })
-                backtest_results['total_trades'] += 1
-        
-        elif signal == 'SELL':
-            if holdings[coin] > 0:
-                # 매도 시뮬레이션
-                sell_ratio = confidence if confidence > 0.6 else 0.3
-                sell_amount = holdings[coin] * sell_ratio
-                # 현재 가격을 DataFrame에서 직접 추출
-                coin_price = portfolio_data[coin]['day']['close'].iloc[-1]
-                sell_value = sell_amount * coin_price
-                
-                if sell_value > MIN_TRADE_AMOUNT:
-                    holdings[coin] -= sell_amount
-                    balance += sell_value
-                    
-                    print(f"    💸 {coin} 매도: {sell_amount:.6f}개 (가격: {coin_price:,.0f}원, 수익: {sell_value:,.0f}원)")
-                    print(f"    📊 잔고: {balance:,.0f}원, {coin} 보유: {holdings[coin]:.6f}개")
-                    
-                    # 거래 기록
-                    backtest_results['trades'].append({
-                        'type': 'SELL',
-                        'coin': coin,
-                        'amount': sell_amount,
-                        'price': coin_price,
-                        'value': sell_value,
-                        'confidence': confidence
-                    })
-                    backtest_results['total_trades'] += 1
-                else:
-                    print(f"    ⚠️ {coin} 매도 금액이 최소 거래금액({MIN_TRADE_AMOUNT:,}원) 미만: {sell_value:,.0f}원")
-            else:
-                print(f"    ⚠️ {coin} 매도 신호이지만 보유량 없음 (현재: {holdings[coin]:.6f}개)")
+    total_days = train_days + test_days + step_days * (count - 1)
+    evaluate, tickers, interval, arrays = prepare_sweep_engine(store, wf_config.get('engine', 'vectorized'), total_days)
+    walk = WalkForward(store, tickers, evaluate, CONFIG, train_days, test_days, step_days,
+                       intervals=(interval,), workers=wf_config.get('workers') or None,
+                       arrays=arrays, warmup_days=DATA_PERIOD)
+    result = walk.run(candidates, walk.windows(count, PORTFOLIO_COINS), wf_config.get('output_dir', 'log'))
+    if result is None:
+        return None
     
-    return balance, holdings
-
-def calculate_technical_indicators(df):
-    """DataFrame에서 기술적 지표 계산"""
-    if df is None or df.empty:
+    print(f"\n🚶 구간별 결과 (학습 최적 → 표본 외)")
+    print("=" * 60)
+    for row in result['windows'].to_dict('records'):
+        print(f"  [{row['window']}] 학습 ~{row['test_start']} | 검증 {row['test_start']} ~ {row['test_end']}")
+        if pd.isna(row.get('optimized_return', np.nan)):
+            print(f"     최적 설정 없음 (학습 평가 실패)")
+            continue
+        print(f"     {format_overrides({key: row[key] for key in candidates[0]})}")
+        print(f"     학습 {row['train_return']:+.2f}% → 검증 {row['optimized_return']:+.2f}% "
+              f"(현재 설정 {row.get('baseline_return', np.nan):+.2f}%)")
+    
+    print(f"\n📈 표본 외 연결 성과")
+    for name, label in (('optimized', '워크포워드'), ('baseline', '현재 설정')):
+        summary = result[name]
+        print(f"  {label}: 수익률 {summary['total_return']:+.2f}% | 최대낙폭 {summary['max_drawdown']:.2f}% | "
+              f"샤프 {summary['sharpe']:.2f}")
+    if result['efficiency'] is not None:
+        print(f"  워크포워드 효율 (표본 외/표본 내 일평균 수익률): {result['efficiency']:.2f}")
+    if result['latest']:
+        print(f"\n💡 최근 구간 최적 설정 (적용 후보): {format_overrides(result['latest'])}")
+    return result
+
+def run_monte_carlo():
+    """몬테카를로 강건성 검증 - 재표본 가격 경로 / 진입 시점 교란으로 벡터화 백테스트 반복 → 수익률/낙폭/파산 확률 분포"""
+    mc_config = CONFIG.get('monte_carlo', {})
+    backtest_config = CONFIG.get('backtest', {})
+    store = CandleStore(backtest_config.get('candle_store_dir', 'candles'))
+    days = mc_config.get('days', backtest_config.get('default_days', 90))
+    
+    required = days + DATA_PERIOD + 1
+    for ticker in PORTFOLIO_COINS:
+        if not store.ensure(ticker, 'day', required):
+            print(f"  ❌ {ticker} 캔들 데이터 없음")
+    engine = VectorizedBacktest(store, PORTFOLIO_COINS, SignalStrategy.from_config(CONFIG), lookback=DATA_PERIOD)
+    market, first = engine.load(days)
+    if market is None:
+        print("❌ 백테스트 데이터 부족")
         return None
     
-    try:
-        # RSI 계산 (14일 기준)
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs)).iloc[-1]
-        
-        # 이동평균 계산
-        ma5 = df['close'].rolling(window=5).mean().iloc[-1]
-        ma20 = df['close'].rolling(window=20).mean().iloc[-1]
-        
-        # 현재 가격
-        current_price = df['close'].iloc[-1]
-        
-        # 볼린저 밴드 계산
-        bb_period = 20
-        bb_std = 2
-        bb_ma = df['close'].rolling(window=bb_period).mean().iloc[-1]
-        bb_std_val = df['close'].rolling(window=bb_period).std().iloc[-1]
-        bb_upper = bb_ma + (bb_std_val * bb_std)
-        bb_lower = bb_ma - (bb_std_val * bb_std)
-        
-        return {
-            'rsi': float(rsi) if not pd.isna(rsi) else 50.0,
-            'ma5': float(ma5) if not pd.isna(ma5) else current_price,
-            'ma20': float(ma20) if not pd.isna(ma20) else current_price,
-            'current_price': float(current_price),
-            'bb_upper': float(bb_upper) if not pd.isna(bb_upper) else current_price * 1.02,
-            'bb_lower': float(bb_lower) if not pd.isna(bb_lower) else current_price * 0.98,
-            'volume': float(df['volume'].iloc[-1]) if 'volume' in df.columns else 0
-        }
-    except Exception as e:
-        print(f"    ⚠️ 기술적 지표 계산 오류: {e}")
+    initial_balance = backtest_config.get('initial_balance', 1000000)
+    monte_carlo = MonteCarloBacktest(market, first, engine.strategy, initial_balance,
+                                     method=mc_config.get('method', 'block'),
+                                     block_size=mc_config.get('block_size', 10),
+                                     max_delay=mc_config.get('max_delay', 0),
+                                     ruin_level=mc_config.get('ruin_level', 0.5),
+                                     workers=mc_config.get('workers') or None,
+                                     chunk_size=mc_config.get('chunk_size', 500))
+    result = monte_carlo.run(mc_config.get('paths', 10000), mc_config.get('seed'))
+    summary = result['summary']
+    
+    print(f"\n🎲 몬테카를로 결과 ({summary['paths']:,}개 경로)")
+    print("=" * 60)
+    for key, label, sign in (('final_return', '최종 수익률', '+'), ('max_drawdown', '최대 낙폭', '')):
+        dist = summary[key]
+        print(f"  {label}: 평균 {dist['mean']:{sign}.2f}% | 5% {dist['p5']:{sign}.2f}% | "
+              f"중앙 {dist['p50']:{sign}.2f}% | 95% {dist['p95']:{sign}.2f}%")
+    print(f"  손실 확률: {summary['loss_probability']:.1f}% | "
+          f"파산 확률 (-{summary['ruin_level'] * 100:.0f}% 도달): {summary['ruin_probability']:.2f}%")
+    historical = summary['historical']
+    print(f"  실제 경로: 수익률 {historical['final_return']:+.2f}% (분포 상위 {100 - historical['return_percentile']:.0f}%) | "
+          f"최대 낙폭 {historical['max_drawdown']:.2f}%")
+    
+    output_dir = mc_config.get('output_dir', 'log')
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    save_report(summary, os.path.join(output_dir, f"montecarlo_{stamp}.json"))
+    os.makedirs(output_dir, exist_ok=True)
+    result['paths'].to_csv(os.path.join(output_dir, f"montecarlo_paths_{stamp}.csv"), index=False, encoding='utf-8-sig')
+    print(f"💾 몬테카를로 결과 저장: {output_dir}/montecarlo_*{stamp}.*")
+    return result
+
+def run_trend_backtest():
+    """신규/트렌드 코인 전략 전 종목 백테스트 - 시점별 거래대금/변동률 순위 복원 + 진입 필터/보유 한도/분할 익절 재현"""
+    trend_config = CONFIG.get('trend_backtest', {})
+    backtest_config = CONFIG.get('backtest', {})
+    store = CandleStore(backtest_config.get('candle_store_dir', 'candles'))
+    days = trend_config.get('days', 365)
+    
+    # 유니버스: 현재 KRW 마켓 + 저장소 티커 (과거 동기화된 상장폐지 종목 포함)
+    tickers = set(store.tickers('minute60'))
+    if trend_config.get('sync_universe', True):
+        listed = pyupbit.get_tickers(fiat="KRW") or []
+        required = (days + 8) * 24
+        print(f"📦 KRW 마켓 {len(listed)}개 1시간 캔들 확보 중 ({required}개)...")
+        for ticker in listed:
+            if store.ensure(ticker, 'minute60', required):
+                tickers.add(ticker)
+            else:
+                print(f"  ❌ {ticker} 캔들 데이터 없음")
+    if not tickers:
+        print("❌ 백테스트 유니버스 없음")
         return None
-
-def convert_portfolio_data_to_summary(portfolio_data):
-    """포트폴리오 데이터를 AI 신호 생성용 summary 형태로 변환"""
-    portfolio_summary = {'coins': {}}
     
-    for coin, timeframes in portfolio_data.items():
-        if 'day' in timeframes:
-            indicators = calculate_technical_indicators(timeframes['day'])
-            if indicators:
-                portfolio_summary['coins'][coin] = indicators
-                print(f"    📊 {coin} 지표: RSI={indicators['rsi']:.1f}, MA5={indicators['ma5']:.0f}, MA20={indicators['ma20']:.0f}")
+    engine = TrendCoinBacktest.from_config(store, sorted(tickers), CONFIG, PORTFOLIO_COINS)
+    results = engine.run(days, backtest_config.get('initial_balance', 1000000), trend_config.get('segments') or None)
+    if not results or not results['daily_balance']:
+        print("❌ 백테스트 데이터 부족")
+        return None
     
-    return portfolio_summary
-
-def generate_backtest_signals(portfolio_data):
-    """백테스트용 AI 신호 생성 (API 호출 없이 로컬 로직)"""
-    # 포트폴리오 데이터를 summary 형태로 변환
-    portfolio_summary = convert_portfolio_data_to_summary(portfolio_data)
-    signals = {}
+    print(f"📅 백테스트 기간: {results['daily_balance'][0]['date']} ~ {results['daily_balance'][-1]['date']} "
+          f"({results['simulated_days']}일, 유니버스 {results['universe']}개, 구간 {results['segments']}개)")
+    coins = results['coins']
+    if not coins.empty:
+        print(f"\n🪙 코인별 결과 (실현 손익 상위/하위, 총 {len(coins)}개)")
+        for _, row in pd.concat([coins.head(5), coins.tail(5)]).drop_duplicates('coin').iterrows():
+            print(f"  {row['coin']}: 진입 {int(row['entries'])}회 | 실현 {row['realized_pnl']:+,.0f}원 "
+                  f"({row['return']:+.2f}%) | 승률 {row['win_rate']:.0f}%")
+        output_dir = trend_config.get('output_dir', 'log')
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"trend_backtest_coins_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        coins.to_csv(path, index=False, encoding='utf-8-sig')
+        print(f"💾 코인별 결과 저장: {path}")
+    
+    analyze_backtest_results(results, 'trend')
+    return results
+
+def run_event_backtest(days_back=30, initial_balance=1000000):
+    """이벤트 기반 백테스트 - 실거래 매매 함수를 가상 시계 + 모의 거래소 + 로컬 캔들로 재생"""
+    print("📊 이벤트 기반 백테스트 시작! (실거래 매매 경로 재생)")
+    print("=" * 60)
     
-    for coin, data in portfolio_summary.get('coins', {}).items():
-        rsi = data.get('rsi', 50)
-        ma5 = data.get('ma5', 0)
-        ma20 = data.get('ma20', 0)
-        current_price = data.get('current_price', 0)
-        bb_upper = data.get('bb_upper', current_price * 1.02)
-        bb_lower = data.get('bb_lower', current_price * 0.98)
-        
-        # 더 균형잡힌 매수/매도 신호 생성 (코인별 다양성 고려)
-        buy_signals = 0
-        sell_signals = 0
-        
-        # RSI 신호 (더 보수적으로 조정하여 품질 높은 신호만 생성)
-        if rsi < 25:  # 강한 과매도
-            buy_signals += 3
-        elif rsi < 35:  # 과매도
-            buy_signals += 2
-        elif rsi < 40:  # 약한 매수
-            buy_signals += 1
-        elif rsi > 75:  # 강한 과매수
-            sell_signals += 3  
-        elif rsi > 65:  # 과매수
-            sell_signals += 2
-        elif rsi > 60:  # 약한 매도
-            sell_signals += 1
-        
-        # 이동평균 신호 (트렌드 기반)
-        if current_price > ma5:  # 단기 상승
-            buy_signals += 1
-        elif current_price < ma5:  # 단기 하락
-            sell_signals += 1
-            
-        if ma5 > ma20:  # 중기 상승 트렌드
-            buy_signals += 1
-        elif ma5 < ma20:  # 중기 하락 트렌드
-            sell_signals += 1
-        
-        # 볼린저 밴드 신호 (변동성 기반)
-        if current_price <= bb_lower * 1.02:  # 하단 근처
-            buy_signals += 1
-        elif current_price >= bb_upper * 0.98:  # 상단 근처
-            sell_signals += 1
-        
-        # 가격 모멘텀 기반 신호 (완화)
-        price_change = (current_price - ma20) / ma20 * 100
-        if price_change < -3:  # 3% 이상 하락
-            buy_signals += 1
-        elif price_change > 3:  # 3% 이상 상승
-            sell_signals += 1
-        
-        # 코인별 특성 고려 (다양화를 위해)
-        coin_factor = hash(coin) % 3  # 코인별 고유 factor
-        if coin_factor == 0:  # BTC류 - 보수적
-            threshold_buy = 3
-            threshold_sell = 2
-        elif coin_factor == 1:  # ETH류 - 중간
-            threshold_buy = 2
-            threshold_sell = 2
-        else:  # ALT류 - 적극적
-            threshold_buy = 2
-            threshold_sell = 2
-        
-        # 신호 결정 (더 다양한 신호 생성)
-        if buy_signals >= threshold_buy:
-            signal = 'BUY'
-            confidence = min(0.85, 0.65 + buy_signals * 0.05)
-        elif sell_signals >= threshold_sell:
-            signal = 'SELL'
-            confidence = min(0.85, 0.65 + sell_signals * 0.05)
-        else:
-            signal = 'HOLD'
-            confidence = 0.5
-        
-        signals[coin] = {
-            'signal': signal,
-            'confidence': confidence,
-            'reason': f'RSI: {rsi:.1f}, MA추세: {ma5 > ma20}, 매수신호: {buy_signals}, 매도신호: {sell_signals}'
-        }
-        
-        print(f"    🤖 {coin} AI신호: {signal} (신뢰도: {confidence:.1f}) - {signals[coin]['reason']}")
+    backtest_config = CONFIG.get('backtest', {})
+    store = CandleStore(backtest_config.get('candle_store_dir', 'candles'))
+    base_interval = backtest_config.get('event_base_interval', 'minute60')
     
-    return signals
-
-def analyze_backtest_results(results):
-    """백테스트 결과 분석 및 출력"""
-    initial = results['initial_balance']
-    final = results['daily_balance'][-1]['balance'] if results['daily_balance'] else initial
+    # 기준 주기 캔들 확보 (기간 + 일봉 지표 여유분, 이후 재생 중 네트워크 조회 없음)
+    required = (days_back + DATA_PERIOD + 1) * 86400 // INTERVAL_SECONDS[base_interval]
+    for ticker in PORTFOLIO_COINS:
+        if not store.ensure(ticker, base_interval, required):
+            print(f"  ❌ {ticker} 캔들 데이터 없음")
+    print(f"📦 신규코인 후보: 저장소 {base_interval} 티커 {len(store.tickers(base_interval))}개")
+    
+    reset_trading_state()
+    results = create_event_backtest(store, initial_balance).run(days_back)
+    if not results or not results['daily_balance']:
+        print("❌ 백테스트 데이터 부족")
+        return None
     
-    total_return = (final - initial) / initial * 100
-    total_trades = results['total_trades']
-    max_drawdown = results['max_drawdown']
+    print(f"📅 백테스트 기간: {results['daily_balance'][0]['date']} ~ {results['daily_balance'][-1]['date']} "
+          f"({results['simulated_days']:.0f}일, {results['elapsed']:.1f}초, {results['days_per_second']:.1f}일/초)")
+    print(f"🔁 실행 횟수: 포트폴리오 {results['cycles']['portfolio']}회 | 신규코인 {results['cycles']['trend']}회 | "
+          f"오류 {len(results['errors'])}건")
+    for error in results['errors'][:5]:
+        print(f"  ⚠️ {error['time']} [{error['handler']}] {error['error']}")
     
-    # 승률 계산 (간단한 버전)
-    winning_trades = len([t for t in results['trades'] if t['type'] == 'SELL'])
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    analyze_backtest_results(results, 'event')
+    return results
+
+def analyze_backtest_results(results, label="backtest"):
+    """백테스트 결과 분석 및 출력 - 성과 지표 계산 후 JSON 저장 + 실행 비교 CSV에 추가"""
+    report = performance_report(results)
     
     print(f"\n📊 백테스트 결과 분석")
     print("=" * 40)
-    print(f"초기 자본: {initial:,.0f}원")
-    print(f"최종 자본: {final:,.0f}원")
-    print(f"총 수익률: {total_return:+.2f}%")
-    print(f"최대 손실률: {max_drawdown:.2f}%")
-    print(f"총 거래 횟수: {total_trades}회")
-    print(f"대략적 승률: {win_rate:.1f}%")
-    
-    # 일별 수익률 그래프 (텍스트 버전)
-    print(f"\n📈 일별 수익률 추이:")
-    for record in results['daily_balance'][-10:]:  # 마지막 10일만 출력
-        daily_return = (record['balance'] - initial) / initial * 100
-        bar_length = max(0, min(20, int(abs(daily_return))))
-        bar = "█" * bar_length
-        print(f"{record['date']}: {daily_return:+6.2f}% {bar}")
-
-def reload_config():
-    """설정을 다시 로드합니다."""
-    global CONFIG, PORTFOLIO_COINS, BASE_TRADE_RATIO, STOP_LOSS_PERCENT, MIN_TRADE_AMOUNT
-    global RSI_OVERSOLD, RSI_OVERBOUGHT, FEAR_GREED_EXTREME_FEAR, FEAR_GREED_EXTREME_GREED
+    print(f"초기 자본: {report['initial_balance']:,.0f}원")
+    print(f"최종 자본: {report['final_balance']:,.0f}원")
+    print(f"총 수익률: {report['total_return']:+.2f}% (연환산 {report['cagr']:+.2f}%)")
+    print(f"최대 손실률: {report['max_drawdown']:.2f}% (최장 {report['max_drawdown_duration']:.0f}일 미회복)")
+    print(f"샤프 / 소르티노 / 칼마: {report['sharpe']:.2f} / {report['sortino']:.2f} / {report['calmar']:.2f}")
+    print(f"총 거래 횟수: {report['trades']}회 (왕복 {report['round_trips']}회)")
+    print(f"승률 (FIFO 왕복): {report['win_rate']:.1f}% | 손익비 {report['profit_factor']:.2f} | "
+          f"평균 수익 {report['avg_win']:+.2f}% / 평균 손실 {report['avg_loss']:+.2f}%")
+    print(f"회전율: 연 {report['turnover']:.1f}배 | 수수료 {report['fees']:,.0f}원 (연 {report['fee_drag']:.2f}% 부담)")
+    
+    report_dir = CONFIG.get('backtest', {}).get('report_dir', 'log')
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    save_report({'label': label, 'created_at': stamp, **report},
+                os.path.join(report_dir, f"backtest_report_{label}_{stamp}.json"))
+    append_reports_csv([{'label': label, 'created_at': stamp, **report}], os.path.join(report_dir, "backtest_reports.csv"))
+    print(f"💾 성과 지표 저장: {report_dir}/backtest_report_{label}_{stamp}.json (비교: backtest_reports.csv)")
+    return report
+
+def apply_config(config):
+    """설정 dict를 전역 상수에 반영 (설정 재로드 / 파라미터 탐색 백테스트에서 사용)"""
+    global CONFIG, PORTFOLIO_COINS, TARGET_ALLOCATION, BASE_TRADE_RATIO, STOP_LOSS_PERCENT, MIN_TRADE_AMOUNT
+    global MAX_POSITION_MULTIPLIER, MAX_SLIPPAGE, RSI_OVERSOLD, RSI_OVERBOUGHT, FEAR_GREED_EXTREME_FEAR, FEAR_GREED_EXTREME_GREED
     global DATA_PERIOD, CACHE_FILE, CACHE_DURATION, BULL_MARKET_THRESHOLD, BEAR_MARKET_THRESHOLD
-    global MIN_CASH_RATIO, MAX_PORTFOLIO_CONCENTRATION
+    global MIN_CASH_RATIO, MAX_PORTFOLIO_CONCENTRATION, BEAR_MARKET_CASH_RATIO, TREND_INVEST_RATIO
+    global BULL_MARKET_MULTIPLIER, BULL_OVERHEATED_MULTIPLIER, BEAR_MARKET_MULTIPLIER, BEAR_OVERSOLD_MULTIPLIER
+    global HIGH_VOLATILITY_MULTIPLIER, MAX_SINGLE_COIN_RATIO, AI_CONFIDENCE_MINIMUM, PRICE_CHANGE_THRESHOLD
+    global REBALANCING_DEVIATION_THRESHOLD, CHECK_INTERVALS, HIGH_VOLATILITY_THRESHOLD
     
-    CONFIG = load_config()
+    CONFIG = config
     
     # 상수들 업데이트
     PORTFOLIO_COINS = CONFIG["coins"]["list"]
     TARGET_ALLOCATION = CONFIG["coins"]["target_allocation"]
+    TREND_INVEST_RATIO = CONFIG["coins"].get("trend_coin_ratio", 0.15)
     BASE_TRADE_RATIO = CONFIG["trading"]["base_trade_ratio"]
     STOP_LOSS_PERCENT = CONFIG["trading"]["stop_loss_percent"]
     MIN_TRADE_AMOUNT = CONFIG["trading"]["min_trade_amount"]
+    MAX_POSITION_MULTIPLIER = CONFIG["trading"].get("max_position_multiplier", MAX_POSITION_MULTIPLIER)
+    MAX_SLIPPAGE = CONFIG["trading"].get("max_slippage", 0.005)
     RSI_OVERSOLD = CONFIG["technical_analysis"]["rsi_oversold"]
     RSI_OVERBOUGHT = CONFIG["technical_analysis"]["rsi_overbought"]
     FEAR_GREED_EXTREME_FEAR = CONFIG["market_conditions"]["fear_greed_extreme_fear"]
@@ -2705,9 +2512,30 @@ def reload_config():
     CACHE_DURATION = CONFIG["cache"]["cache_duration_hours"] * 60 * 60
     BULL_MARKET_THRESHOLD = CONFIG["market_conditions"]["bull_market_threshold"]
     BEAR_MARKET_THRESHOLD = CONFIG["market_conditions"]["bear_market_threshold"]
+    HIGH_VOLATILITY_THRESHOLD = CONFIG["market_conditions"].get("high_volatility_threshold", HIGH_VOLATILITY_THRESHOLD)
     MIN_CASH_RATIO = CONFIG["safety"]["min_cash_ratio"]
     MAX_PORTFOLIO_CONCENTRATION = CONFIG["safety"]["max_portfolio_concentration"]
+    BEAR_MARKET_CASH_RATIO = CONFIG["safety"].get("bear_market_cash_ratio", 0.50)
+    REBALANCING_DEVIATION_THRESHOLD = CONFIG["safety"].get("rebalancing_deviation_threshold", REBALANCING_DEVIATION_THRESHOLD)
+    
+    risk_management = CONFIG.get("risk_management", {})
+    BULL_MARKET_MULTIPLIER = risk_management.get("bull_market_multiplier", BULL_MARKET_MULTIPLIER)
+    BULL_OVERHEATED_MULTIPLIER = risk_management.get("bull_overheated_multiplier", BULL_OVERHEATED_MULTIPLIER)
+    BEAR_MARKET_MULTIPLIER = risk_management.get("bear_market_multiplier", BEAR_MARKET_MULTIPLIER)
+    BEAR_OVERSOLD_MULTIPLIER = risk_management.get("bear_oversold_multiplier", BEAR_OVERSOLD_MULTIPLIER)
+    HIGH_VOLATILITY_MULTIPLIER = risk_management.get("high_volatility_multiplier", HIGH_VOLATILITY_MULTIPLIER)
+    
+    trading_constraints = CONFIG.get("trading_constraints", {})
+    MAX_SINGLE_COIN_RATIO = trading_constraints.get("max_single_coin_ratio", MAX_SINGLE_COIN_RATIO)
+    AI_CONFIDENCE_MINIMUM = trading_constraints.get("ai_confidence_minimum", AI_CONFIDENCE_MINIMUM)
+    PRICE_CHANGE_THRESHOLD = trading_constraints.get("price_change_threshold", PRICE_CHANGE_THRESHOLD)
+    
     CHECK_INTERVALS = CONFIG["check_intervals"]
+
+def reload_config():
+    """설정을 다시 로드합니다."""
+    apply_config(load_config())
+    ai_cost_ledger.configure(CONFIG.get('ai_budget', {}))
     
     logging.info("설정이 다시 로드되었습니다.")
 
@@ -2727,6 +2555,29 @@ if __name__ == "__main__":
             print(f"🧪 백테스트 모드: {days}일간, 초기자본 {initial:,}원")
             run_backtest(days_back=days, initial_balance=initial)
             
+        elif mode == "backtest-event":
+            # 이벤트 기반 백테스트 (실거래 매매 함수 재생)
+            days = int(sys.argv[2]) if len(sys.argv) > 2 else (config.get("backtest", {}).get("default_days", 30) if config else 30)
+            initial = config.get("backtest", {}).get("initial_balance", 1000000) if config else 1000000
+            print(f"🧪 이벤트 백테스트 모드: {days}일간, 초기자본 {initial:,}원")
+            run_event_backtest(days_back=days, initial_balance=initial)
+            
+        elif mode == "sweep":
+            # 병렬 파라미터 탐색 (config.json sweep 섹션)
+            run_parameter_sweep()
+            
+        elif mode == "walk-forward":
+            # 워크포워드 최적화 (config.json walk_forward 섹션)
+            run_walk_forward()
+            
+        elif mode == "monte-carlo":
+            # 몬테카를로 강건성 검증 (config.json monte_carlo 섹션)
+            run_monte_carlo()
+            
+        elif mode == "trend-backtest":
+            # 신규/트렌드 코인 전략 전 종목 백테스트 (config.json trend_backtest 섹션)
+            run_trend_backtest()
+            
         elif mode == "config":
             # 설정 확인 모드
             if config:
@@ -2736,13 +2587,21 @@ if __name__ == "__main__":
                 print("❌ 설정 파일을 로드할 수 없습니다.")
                 
         elif mode == "dry-run":
-            # 모의 실행 모드 (실제 거래 없이 신호만 확인)
+            # 모의 실행 모드 (실제 주문 대신 로컬 모의 거래소로 체결)
             print("🧪 모의 실행 모드 (실제 거래 없음)")
-            # TODO: dry-run 모드 구현
+            run_trading_bot(dry_run=True)
+            
+        elif mode == "emergency-reset":
+            # 비상 정지 해제 (저장된 정지 상태 초기화)
+            emergency_system.configure(CONFIG.get('emergency_stop', {}), state_file=EMERGENCY_STATE_FILE)
+            if emergency_system.is_stopped:
+                emergency_system.reset("수동 리셋 (emergency-reset)")
+            else:
+                print("✅ 비상 정지 상태가 아닙니다.")
             
         else:
             print("❌ 알 수 없는 모드입니다.")
-            print("사용법: python mvp.py [backtest|config|dry-run]")
+            print("사용법: python mvp.py [backtest|backtest-event [일수]|sweep|walk-forward|monte-carlo|trend-backtest|config|dry-run|emergency-reset]")
     else:
         # 실제 거래 모드
         print("🚀 실제 거래 모드 - 상세 데이터 수집 활성화")
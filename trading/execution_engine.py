@@ -0,0 +1,236 @@
+"""
+주문 실행 엔진 (비동기 체결 추적)
+- 주문 제출 후 uuid로 추적
+- 미체결 주문 전체를 한 라운드씩 일괄 폴링 (get_order)
+- 실제 체결가/체결량/수수료 반환 → 고정 대기(time.sleep) 및 호가 재조회 추정 제거
+"""
+
+import math
+import time
+import logging
+from utils.emergency_stop import emergency_system
+
+
+# 주문 종료 상태 (시장가 매수는 잔여 금액 반환으로 'cancel' 상태로 종료될 수 있음)
+FINAL_ORDER_STATES = ('done', 'cancel')
+
+
+def parse_order_fill(order):
+    """
+    get_order 응답에서 체결 정보 추출
+
+    Args:
+        order: 업비트 개별 주문 조회 응답 dict
+
+    Returns:
+        dict: {'state', 'executed_volume', 'avg_price', 'funds', 'paid_fee', 'unknown'}
+              (체결이 있으나 trades가 없으면 unknown=True, 체결가/금액은 0 - 주문 price는 시장가 매수 시
+               KRW 금액이므로 체결가로 추정하지 않음)
+    """
+    trades = order.get('trades') or []
+    volume = sum(float(t.get('volume', 0)) for t in trades)
+    funds = sum(float(t.get('funds', 0)) for t in trades)
+
+    unknown = False
+    if volume <= 0:
+        volume = float(order.get('executed_volume') or 0)
+        unknown = volume > 0
+    avg_price = funds / volume if volume > 0 and funds > 0 else 0.0
+
+    return {
+        'state': order.get('state'),
+        'executed_volume': volume,
+        'avg_price': avg_price,
+        'funds': funds,
+        'paid_fee': float(order.get('paid_fee') or 0),
+        'unknown': unknown
+    }
+
+
+class OrderExecutionEngine:
+    """주문 제출 + uuid 기반 체결 추적"""
+
+    def __init__(self, upbit, poll_interval=0.5, fill_timeout=15, guard=emergency_system):
+        """
+        Args:
+            upbit: Upbit 객체 (또는 동일 인터페이스의 모의 거래소)
+            poll_interval: 체결 조회 간격 (초)
+            fill_timeout: 체결 대기 최대 시간 (초)
+            guard: 비상 정지 시스템 (정지 중이면 매수 거부 - 매도는 허용, None이면 확인 생략 - 긴급 청산용)
+        """
+        self.upbit = upbit
+        self.poll_interval = poll_interval
+        self.fill_timeout = fill_timeout
+        self.guard = guard
+        self.pending = {}  # uuid → 주문 정보
+
+    def submit(self, ticker, side, amount, price=None):
+        """
+        주문 제출 (체결 대기 없음)
+
+        Args:
+            ticker: 티커 (예: "KRW-BTC")
+            side: 'buy' (amount = KRW 금액) 또는 'sell' (amount = 수량)
+            amount: 주문 금액/수량
+            price: 지정가 (None이면 시장가)
+
+        Returns:
+            str: 주문 uuid (실패 시 None)
+        """
+        if self.guard is not None and not self.guard.can_submit(side):
+            logging.warning(f"ORDER_BLOCKED - {ticker} {side} {amount}: 비상 정지 중 매수 차단 ({self.guard.stop_reason})")
+            return None
+
+        try:
+            if side == 'buy':
+                if price:
+                    volume = math.floor(amount / price * 1e8) / 1e8  # 소수점 8자리 (초과 주문 방지)
+                    result = self.upbit.buy_limit_order(ticker, price, volume)
+                else:
+                    result = self.upbit.buy_market_order(ticker, amount)
+            else:
+                if price:
+                    result = self.upbit.sell_limit_order(ticker, price, amount)
+                else:
+                    result = self.upbit.sell_market_order(ticker, amount)
+        except Exception as e:
+            logging.error(f"ORDER_SUBMIT_ERROR - {ticker} {side}: {e}")
+            self._report_outcome(False)
+            return None
+
+        if not isinstance(result, dict) or 'uuid' not in result:
+            logging.error(f"ORDER_SUBMIT_FAILED - {ticker} {side}: {result}")
+            self._report_outcome(False)
+            return None
+        if price:
+            self._report_outcome(True)  # 시장가는 체결 확인 시점에 판정
+
+        uuid = result['uuid']
+        self.pending[uuid] = {
+            'uuid': uuid,
+            'ticker': ticker,
+            'side': side,
+            'requested': amount,
+            'price': price,
+            'submitted_at': time.time()
+        }
+        logging.info(f"ORDER_SUBMITTED - {ticker} {side} {amount} (uuid: {uuid})")
+        return uuid
+
+    def wait_for_fills(self, uuids=None, timeout=None):
+        """
+        주문 체결 대기 (미체결 주문 전체를 라운드마다 일괄 조회)
+
+        Args:
+            uuids: 대기할 uuid 리스트 (None이면 전체 미체결)
+            timeout: 최대 대기 시간 (None이면 기본값)
+
+        Returns:
+            dict: uuid → 체결 정보 dict ('filled' = 종료 상태 도달 여부)
+        """
+        targets = [u for u in (uuids if uuids is not None else list(self.pending)) if u]
+        timeout = self.fill_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        fills = {}
+
+        while targets:
+            still_open = []
+            for uuid in targets:
+                try:
+                    order = self.upbit.get_order(uuid)
+                except Exception as e:
+                    logging.debug(f"주문 조회 실패 ({uuid}): {e}")
+                    order = None
+
+                if isinstance(order, dict) and order.get('state') in FINAL_ORDER_STATES:
+                    fills[uuid] = self._finalize(uuid, self._with_trades(uuid, order))
+                else:
+                    still_open.append(uuid)
+
+            targets = still_open
+            if not targets or time.time() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+
+        # 타임아웃: 마지막 조회 기준 부분 체결 정보 반환
+        for uuid in targets:
+            order = None
+            try:
+                order = self.upbit.get_order(uuid)
+            except Exception:
+                pass
+            fill = self._finalize(uuid, order if isinstance(order, dict) else {}, keep_pending=True)
+            fill['filled'] = False
+            fills[uuid] = fill
+            logging.warning(f"ORDER_FILL_TIMEOUT - {fill['ticker']} {fill['side']} (uuid: {uuid})")
+
+        return fills
+
+    def _report_outcome(self, success):
+        """주문 제출/시장가 체결 결과를 비상 정지 연속 실패 감지에 반영 (guard 없으면 생략)"""
+        if self.guard is not None:
+            self.guard.check_consecutive_failures(success)
+
+    def _with_trades(self, uuid, order, attempts=3):
+        """체결이 있는데 trades가 비어 있으면 get_order 재조회 (체결 내역 반영 지연 대응)"""
+        for _ in range(attempts):
+            if order.get('trades') or float(order.get('executed_volume') or 0) <= 0:
+                return order
+            time.sleep(self.poll_interval)
+            try:
+                requeried = self.upbit.get_order(uuid)
+            except Exception as e:
+                logging.debug(f"주문 재조회 실패 ({uuid}): {e}")
+                continue
+            if isinstance(requeried, dict):
+                order = requeried
+        if not order.get('trades') and float(order.get('executed_volume') or 0) > 0:
+            logging.warning(f"ORDER_FILL_UNKNOWN - {order.get('market')} (uuid: {uuid}): "
+                            f"체결 내역(trades) 없음 - 체결가 미확정")
+        return order
+
+    def _finalize(self, uuid, order, keep_pending=False):
+        info = self.pending.get(uuid, {}) if keep_pending else self.pending.pop(uuid, {})
+        fill = parse_order_fill(order)
+        fill.update({
+            'uuid': uuid,
+            'ticker': info.get('ticker', order.get('market')),
+            'side': info.get('side', 'buy' if order.get('side') == 'bid' else 'sell'),
+            'requested': info.get('requested'),
+            'filled': fill['state'] in FINAL_ORDER_STATES and fill['executed_volume'] > 0 and not fill['unknown'],
+            'latency': time.time() - info['submitted_at'] if info else None
+        })
+        if info and not info.get('price') and (fill['state'] in FINAL_ORDER_STATES or keep_pending):
+            # 시장가 주문이 체결 없이 종료/타임아웃되면 실패로 집계
+            self._report_outcome(fill['executed_volume'] > 0)
+        return fill
+
+    def execute(self, ticker, side, amount, price=None, timeout=None):
+        """
+        주문 제출 후 체결까지 대기
+
+        Returns:
+            dict: 체결 정보 (주문 실패 시 None)
+        """
+        uuid = self.submit(ticker, side, amount, price)
+        if not uuid:
+            return None
+        return self.wait_for_fills([uuid], timeout).get(uuid)
+
+    def execute_market(self, ticker, side, amount):
+        """시장가 실행 (RestingOrderManager와 동일 인터페이스)"""
+        return self.execute(ticker, side, amount)
+
+    def execute_batch(self, orders, timeout=None):
+        """
+        여러 주문을 연속 제출 후 한 번에 체결 대기
+
+        Args:
+            orders: [(ticker, side, amount), ...]
+
+        Returns:
+            list: 주문 순서대로 체결 정보 (실패 시 None)
+        """
+        uuids = [self.submit(ticker, side, amount) for ticker, side, amount in orders]
+        fills = self.wait_for_fills([u for u in uuids if u], timeout)
+        return [fills.get(u) if u else None for u in uuids]
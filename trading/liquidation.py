@@ -0,0 +1,181 @@
+"""
+긴급 전량 청산 실행기
+- 보유 코인 전체를 요청 한도(초당 주문 수) 내에서 동시 제출 → 체결 대기 1회
+- 평가금액이 크고 최근 변동폭이 큰 코인부터 제출
+- 상장폐지 코인 / 최소 주문금액 미만 잔량 제외, 미체결 주문 취소 후 매도
+- 체결 확인 후 잔여분은 1회 재시도
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from trading.execution_engine import OrderExecutionEngine
+from utils.delisted_coins import is_delisted
+from utils.api_helpers import get_krw_prices
+
+
+class LiquidationExecutor:
+    """보유 코인 병렬 우선순위 청산 (비상 정지 중에도 실행 - guard 확인 생략)"""
+
+    def __init__(self, upbit, min_order_krw=5000, orders_per_second=8, fill_timeout=10, max_workers=8):
+        """
+        Args:
+            upbit: Upbit 객체
+            min_order_krw: 최소 주문 금액 (미만 잔량은 매도 불가 - 제외)
+            orders_per_second: 초당 주문 제출 한도 (업비트 주문 API 요청 제한)
+            fill_timeout: 체결 대기 최대 시간 (초)
+            max_workers: 동시 제출 스레드 수
+        """
+        self.upbit = upbit
+        self.engine = OrderExecutionEngine(upbit, poll_interval=0.2, fill_timeout=fill_timeout, guard=None)
+        self.min_order_krw = min_order_krw
+        self.orders_per_second = orders_per_second
+        self.max_workers = max_workers
+
+    def _positions(self, price_windows=None):
+        """
+        청산 대상 포지션 (우선순위 순)
+
+        Args:
+            price_windows: {ticker: PriceWindow} (최근 변동폭 산출용, 없으면 평가금액만 사용)
+
+        Returns:
+            tuple: (positions, skipped)
+        """
+        holdings = {}
+        skipped = []
+        for balance in self.upbit.get_balances():
+            currency = balance['currency']
+            if currency == 'KRW':
+                continue
+            amount = float(balance['balance']) + float(balance.get('locked') or 0)
+            if amount <= 0:
+                continue
+            if is_delisted(currency):
+                skipped.append((f"KRW-{currency}", '상장폐지'))
+                continue
+            holdings[f"KRW-{currency}"] = {'balance': float(balance['balance']),
+                                            'locked': float(balance.get('locked') or 0)}
+
+        # KRW 마켓이 없는 보유 통화는 제외 (일괄 시세 조회 전체 실패 방지)
+        prices, unlisted = get_krw_prices(holdings) if holdings else ({}, [])
+        for ticker in unlisted:
+            skipped.append((ticker, 'KRW 마켓 없음'))
+            holdings.pop(ticker)
+
+        positions = []
+        for ticker, holding in holdings.items():
+            price = prices.get(ticker)
+            if not price:
+                skipped.append((ticker, '시세 없음'))
+                continue
+            value = (holding['balance'] + holding['locked']) * price
+            if value < self.min_order_krw:
+                skipped.append((ticker, f"소액 {value:,.0f}원"))
+                continue
+
+            # 최근 변동폭 (윈도우 고점-저점 / 고점) 만큼 우선순위 가중
+            window = (price_windows or {}).get(ticker)
+            price_range = (window.peak - window.trough) / window.peak if window and window.peak else 0
+            positions.append({'ticker': ticker, 'price': price, 'value': value,
+                              'range': price_range, **holding})
+
+        positions.sort(key=lambda p: p['value'] * (1 + p['range']), reverse=True)
+        return positions, skipped
+
+    def _release_locked(self, position):
+        """지정가 대기 주문 취소 (잠긴 수량을 매도 가능하게)"""
+        if position['locked'] <= 0:
+            return position['balance']
+        try:
+            for order in self.upbit.get_order(position['ticker'], state='wait') or []:
+                self.upbit.cancel_order(order['uuid'])
+            time.sleep(0.2)
+            return self.upbit.get_balance(position['ticker'])
+        except Exception as e:
+            logging.warning(f"LIQUIDATION_CANCEL_ERROR - {position['ticker']}: {e}")
+            return position['balance']
+
+    def _submit_all(self, orders):
+        """초당 한도 단위로 나누어 동시 제출 → uuid 목록 (주문 순서 유지)"""
+        uuids = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Liquidation") as executor:
+            for start in range(0, len(orders), self.orders_per_second):
+                wave_started = time.time()
+                wave = orders[start:start + self.orders_per_second]
+                uuids += list(executor.map(lambda o: self.engine.submit(o[0], 'sell', o[1]), wave))
+                if start + self.orders_per_second < len(orders):
+                    time.sleep(max(0.0, 1.0 - (time.time() - wave_started)))
+        return uuids
+
+    def liquidate_all(self, price_windows=None):
+        """
+        전량 청산 실행
+
+        Args:
+            price_windows: {ticker: PriceWindow} (우선순위 변동폭 가중)
+
+        Returns:
+            dict: {'sold': [체결 정보], 'failed': [ticker], 'skipped': [(ticker, 사유)],
+                   'proceeds': 매도 대금 (수수료 차감), 'estimated': 추정 포함 여부, 'elapsed': 소요 시간}
+                  (체결 내역이 없는 체결은 청산 전 시세로 대금을 추정하고 평균가 계산에서 제외)
+        """
+        started = time.time()
+        positions, skipped = self._positions(price_windows)
+        for ticker, reason in skipped:
+            print(f"  ⏭️ {ticker} 청산 제외 ({reason})")
+
+        if not positions:
+            return {'sold': [], 'failed': [], 'skipped': skipped, 'proceeds': 0, 'estimated': False, 'elapsed': time.time() - started}
+
+        # 잠긴 수량 해제 (대기 주문이 있는 코인만, 병렬)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Liquidation") as executor:
+            volumes = list(executor.map(self._release_locked, positions))
+
+        fills = {}
+        remaining = {p['ticker']: volume for p, volume in zip(positions, volumes)}
+        for attempt in range(2):
+            orders = [(p['ticker'], remaining[p['ticker']]) for p in positions
+                      if remaining.get(p['ticker'], 0) * p['price'] >= self.min_order_krw]
+            if not orders:
+                break
+            if attempt > 0:
+                print(f"  🔁 잔여분 재청산 {len(orders)}건")
+
+            uuids = self._submit_all(orders)
+            results = self.engine.wait_for_fills([u for u in uuids if u])
+            for (ticker, volume), uuid in zip(orders, uuids):
+                fill = results.get(uuid) if uuid else None
+                if fill and fill['executed_volume'] > 0:
+                    fills.setdefault(ticker, []).append(fill)
+                    remaining[ticker] = volume - fill['executed_volume']
+                else:
+                    remaining[ticker] = volume
+
+        sold, failed, proceeds, estimated = [], [], 0, False
+        for position in positions:
+            ticker = position['ticker']
+            ticker_fills = fills.get(ticker, [])
+            if ticker_fills:
+                volume = sum(f['executed_volume'] for f in ticker_fills)
+                known = [f for f in ticker_fills if not f['unknown']]
+                unknown_volume = volume - sum(f['executed_volume'] for f in known)
+                # 체결가 미확정분은 청산 전 시세로 추정 (평균가는 확정 체결만으로 계산)
+                funds = sum(f['funds'] for f in known) + unknown_volume * position['price'] \
+                    - sum(f['paid_fee'] for f in ticker_fills)
+                known_volume = volume - unknown_volume
+                avg_price = sum(f['funds'] for f in known) / known_volume if known_volume > 0 else position['price']
+                proceeds += funds
+                estimated = estimated or unknown_volume > 0
+                sold.append({'ticker': ticker, 'executed_volume': volume, 'proceeds': funds, 'avg_price': avg_price,
+                             'estimated': unknown_volume > 0})
+                print(f"  ✅ {ticker} 청산: {volume:.6f}개 → {funds:,.0f}원{' (추정)' if unknown_volume > 0 else ''}")
+            if remaining.get(ticker, 0) * position['price'] >= self.min_order_krw:
+                failed.append(ticker)
+                print(f"  ❌ {ticker} 청산 미완료 (잔여 {remaining[ticker]:.6f}개)")
+
+        elapsed = time.time() - started
+        logging.critical(f"LIQUIDATION - 청산 {len(sold)}건 | 실패 {len(failed)}건 | 제외 {len(skipped)}건 | "
+                         f"대금 {proceeds:,.0f}원{' (추정 포함)' if estimated else ''} | {elapsed:.1f}초")
+        return {'sold': sold, 'failed': failed, 'skipped': skipped, 'proceeds': proceeds, 'estimated': estimated,
+                'elapsed': elapsed}
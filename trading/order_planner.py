@@ -0,0 +1,189 @@
+"""
+사이클 단위 주문 계획기 (넷팅)
+- 각 리스크 단계는 주문 대신 목표 변화량(KRW)만 제안
+- 티커별로 제안을 넷팅(같은 방향은 최대값, 반대 방향은 상쇄)한 뒤 최소 주문금액/쿨다운 규칙을 한 번만 적용
+- 매도 먼저 체결 → 실제 가용 현금으로 매수 (최소 주문 수 = 최소 수수료/API 호출)
+"""
+
+import time
+import logging
+
+
+class OrderPlanner:
+    """티커별 목표 변화량 넷팅 후 최소 주문 집합 생성"""
+
+    def __init__(self, min_order_krw=5000, cooldowns=None, cooldown_seconds=0):
+        """
+        Args:
+            min_order_krw: 최소 주문 금액 (넷팅 후 이 금액 미만은 주문하지 않음)
+            cooldowns: 코인별 마지막 리밸런싱 시각 dict (공유 참조, 예: last_rebalance_time)
+            cooldown_seconds: 쿨다운 적용 제안의 재거래 금지 시간 (초)
+        """
+        self.min_order_krw = min_order_krw
+        self.cooldowns = cooldowns if cooldowns is not None else {}
+        self.cooldown_seconds = cooldown_seconds
+        self.proposals = []
+        self.planned = []
+
+    def propose(self, stage, ticker, delta_krw, price, reason='', sell_all=False, balance=None,
+                use_cooldown=False):
+        """
+        목표 변화량 제안 (주문하지 않음)
+
+        Args:
+            stage: 제안 단계명 (stop_loss, cash_shortage, concentration, rebalancing 등)
+            ticker: 티커 (예: "KRW-BTC")
+            delta_krw: 목표 변화량 (양수 = 매수, 음수 = 매도, 원)
+            price: 평가 가격 (매도 수량 환산용)
+            reason: 사유 (로그용)
+            sell_all: 전량 매도 (손절매 등 - 다른 제안보다 우선, 최소 금액 규칙 면제)
+            balance: 현재 보유 수량 (매도 수량 상한)
+            use_cooldown: 리밸런싱 쿨다운 적용 여부
+        """
+        self.proposals.append({
+            'stage': stage,
+            'ticker': ticker,
+            'delta_krw': delta_krw,
+            'price': price,
+            'reason': reason,
+            'sell_all': sell_all,
+            'balance': balance,
+            'use_cooldown': use_cooldown
+        })
+
+    def has_proposals(self):
+        return bool(self.proposals)
+
+    def _in_cooldown(self, coin):
+        last_time = self.cooldowns.get(coin)
+        return last_time is not None and time.time() - last_time < self.cooldown_seconds
+
+    def plan(self):
+        """
+        제안을 티커별로 넷팅하여 주문 목록 생성
+
+        Returns:
+            list: [{'ticker', 'side', 'krw', 'volume', 'price', 'sell_all', 'stages', 'use_cooldown'}, ...]
+                  (매도 먼저, 매수 나중)
+        """
+        by_ticker = {}
+        for proposal in self.proposals:
+            coin = proposal['ticker'].split('-')[1]
+            if proposal['use_cooldown'] and not proposal['sell_all'] and self._in_cooldown(coin):
+                remaining = (self.cooldown_seconds - (time.time() - self.cooldowns[coin])) / 3600
+                print(f"⏰ {coin} 리밸런싱 쿨다운 중 (남은 시간: {remaining:.1f}시간) - {proposal['stage']} 제안 제외")
+                continue
+            by_ticker.setdefault(proposal['ticker'], []).append(proposal)
+
+        orders = []
+        for ticker, proposals in by_ticker.items():
+            stages = [p['stage'] for p in proposals]
+            price = next((p['price'] for p in proposals if p['price']), 0)
+            balances = [p['balance'] for p in proposals if p['balance'] is not None]
+            balance = min(balances) if balances else None
+            use_cooldown = any(p['use_cooldown'] for p in proposals)
+
+            # 전량 매도 제안이 있으면 같은 티커의 다른 제안(매수 포함)은 무시
+            if any(p['sell_all'] for p in proposals):
+                if balance:
+                    orders.append({'ticker': ticker, 'side': 'sell', 'krw': balance * price, 'volume': balance,
+                                   'price': price, 'sell_all': True, 'stages': stages,
+                                   'use_cooldown': use_cooldown})
+                continue
+
+            # 같은 방향 제안은 동일 스냅샷 기준 목표치이므로 최대값만 채택, 반대 방향은 상쇄
+            sell_krw = max([-p['delta_krw'] for p in proposals if p['delta_krw'] < 0], default=0)
+            buy_krw = max([p['delta_krw'] for p in proposals if p['delta_krw'] > 0], default=0)
+            net_krw = buy_krw - sell_krw
+            if abs(net_krw) < self.min_order_krw:
+                if len(proposals) > 1 or net_krw:
+                    logging.info(f"ORDER_PLAN_NETTED - {ticker}: {stages} 순변화 {net_krw:,.0f}원 (주문 생략)")
+                continue
+
+            if net_krw < 0:
+                if not price:
+                    continue
+                volume = -net_krw / price
+                if balance is not None:
+                    volume = min(volume, balance)
+                orders.append({'ticker': ticker, 'side': 'sell', 'krw': volume * price, 'volume': volume,
+                               'price': price, 'sell_all': False, 'stages': stages,
+                               'use_cooldown': use_cooldown})
+            else:
+                orders.append({'ticker': ticker, 'side': 'buy', 'krw': net_krw, 'volume': None,
+                               'price': price, 'sell_all': False, 'stages': stages,
+                               'use_cooldown': use_cooldown})
+
+        orders.sort(key=lambda o: 0 if o['side'] == 'sell' else 1)
+        return orders
+
+    def execute(self, engine, slicer=None):
+        """
+        계획된 주문 실행 (매도 체결 확인 후 가용 현금 내에서 매수)
+
+        Args:
+            engine: OrderExecutionEngine
+            slicer: SlicingExecutor (지정 시 대형 주문은 호가 깊이 기준 분할 실행)
+
+        Returns:
+            list: 실행된 주문 (각 항목에 'fill' 포함, 넷팅/쿨다운 후 계획된 주문은 self.planned)
+        """
+        orders = self.plan()
+        self.planned = orders
+        if not orders:
+            self.proposals = []
+            return []
+
+        print(f"🧮 주문 계획: 제안 {len(self.proposals)}건 → 주문 {len(orders)}건")
+        logging.info(f"ORDER_PLAN - 제안 {len(self.proposals)}건 → 주문 {len(orders)}건: "
+                     f"{[(o['ticker'], o['side'], round(o['krw'])) for o in orders]}")
+
+        executed = []
+        sells = [o for o in orders if o['side'] == 'sell']
+        buys = [o for o in orders if o['side'] == 'buy']
+
+        # 1단계: 매도 실행 (전량 손절은 시장가 즉시, 대형 주문은 분할, 나머지는 일괄)
+        urgent = [o for o in sells if o['sell_all']]
+        sliced = [o for o in sells if not o['sell_all'] and slicer and slicer.needs_slicing(o['krw'])]
+        batched = [o for o in sells if o not in urgent and o not in sliced]
+        sell_fills = [engine.execute_market(o['ticker'], 'sell', o['volume']) for o in urgent]
+        sell_fills += engine.execute_batch([(o['ticker'], 'sell', o['volume']) for o in batched])
+        sell_fills += [slicer.execute(o['ticker'], 'sell', o['volume']) for o in sliced]
+        for order, fill in zip(urgent + batched + sliced, sell_fills):
+            coin = order['ticker'].split('-')[1]
+            if fill:
+                print(f"  ✅ {coin} 매도 ({'+'.join(order['stages'])}): {fill['executed_volume']:.6f} "
+                      f"@ {fill['avg_price']:,.0f}원")
+                order['fill'] = fill
+                executed.append(order)
+            else:
+                print(f"  ❌ {coin} 매도 실패 ({'+'.join(order['stages'])})")
+
+        # 2단계: 실제 가용 현금 내에서 매수
+        if buys:
+            available_krw = engine.upbit.get_balance("KRW")
+            for order in buys:
+                coin = order['ticker'].split('-')[1]
+                amount = min(order['krw'], available_krw * 0.9995)  # 수수료 여유
+                if amount < self.min_order_krw:
+                    print(f"  ⏸️ {coin} 매수 생략 - 가용 현금 부족 ({available_krw:,.0f}원)")
+                    continue
+                if slicer and slicer.needs_slicing(amount):
+                    fill = slicer.execute(order['ticker'], 'buy', amount)
+                else:
+                    fill = engine.execute(order['ticker'], 'buy', amount)
+                if fill:
+                    print(f"  ✅ {coin} 매수 ({'+'.join(order['stages'])}): {amount:,.0f}원")
+                    available_krw -= fill['funds'] + fill['paid_fee'] if fill['filled'] else amount
+                    order['fill'] = fill
+                    executed.append(order)
+                else:
+                    print(f"  ❌ {coin} 매수 실패 ({'+'.join(order['stages'])})")
+
+        # 쿨다운 적용 제안이 포함된 주문은 쿨다운 시작
+        for order in executed:
+            if order['use_cooldown']:
+                self.cooldowns[order['ticker'].split('-')[1]] = time.time()
+
+        self.proposals = []
+        return executed
@@ -0,0 +1,179 @@
+"""
+호가 깊이 기반 주문 분할 실행기
+- iceberg: 자식 주문을 현재 호가 잔량의 일정 비율 이하로 제한 (매 분할마다 호가 재조회)
+- twap: 전체 주문을 동일 크기로 나누어 일정 간격으로 실행
+- 체결 후 예상 슬리피지 vs 실제 슬리피지 보고
+"""
+
+import math
+import time
+import logging
+from utils.api_helpers import get_safe_orderbook
+from utils.slippage import estimate_fills, orderbook_to_arrays
+
+
+def _order_estimate(orderbook, side, amount):
+    """주문 단위(매수 KRW / 매도 수량) 기준 전체 깊이 체결 추정"""
+    return estimate_fills(orderbook, side, amount, amount_type='krw' if side == 'buy' else 'volume')
+
+
+def _visible_depth(orderbook, side):
+    """주문 방향 쪽 호가 잔량 합계 (매수: KRW, 매도: 수량)"""
+    prices, sizes = orderbook_to_arrays(orderbook, side)
+    return float((prices * sizes).sum()) if side == 'buy' else float(sizes.sum())
+
+
+def _slippage(side, avg_price, reference_price):
+    """불리한 방향을 양수로 하는 슬리피지 (매수: 비싸게, 매도: 싸게)"""
+    if not reference_price:
+        return 0
+    if side == 'buy':
+        return (avg_price - reference_price) / reference_price
+    return (reference_price - avg_price) / reference_price
+
+
+class SlicingExecutor:
+    """대형 주문 분할 실행기"""
+
+    def __init__(self, engine, mode='iceberg', max_depth_share=0.3, slice_interval=3,
+                 max_slices=10, min_slice_krw=5000, min_slicing_krw=1000000):
+        """
+        Args:
+            engine: OrderExecutionEngine
+            mode: 'iceberg' (호가 잔량 비율 제한) 또는 'twap' (균등 분할 + 일정 간격)
+            max_depth_share: 자식 주문 상한 (주문 방향 호가 잔량 대비 비율)
+            slice_interval: 자식 주문 간 대기 시간 (초)
+            max_slices: 최대 분할 횟수 (초과분은 마지막 주문에 합산)
+            min_slice_krw: 자식 주문 최소 금액
+            min_slicing_krw: 이 금액 이상 주문만 분할 대상
+        """
+        self.engine = engine
+        self.mode = mode
+        self.max_depth_share = max_depth_share
+        self.slice_interval = slice_interval
+        self.max_slices = max_slices
+        self.min_slice_krw = min_slice_krw
+        self.min_slicing_krw = min_slicing_krw
+
+    @classmethod
+    def from_config(cls, engine, slicing_config, min_slice_krw=5000):
+        """config.json의 order_slicing 섹션으로 생성 (비활성화 시 None)"""
+        slicing_config = slicing_config or {}
+        if not slicing_config.get('enabled', True):
+            return None
+        return cls(
+            engine,
+            mode=slicing_config.get('mode', 'iceberg'),
+            max_depth_share=slicing_config.get('max_depth_share', 0.3),
+            slice_interval=slicing_config.get('slice_interval_seconds', 3),
+            max_slices=slicing_config.get('max_slices', 10),
+            min_slice_krw=min_slice_krw,
+            min_slicing_krw=slicing_config.get('min_slicing_krw', 1000000)
+        )
+
+    def needs_slicing(self, notional_krw):
+        return notional_krw >= self.min_slicing_krw
+
+    def _child_size(self, orderbook, side, remaining, twap_size, price):
+        """다음 자식 주문 크기 (주문 단위: 매수 KRW / 매도 수량)"""
+        if self.mode == 'twap':
+            size = twap_size
+        else:
+            size = _visible_depth(orderbook, side) * self.max_depth_share
+        # 최소 주문 금액 보장 및 잔여분이 최소 금액 미만이면 함께 처리
+        min_size = self.min_slice_krw if side == 'buy' else self.min_slice_krw / price
+        size = max(size, min_size)
+        if remaining - size < min_size:
+            size = remaining
+        return min(size, remaining)
+
+    def execute(self, ticker, side, amount):
+        """
+        주문 분할 실행
+
+        Args:
+            ticker: 티커
+            side: 'buy' (amount = KRW) 또는 'sell' (amount = 수량)
+            amount: 전체 주문 금액/수량
+
+        Returns:
+            dict: {'fills', 'slices', 'executed_volume', 'funds', 'paid_fee', 'avg_price',
+                   'expected_slippage', 'realized_slippage'} (체결 없으면 None, 호가 조회 실패 시 단일 주문)
+        """
+        orderbook = get_safe_orderbook(ticker)
+        if not orderbook:
+            fill = self.engine.execute(ticker, side, amount)
+            return self._report(ticker, side, [fill] if fill else [], None, None)
+
+        # 분할 전 전체 주문의 예상 체결가 (기준: 최초 최우선 호가)
+        estimate = _order_estimate(orderbook, side, amount)
+        reference_price = estimate['best_price']
+        expected_slippage = float(estimate['slippage'][0])
+        if estimate['insufficient'][0]:
+            logging.warning(f"SLICE_DEPTH_SHORT - {ticker} {side}: 호가 잔량이 주문 규모보다 작음 (분할 실행)")
+
+        notional = amount if side == 'buy' else amount * reference_price
+        twap_size = amount / min(self.max_slices, max(1, math.ceil(notional / self.min_slicing_krw)))
+
+        fills = []
+        remaining = amount
+        slice_index = 0
+        while remaining > 0 and slice_index < self.max_slices:
+            if slice_index > 0:
+                time.sleep(self.slice_interval)
+                orderbook = get_safe_orderbook(ticker) or orderbook
+
+            price = orderbook['orderbook_units'][0]['ask_price' if side == 'buy' else 'bid_price']
+            child = remaining if slice_index == self.max_slices - 1 else \
+                self._child_size(orderbook, side, remaining, twap_size, price)
+
+            fill = self.engine.execute(ticker, side, child)
+            slice_index += 1
+            if not fill:
+                logging.error(f"SLICE_FAILED - {ticker} {side} {slice_index}번째 자식 주문 실패 - 분할 중단")
+                break
+            fills.append(fill)
+            # 요청량이 아닌 실제 체결량(매도: 수량, 매수: 체결 금액)만 차감 - 미체결분은 다음 자식 주문으로 이월
+            executed = fill['executed_volume'] if side == 'sell' else fill['funds']
+            remaining -= executed
+            logging.info(f"SLICE - {ticker} {side} {slice_index}번째: {executed:,.6f}/{child:,.6f} "
+                         f"@ {fill['avg_price']:,.4f}")
+            if executed <= 0:
+                logging.warning(f"SLICE_NO_FILL - {ticker} {side} {slice_index}번째 자식 주문 체결 없음 - 분할 중단")
+                break
+            # 수수료/반올림 잔여분처럼 최소 주문 금액 미만으로 남은 양은 주문 불가
+            if (remaining if side == 'buy' else remaining * price) < self.min_slice_krw:
+                break
+
+        return self._report(ticker, side, fills, reference_price, expected_slippage)
+
+    def _report(self, ticker, side, fills, reference_price, expected_slippage):
+        if not fills:
+            return None
+        volume = sum(f['executed_volume'] for f in fills)
+        funds = sum(f['funds'] for f in fills)
+        avg_price = funds / volume if volume > 0 else 0
+        unknown = any(f['unknown'] for f in fills)
+        realized_slippage = _slippage(side, avg_price, reference_price) \
+            if reference_price and volume > 0 and not unknown else None
+
+        report = {
+            'ticker': ticker,
+            'side': side,
+            'fills': fills,
+            'slices': len(fills),
+            'executed_volume': volume,
+            'funds': funds,
+            'paid_fee': sum(f['paid_fee'] for f in fills),
+            'avg_price': avg_price,
+            'filled': all(f['filled'] for f in fills),
+            'unknown': unknown,
+            'expected_slippage': expected_slippage,
+            'realized_slippage': realized_slippage
+        }
+        if realized_slippage is not None:
+            print(f"  ✂️ {ticker} 분할 {side} {len(fills)}회 | 예상 슬리피지: {expected_slippage:.3%} | "
+                  f"실제 슬리피지: {realized_slippage:.3%}")
+            logging.info(f"SLICED_ORDER - {ticker} {side} | 분할: {len(fills)}회 | 평균가: {avg_price:,.4f} | "
+                         f"예상 슬리피지: {expected_slippage:.4%} | 실제 슬리피지: {realized_slippage:.4%}")
+        return report
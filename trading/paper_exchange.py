@@ -0,0 +1,407 @@
+"""
+로컬 모의 거래소 (dry-run / 페이퍼 트레이딩)
+- 봇이 사용하는 pyupbit.Upbit 메서드를 동일한 시그니처/응답 형식으로 구현
+- 실시간 호가(pyupbit.get_orderbook) 또는 녹화된 호가 파일 기준으로 체결
+- 수수료(0.05%) / 최소 주문금액(5,000원) / 잔고 부족 규칙 적용
+- 지정가 주문은 잔량을 대기시키고 조회 시마다 최신 호가로 재매칭
+"""
+
+import os
+import json
+import time
+import uuid as uuid_lib
+import logging
+import threading
+from datetime import datetime
+import pyupbit
+
+
+UPBIT_FEE_RATE = 0.0005
+UPBIT_MIN_ORDER_KRW = 5000
+
+
+class RecordedOrderbooks:
+    """
+    녹화된 호가 재생 (JSON Lines: {"ticker": ..., "orderbook": {...}})
+    - 티커별 스냅샷을 순서대로 반환, 끝에 도달하면 마지막 스냅샷 유지
+    """
+
+    def __init__(self, path):
+        self.snapshots = {}
+        self.cursor = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self.snapshots.setdefault(record['ticker'], []).append(record['orderbook'])
+
+    def __call__(self, ticker):
+        books = self.snapshots.get(ticker)
+        if not books:
+            return None
+        index = self.cursor.get(ticker, 0)
+        self.cursor[ticker] = min(index + 1, len(books) - 1)
+        return books[index]
+
+
+class OrderbookRecorder:
+    """실시간 호가 조회 + JSON Lines 녹화 (이후 RecordedOrderbooks로 재생)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def __call__(self, ticker):
+        orderbook = pyupbit.get_orderbook(ticker=ticker)
+        if orderbook:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'ticker': ticker, 'orderbook': orderbook}, default=str) + '\n')
+        return orderbook
+
+
+def _error(name, message):
+    """업비트 API 오류 응답 형식"""
+    return {'error': {'name': name, 'message': message}}
+
+
+class PaperExchange:
+    """pyupbit.Upbit 호환 모의 거래소 (스레드 안전)"""
+
+    def __init__(self, initial_krw=1000000, fee_rate=UPBIT_FEE_RATE, min_order_krw=UPBIT_MIN_ORDER_KRW,
+                 orderbook_source=None):
+        """
+        Args:
+            initial_krw: 초기 원화 잔고
+            fee_rate: 거래 수수료율
+            min_order_krw: 최소 주문 금액
+            orderbook_source: ticker → 호가 dict 함수 (None이면 실시간 pyupbit.get_orderbook)
+        """
+        self.fee_rate = fee_rate
+        self.min_order_krw = min_order_krw
+        self.orderbook_source = orderbook_source or (lambda ticker: pyupbit.get_orderbook(ticker=ticker))
+        self.accounts = {'KRW': {'balance': float(initial_krw), 'locked': 0.0, 'avg_buy_price': 0.0}}
+        self.orders = {}
+        self.initial_krw = float(initial_krw)
+        self.stats = {'orders': 0, 'rejected': 0, 'trades': 0, 'fees_krw': 0.0, 'api_calls': 0}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, paper_config):
+        """config.json의 paper_trading 섹션으로 생성"""
+        paper_config = paper_config or {}
+        source = paper_config.get('orderbook_source', 'live')
+        orderbook_path = paper_config.get('orderbook_path', os.path.join('log', 'paper_orderbooks.jsonl'))
+        if source == 'recorded':
+            orderbook_source = RecordedOrderbooks(orderbook_path)
+        elif source == 'record':
+            orderbook_source = OrderbookRecorder(orderbook_path)
+        else:
+            orderbook_source = None
+        return cls(
+            initial_krw=paper_config.get('initial_krw', 1000000),
+            fee_rate=paper_config.get('fee_rate', UPBIT_FEE_RATE),
+            min_order_krw=paper_config.get('min_order_krw', UPBIT_MIN_ORDER_KRW),
+            orderbook_source=orderbook_source
+        )
+
+    # ------------------------------------------------------------------
+    # 잔고 조회
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _currency(ticker):
+        return ticker.split('-')[1] if '-' in ticker else ticker
+
+    def _account(self, currency):
+        return self.accounts.setdefault(currency, {'balance': 0.0, 'locked': 0.0, 'avg_buy_price': 0.0})
+
+    def get_balance(self, ticker="KRW", verbose=False, contain_req=False):
+        with self._lock:
+            self.stats['api_calls'] += 1
+            account = self.accounts.get(self._currency(ticker))
+            return account['balance'] if account else 0.0
+
+    def get_balances(self, contain_req=False):
+        with self._lock:
+            self.stats['api_calls'] += 1
+            return [
+                {
+                    'currency': currency,
+                    'balance': str(account['balance']),
+                    'locked': str(account['locked']),
+                    'avg_buy_price': str(account['avg_buy_price']),
+                    'avg_buy_price_modified': False,
+                    'unit_currency': 'KRW'
+                }
+                for currency, account in self.accounts.items()
+                if currency == 'KRW' or account['balance'] > 0 or account['locked'] > 0
+            ]
+
+    def get_avg_buy_price(self, ticker='KRW', contain_req=False):
+        with self._lock:
+            self.stats['api_calls'] += 1
+            account = self.accounts.get(self._currency(ticker))
+            return account['avg_buy_price'] if account else 0.0
+
+    # ------------------------------------------------------------------
+    # 주문
+    # ------------------------------------------------------------------
+
+    def _new_order(self, ticker, side, ord_type, price=None, volume=None):
+        order = {
+            'uuid': str(uuid_lib.uuid4()),
+            'side': side,
+            'ord_type': ord_type,
+            'price': price,
+            'volume': volume,
+            'state': 'wait',
+            'market': ticker,
+            'created_at': datetime.now().isoformat(),
+            'remaining_volume': volume,
+            'reserved_fee': 0.0,
+            'remaining_fee': 0.0,
+            'paid_fee': 0.0,
+            'locked': 0.0,
+            'executed_volume': 0.0,
+            'trades_count': 0,
+            'trades': []
+        }
+        self.orders[order['uuid']] = order
+        self.stats['orders'] += 1
+        return order
+
+    def _public(self, order):
+        """주문 응답 사본 (숫자는 업비트처럼 문자열)"""
+        public = dict(order)
+        for key in ('price', 'volume', 'remaining_volume', 'reserved_fee', 'remaining_fee', 'paid_fee',
+                    'locked', 'executed_volume'):
+            if public.get(key) is not None:
+                public[key] = str(public[key])
+        public['trades'] = [dict(t) for t in order['trades']]
+        return public
+
+    def _reject(self, name, message):
+        self.stats['rejected'] += 1
+        logging.info(f"PAPER_REJECT - {name}: {message}")
+        return _error(name, message)
+
+    def _levels(self, ticker, side):
+        """체결 대상 호가 단계 [(가격, 잔량), ...] (매수: ask, 매도: bid)"""
+        orderbook = self.orderbook_source(ticker)
+        if isinstance(orderbook, list):
+            orderbook = orderbook[0] if orderbook else None
+        if not orderbook or not orderbook.get('orderbook_units'):
+            return []
+        price_key, size_key = ('ask_price', 'ask_size') if side == 'bid' else ('bid_price', 'bid_size')
+        return [(float(u[price_key]), float(u[size_key])) for u in orderbook['orderbook_units']]
+
+    def _record_trade(self, order, price, volume):
+        """체결 1건 반영 (잔고/평단가/수수료)"""
+        funds = price * volume
+        fee = funds * self.fee_rate
+        currency = self._currency(order['market'])
+        krw = self.accounts['KRW']
+        coin = self._account(currency)
+
+        if order['side'] == 'bid':
+            # 매수: 지정가는 잠금 금액에서, 시장가는 가용 잔고에서 차감
+            if order['ord_type'] == 'limit':
+                krw['locked'] -= funds + fee
+                order['locked'] -= funds + fee
+            else:
+                krw['balance'] -= funds + fee
+            total_cost = coin['avg_buy_price'] * coin['balance'] + funds
+            coin['balance'] += volume
+            coin['avg_buy_price'] = total_cost / coin['balance'] if coin['balance'] > 0 else 0.0
+        else:
+            if order['ord_type'] == 'limit':
+                coin['locked'] -= volume
+                order['locked'] -= volume
+            else:
+                coin['balance'] -= volume
+            krw['balance'] += funds - fee
+            if coin['balance'] <= 1e-12 and coin['locked'] <= 1e-12:
+                coin['balance'] = 0.0
+                coin['avg_buy_price'] = 0.0
+
+        order['trades'].append({
+            'market': order['market'],
+            'uuid': str(uuid_lib.uuid4()),
+            'price': str(price),
+            'volume': str(volume),
+            'funds': str(funds),
+            'side': order['side'],
+            'created_at': datetime.now().isoformat()
+        })
+        order['trades_count'] += 1
+        order['executed_volume'] += volume
+        order['paid_fee'] += fee
+        self.stats['trades'] += 1
+        self.stats['fees_krw'] += fee
+
+    def buy_market_order(self, ticker, price, contain_req=False):
+        """시장가 매수 (price = 주문 금액 KRW, 수수료 별도)"""
+        with self._lock:
+            self.stats['api_calls'] += 1
+            if price < self.min_order_krw:
+                return self._reject('under_min_total_bid', f"최소주문금액 이상으로 주문해주세요 ({self.min_order_krw}원)")
+            if self.accounts['KRW']['balance'] < price * (1 + self.fee_rate):
+                return self._reject('insufficient_funds_bid', "주문가능한 금액(KRW)이 부족합니다.")
+            levels = self._levels(ticker, 'bid')
+            if not levels:
+                return self._reject('market_does_not_exist', f"호가 정보 없음: {ticker}")
+
+            order = self._new_order(ticker, 'bid', 'price', price=price)
+            remaining = price
+            for level_price, size in levels:
+                take = min(remaining, level_price * size)
+                if take <= 0:
+                    break
+                self._record_trade(order, level_price, take / level_price)
+                remaining -= take
+            # 업비트 시장가 매수는 잔여 금액 반환 후 cancel 상태로 종료
+            order['state'] = 'cancel' if remaining > 1e-9 else 'done'
+            return self._public(order)
+
+    def sell_market_order(self, ticker, volume, contain_req=False):
+        """시장가 매도 (volume = 수량)"""
+        with self._lock:
+            self.stats['api_calls'] += 1
+            coin = self.accounts.get(self._currency(ticker))
+            if not coin or coin['balance'] < volume - 1e-12:
+                return self._reject('insufficient_funds_ask', "주문가능한 금액이 부족합니다.")
+            levels = self._levels(ticker, 'ask')
+            if not levels:
+                return self._reject('market_does_not_exist', f"호가 정보 없음: {ticker}")
+            if levels[0][0] * volume < self.min_order_krw:
+                return self._reject('under_min_total_ask', f"최소주문금액 이상으로 주문해주세요 ({self.min_order_krw}원)")
+
+            order = self._new_order(ticker, 'ask', 'market', volume=volume)
+            remaining = volume
+            for level_price, size in levels:
+                take = min(remaining, size)
+                if take <= 0:
+                    break
+                self._record_trade(order, level_price, take)
+                remaining -= take
+            order['remaining_volume'] = remaining
+            order['state'] = 'done' if remaining <= 1e-12 else 'cancel'
+            return self._public(order)
+
+    def buy_limit_order(self, ticker, price, volume, contain_req=False):
+        """지정가 매수 (주문 금액 + 수수료 잠금, 체결 가능분 즉시 체결)"""
+        with self._lock:
+            self.stats['api_calls'] += 1
+            notional = price * volume
+            if notional < self.min_order_krw:
+                return self._reject('under_min_total_bid', f"최소주문금액 이상으로 주문해주세요 ({self.min_order_krw}원)")
+            krw = self.accounts['KRW']
+            lock_amount = notional * (1 + self.fee_rate)
+            if krw['balance'] < lock_amount:
+                return self._reject('insufficient_funds_bid', "주문가능한 금액(KRW)이 부족합니다.")
+            krw['balance'] -= lock_amount
+            krw['locked'] += lock_amount
+            order = self._new_order(ticker, 'bid', 'limit', price=price, volume=volume)
+            order['locked'] = lock_amount
+            self._match_limit(order)
+            return self._public(order)
+
+    def sell_limit_order(self, ticker, price, volume, contain_req=False):
+        """지정가 매도 (수량 잠금, 체결 가능분 즉시 체결)"""
+        with self._lock:
+            self.stats['api_calls'] += 1
+            if price * volume < self.min_order_krw:
+                return self._reject('under_min_total_ask', f"최소주문금액 이상으로 주문해주세요 ({self.min_order_krw}원)")
+            coin = self.accounts.get(self._currency(ticker))
+            if not coin or coin['balance'] < volume - 1e-12:
+                return self._reject('insufficient_funds_ask', "주문가능한 금액이 부족합니다.")
+            coin['balance'] -= volume
+            coin['locked'] += volume
+            order = self._new_order(ticker, 'ask', 'limit', price=price, volume=volume)
+            order['locked'] = volume
+            self._match_limit(order)
+            return self._public(order)
+
+    def _match_limit(self, order):
+        """대기 중 지정가 주문을 현재 호가와 매칭 (지정가보다 유리한 단계만)"""
+        if order['state'] != 'wait' or order['remaining_volume'] <= 0:
+            return
+        for level_price, size in self._levels(order['market'], order['side']):
+            crosses = level_price <= order['price'] if order['side'] == 'bid' else level_price >= order['price']
+            if not crosses or order['remaining_volume'] <= 1e-12:
+                break
+            take = min(order['remaining_volume'], size)
+            self._record_trade(order, level_price, take)
+            order['remaining_volume'] -= take
+        if order['remaining_volume'] <= 1e-12:
+            order['remaining_volume'] = 0.0
+            order['state'] = 'done'
+            self._release(order)
+
+    def _release(self, order):
+        """주문 종료 시 남은 잠금 해제"""
+        currency = 'KRW' if order['side'] == 'bid' else self._currency(order['market'])
+        account = self._account(currency)
+        account['locked'] -= order['locked']
+        account['balance'] += order['locked']
+        order['locked'] = 0.0
+
+    def cancel_order(self, uuid, contain_req=False):
+        with self._lock:
+            self.stats['api_calls'] += 1
+            order = self.orders.get(uuid)
+            if not order:
+                return _error('order_not_found', "주문을 찾지 못했습니다.")
+            if order['state'] != 'wait':
+                return _error('canceled_order' if order['state'] == 'cancel' else 'done_order', "이미 종료된 주문입니다.")
+            order['state'] = 'cancel'
+            self._release(order)
+            return self._public(order)
+
+    def get_order(self, ticker_or_uuid, state='wait', page=1, limit=100, contain_req=False):
+        """uuid면 개별 주문 (조회 시 대기 주문 재매칭), 티커면 해당 상태 주문 목록"""
+        with self._lock:
+            self.stats['api_calls'] += 1
+            order = self.orders.get(ticker_or_uuid)
+            if order:
+                if order['ord_type'] == 'limit':
+                    self._match_limit(order)
+                return self._public(order)
+            return [self._public(o) for o in self.orders.values()
+                    if o['market'] == ticker_or_uuid and o['state'] == state][:limit]
+
+    def get_individual_order(self, uuid, contain_req=False):
+        return self.get_order(uuid)
+
+    # ------------------------------------------------------------------
+    # 리포트
+    # ------------------------------------------------------------------
+
+    def get_total_value(self):
+        """총 자산 평가 (코인은 최우선 매수호가 기준)"""
+        with self._lock:
+            krw = self.accounts['KRW']
+            total = krw['balance'] + krw['locked']
+            for currency, account in self.accounts.items():
+                amount = account['balance'] + account['locked']
+                if currency == 'KRW' or amount <= 0:
+                    continue
+                levels = self._levels(f"KRW-{currency}", 'ask')
+                if levels:
+                    total += amount * levels[0][0]
+            return total
+
+    def summary(self):
+        """모의 거래 요약 (잔고, 손익, 주문/체결/수수료 통계)"""
+        total_value = self.get_total_value()
+        return {
+            'timestamp': time.time(),
+            'initial_krw': self.initial_krw,
+            'total_value': total_value,
+            'pnl': total_value - self.initial_krw,
+            'pnl_percent': (total_value / self.initial_krw - 1) * 100 if self.initial_krw else 0,
+            'balances': {c: dict(a) for c, a in self.accounts.items() if a['balance'] > 0 or a['locked'] > 0},
+            'stats': dict(self.stats)
+        }
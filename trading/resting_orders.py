@@ -0,0 +1,203 @@
+"""
+지정가 주문 관리자 (슬리피지 제한 + 미체결 주문 관리)
+- 모든 봇 주문을 슬리피지 한도 지정가로 전송 (호가 단위 보정)
+- 대기 시간 초과 시 취소 후 최신 호가로 재호가
+- 시장가 전환은 명시적 규칙에서만:
+  1) 긴급 주문 (손절/비상 매도)
+  2) 재호가 횟수 소진 후 잔여분의 예상 슬리피지가 fallback 한도 이내일 때
+"""
+
+import time
+import logging
+import pyupbit
+from utils.api_helpers import get_safe_orderbook, check_slippage_risk
+
+
+def round_to_tick(price, side):
+    """
+    업비트 호가 단위로 가격 보정 (한도를 넘지 않는 방향)
+
+    Args:
+        price: 원 가격
+        side: 'buy' (내림 - 상한 초과 방지) 또는 'sell' (올림 - 하한 미만 방지)
+    """
+    return pyupbit.get_tick_size(price, method='floor' if side == 'buy' else 'ceil')
+
+
+class RestingOrderManager:
+    """슬리피지 제한 지정가 주문 + 재호가/취소 관리 (OrderExecutionEngine과 동일한 execute 인터페이스)"""
+
+    def __init__(self, engine, max_slippage=0.005, rest_timeout=10, max_reprices=2,
+                 market_fallback=True, fallback_max_slippage=0.02, min_order_krw=5000):
+        """
+        Args:
+            engine: OrderExecutionEngine
+            max_slippage: 지정가 한도 (최우선 호가 대비)
+            rest_timeout: 지정가 주문 대기 시간 (초, 초과 시 취소/재호가)
+            max_reprices: 최대 재호가 횟수
+            market_fallback: 재호가 소진 후 잔여분 시장가 전환 허용 여부
+            fallback_max_slippage: 시장가 전환 허용 예상 슬리피지 상한
+            min_order_krw: 최소 주문 금액 (잔여분이 이보다 작으면 종료)
+        """
+        self.engine = engine
+        self.upbit = engine.upbit
+        self.max_slippage = max_slippage
+        self.rest_timeout = rest_timeout
+        self.max_reprices = max_reprices
+        self.market_fallback = market_fallback
+        self.fallback_max_slippage = fallback_max_slippage
+        self.min_order_krw = min_order_krw
+        self.open_orders = {}  # uuid → 미체결 지정가 주문 정보
+
+    @classmethod
+    def from_config(cls, engine, resting_config, min_order_krw=5000):
+        """config.json의 resting_orders 섹션으로 생성 (비활성화 시 engine 그대로 반환 - 시장가 실행)"""
+        resting_config = resting_config or {}
+        if not resting_config.get('enabled', True):
+            return engine
+        return cls(
+            engine,
+            max_slippage=resting_config.get('max_slippage', 0.005),
+            rest_timeout=resting_config.get('rest_timeout_seconds', 10),
+            max_reprices=resting_config.get('max_reprices', 2),
+            market_fallback=resting_config.get('market_fallback', True),
+            fallback_max_slippage=resting_config.get('fallback_max_slippage', 0.02),
+            min_order_krw=min_order_krw
+        )
+
+    def _limit_price(self, orderbook, side):
+        unit = orderbook['orderbook_units'][0]
+        if side == 'buy':
+            return round_to_tick(unit['ask_price'] * (1 + self.max_slippage), side)
+        return round_to_tick(unit['bid_price'] * (1 - self.max_slippage), side)
+
+    def _cancel(self, uuid):
+        """미체결 주문 취소 후 최종 체결 정보 반환"""
+        try:
+            self.upbit.cancel_order(uuid)
+        except Exception as e:
+            logging.warning(f"RESTING_CANCEL_ERROR - {uuid}: {e}")
+        fill = self.engine.wait_for_fills([uuid], timeout=3).get(uuid)
+        if fill and fill['state'] in ('done', 'cancel'):
+            self.open_orders.pop(uuid, None)
+        return fill
+
+    def execute_market(self, ticker, side, amount):
+        """시장가 즉시 실행 (긴급 주문 규칙)"""
+        return self.engine.execute(ticker, side, amount)
+
+    def execute(self, ticker, side, amount, urgent=False):
+        """
+        지정가 우선 주문 실행
+
+        Args:
+            ticker: 티커
+            side: 'buy' (amount = KRW) 또는 'sell' (amount = 수량)
+            amount: 주문 금액/수량
+            urgent: True면 시장가 즉시 실행 (손절/비상 매도)
+
+        Returns:
+            dict: 합산 체결 정보 (executed_volume, funds, paid_fee, avg_price, filled, orders) - 체결 없으면 None
+        """
+        if urgent:
+            return self.execute_market(ticker, side, amount)
+
+        fills = []
+        remaining = amount
+        price = 0
+
+        for attempt in range(self.max_reprices + 1):
+            orderbook = get_safe_orderbook(ticker)
+            if not orderbook:
+                break
+            limit_price = self._limit_price(orderbook, side)
+            price = orderbook['orderbook_units'][0]['ask_price' if side == 'buy' else 'bid_price']
+
+            uuid = self.engine.submit(ticker, side, remaining, price=limit_price)
+            if not uuid:
+                break
+            self.open_orders[uuid] = {'ticker': ticker, 'side': side, 'price': limit_price,
+                                      'submitted_at': time.time()}
+
+            fill = self.engine.wait_for_fills([uuid], timeout=self.rest_timeout).get(uuid)
+            if fill and fill['state'] in ('done', 'cancel'):
+                self.open_orders.pop(uuid, None)
+            else:
+                # 대기 시간 초과 → 취소 후 잔여분 재호가
+                fill = self._cancel(uuid) or fill
+                if attempt < self.max_reprices:
+                    logging.info(f"RESTING_REPRICE - {ticker} {side} {attempt + 1}회차 미체결 취소 후 재호가")
+
+            if fill and fill['executed_volume'] > 0:
+                fills.append(fill)
+                if side == 'buy' and fill['unknown']:
+                    # 체결 금액 미확정 - 잔여 예산을 알 수 없으므로 추가 주문 중단 (과매수 방지)
+                    remaining = 0
+                    break
+                remaining -= fill['funds'] + fill['paid_fee'] if side == 'buy' else fill['executed_volume']
+
+            remaining_krw = remaining if side == 'buy' else remaining * price
+            if remaining_krw < self.min_order_krw:
+                remaining = 0
+                break
+
+        # 재호가 소진 후 잔여분: 예상 슬리피지가 fallback 한도 이내일 때만 시장가
+        if remaining > 0 and price:
+            remaining_krw = remaining if side == 'buy' else remaining * price
+            if remaining_krw >= self.min_order_krw:
+                risk = check_slippage_risk(ticker, remaining_krw, self.fallback_max_slippage, side=side)
+                if self.market_fallback and risk['safe']:
+                    print(f"  ⚡ {ticker} 지정가 잔여분 시장가 전환 ({remaining_krw:,.0f}원, "
+                          f"예상 슬리피지 {risk['expected_slippage']:.2%})")
+                    logging.info(f"RESTING_MARKET_FALLBACK - {ticker} {side}: {remaining_krw:,.0f}원")
+                    fill = self.engine.execute(ticker, side, remaining)
+                    if fill and fill['executed_volume'] > 0:
+                        fills.append(fill)
+                else:
+                    print(f"  ⏸️ {ticker} 지정가 미체결 잔여분 {remaining_krw:,.0f}원 - 시장가 전환 조건 미충족")
+                    logging.warning(f"RESTING_UNFILLED - {ticker} {side}: 잔여 {remaining_krw:,.0f}원 "
+                                    f"(예상 슬리피지 {risk['expected_slippage']:.2%})")
+
+        if not fills:
+            return None
+
+        volume = sum(f['executed_volume'] for f in fills)
+        funds = sum(f['funds'] for f in fills)
+        return {
+            'ticker': ticker,
+            'side': side,
+            'orders': fills,
+            'executed_volume': volume,
+            'funds': funds,
+            'paid_fee': sum(f['paid_fee'] for f in fills),
+            'avg_price': funds / volume if volume > 0 else 0,
+            'state': 'done',
+            'filled': not any(f['unknown'] for f in fills),
+            'unknown': any(f['unknown'] for f in fills)
+        }
+
+    def execute_batch(self, orders):
+        """
+        여러 주문 순차 실행
+
+        Args:
+            orders: [(ticker, side, amount), ...]
+
+        Returns:
+            list: 주문 순서대로 체결 정보 (실패 시 None)
+        """
+        return [self.execute(ticker, side, amount) for ticker, side, amount in orders]
+
+    def sweep_stale_orders(self):
+        """
+        추적 중인 미체결 지정가 주문 중 대기 시간을 넘긴 주문 취소 (취소 실패분 정리용)
+
+        Returns:
+            int: 취소한 주문 수
+        """
+        cancelled = 0
+        for uuid, info in list(self.open_orders.items()):
+            if time.time() - info['submitted_at'] >= self.rest_timeout:
+                self._cancel(uuid)
+                cancelled += 1
+        return cancelled
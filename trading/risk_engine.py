@@ -0,0 +1,278 @@
+"""
+통합 리스크 엔진 (단일 스냅샷 기반)
+- 사이클마다 잔고/평단가(get_balances 1회) + 호가(일괄 get_orderbook 1회) 스냅샷만 조회
+- 손절매 / 현금 부족 / 집중도 / 목표 비율 리밸런싱 규칙을 한 번에 평가
+- 우선순위 순 액션 목록 반환 → OrderPlanner에 제안 (주문은 planner가 넷팅 후 실행)
+"""
+
+import time
+import logging
+import pyupbit
+from utils.api_helpers import get_safe_orderbook
+
+
+# 규칙 우선순위 (낮을수록 먼저)
+RISK_PRIORITIES = {
+    'stop_loss': 0,
+    'cash_shortage': 1,
+    'concentration': 2,
+    'rebalancing': 3
+}
+
+
+class PortfolioSnapshot:
+    """리스크 평가용 포트폴리오 스냅샷 (KRW + 관리 대상 코인, 가격은 최우선 매수호가)"""
+
+    def __init__(self, krw_balance, positions, timestamp=None):
+        """
+        Args:
+            krw_balance: 원화 잔고
+            positions: {ticker: {'balance', 'avg_buy_price', 'bid_price', 'ask_price'}} (호가 조회 성공 코인만)
+            timestamp: 스냅샷 시각
+        """
+        self.krw_balance = krw_balance
+        self.positions = positions
+        self.timestamp = timestamp or time.time()
+        for position in positions.values():
+            position['value'] = position['balance'] * position['bid_price']
+        self.total_value = krw_balance + sum(p['value'] for p in positions.values())
+
+    @classmethod
+    def capture(cls, upbit, tickers):
+        """
+        잔고/평단가/호가 일괄 조회로 스냅샷 생성
+
+        Args:
+            upbit: Upbit 객체 (또는 모의 거래소)
+            tickers: 관리 대상 티커 목록
+
+        Returns:
+            PortfolioSnapshot
+        """
+        balances = {b['currency']: b for b in upbit.get_balances()}
+        krw_balance = float(balances.get('KRW', {}).get('balance', 0))
+
+        orderbooks = {}
+        try:
+            for orderbook in pyupbit.get_orderbook(ticker=list(tickers)) or []:
+                orderbooks[orderbook['market']] = orderbook
+        except Exception as e:
+            logging.warning(f"RISK_SNAPSHOT_ORDERBOOK_BATCH_ERROR: {e} - 개별 조회로 대체")
+
+        positions = {}
+        for ticker in tickers:
+            account = balances.get(ticker.split('-')[1])
+            balance = float(account['balance']) if account else 0.0
+            if balance <= 0:
+                continue
+            orderbook = orderbooks.get(ticker) or get_safe_orderbook(ticker)
+            if not orderbook:
+                continue
+            best = orderbook['orderbook_units'][0]
+            positions[ticker] = {
+                'balance': balance,
+                'avg_buy_price': float(account.get('avg_buy_price') or 0),
+                'bid_price': best['bid_price'],
+                'ask_price': best['ask_price']
+            }
+        return cls(krw_balance, positions)
+
+    def ratio(self, ticker):
+        """포트폴리오 내 비중 (미보유 0)"""
+        position = self.positions.get(ticker)
+        if not position or self.total_value <= 0:
+            return 0
+        return position['value'] / self.total_value
+
+    @property
+    def cash_ratio(self):
+        return self.krw_balance / self.total_value if self.total_value > 0 else 0
+
+
+class RiskEngine:
+    """단일 스냅샷으로 모든 리스크 규칙 평가"""
+
+    def __init__(self, tickers, target_allocation, stop_loss_percent=12, min_cash_ratio=0.15,
+                 target_cash_ratio=0.20, max_single_position=0.28, concentration_target=0.25,
+                 rebalancing_threshold=0.15, min_order_krw=5000, cooldowns=None, cooldown_seconds=0):
+        """
+        Args:
+            tickers: 관리 대상 티커 목록
+            target_allocation: 티커별 목표 비율
+            stop_loss_percent: 손절매 기준 손실률 (%)
+            min_cash_ratio: 현금 위험 구간 (미만 시 현금 확보)
+            target_cash_ratio: 현금 확보 목표 비율
+            max_single_position: 단일 코인 최대 비중 (초과 시 축소)
+            concentration_target: 비중 초과 코인 축소 목표
+            rebalancing_threshold: 목표 비율 대비 리밸런싱 편차 기준
+            min_order_krw: 최소 주문 금액
+            cooldowns: 코인별 마지막 리밸런싱 시각 dict (공유 참조, 예: last_rebalance_time)
+            cooldown_seconds: 집중도 축소 재실행 금지 시간 (초)
+        """
+        self.tickers = tickers
+        self.target_allocation = target_allocation
+        self.stop_loss_percent = stop_loss_percent
+        self.min_cash_ratio = min_cash_ratio
+        self.target_cash_ratio = target_cash_ratio
+        self.max_single_position = max_single_position
+        self.concentration_target = concentration_target
+        self.rebalancing_threshold = rebalancing_threshold
+        self.min_order_krw = min_order_krw
+        self.cooldowns = cooldowns if cooldowns is not None else {}
+        self.cooldown_seconds = cooldown_seconds
+
+    @staticmethod
+    def _action(stage, ticker, delta_krw, price, reason, **kwargs):
+        action = {
+            'priority': RISK_PRIORITIES[stage],
+            'stage': stage,
+            'ticker': ticker,
+            'delta_krw': delta_krw,
+            'price': price,
+            'reason': reason,
+            'sell_all': False,
+            'balance': None,
+            'use_cooldown': False
+        }
+        action.update(kwargs)
+        return action
+
+    def evaluate(self, snapshot, include_rebalancing=False):
+        """
+        모든 리스크 규칙 평가 (추가 API 호출 없음)
+
+        Args:
+            snapshot: PortfolioSnapshot
+            include_rebalancing: 목표 비율 리밸런싱 포함 여부 (주기적 실행)
+
+        Returns:
+            list: 우선순위 순 액션 [{'priority', 'stage', 'ticker', 'delta_krw', 'price', 'reason',
+                                     'sell_all', 'balance', 'use_cooldown'}, ...]
+        """
+        actions = []
+        actions += self._stop_loss(snapshot)
+        actions += self._cash_shortage(snapshot)
+        actions += self._concentration(snapshot)
+        if include_rebalancing:
+            actions += self._rebalancing(snapshot)
+        actions.sort(key=lambda a: a['priority'])
+        return actions
+
+    @staticmethod
+    def propose_all(actions, planner):
+        """액션 목록을 주문 계획기에 제안"""
+        for action in actions:
+            planner.propose(action['stage'], action['ticker'], action['delta_krw'], action['price'],
+                            reason=action['reason'], sell_all=action['sell_all'], balance=action['balance'],
+                            use_cooldown=action['use_cooldown'])
+
+    def _stop_loss(self, snapshot):
+        """손절매 - 평단가 대비 손실률이 기준 이상이면 전량 매도"""
+        actions = []
+        for ticker, position in snapshot.positions.items():
+            avg_buy_price = position['avg_buy_price']
+            if avg_buy_price <= 0:
+                continue
+            loss_percent = (avg_buy_price - position['bid_price']) / avg_buy_price * 100
+            if loss_percent >= self.stop_loss_percent:
+                print(f"🚨 {ticker.split('-')[1]} 손절매 실행: {loss_percent:.1f}% 손실")
+                actions.append(self._action('stop_loss', ticker, -position['value'], position['bid_price'],
+                                            f"{loss_percent:.1f}% 손실", sell_all=True,
+                                            balance=position['balance']))
+        return actions
+
+    def _cash_shortage(self, snapshot):
+        """현금 부족 - 위험 구간 미만이면 수익 코인(없으면 최대 비중 코인) 일부 매도"""
+        cash_ratio = snapshot.cash_ratio
+        if not snapshot.positions or cash_ratio >= self.min_cash_ratio:
+            return []
+
+        print(f"🚨 현금 위험 수준 감지! 현재 {cash_ratio:.1%} → 목표 {self.target_cash_ratio:.0%}")
+        needed_cash = snapshot.total_value * self.target_cash_ratio - snapshot.krw_balance
+
+        def profit_percent(position):
+            if position['avg_buy_price'] <= 0:
+                return 0
+            return (position['bid_price'] - position['avg_buy_price']) / position['avg_buy_price'] * 100
+
+        # 수익 2% 이상 코인 중 수익률 최고 코인 50% 한도, 없으면 최대 비중 코인 30% 한도
+        profitable = [(t, p) for t, p in snapshot.positions.items() if profit_percent(p) > 2]
+        if profitable:
+            ticker, position = max(profitable, key=lambda item: profit_percent(item[1]))
+            max_share, reason = 0.5, '수익실현'
+        else:
+            ticker, position = max(snapshot.positions.items(), key=lambda item: item[1]['value'])
+            max_share, reason = 0.3, '현금확보'
+
+        sell_value = min(needed_cash, position['value'] * max_share)
+        if sell_value < self.min_order_krw:
+            return []
+
+        coin = ticker.split('-')[1]
+        print(f"  📝 {coin} {reason} 매도 제안")
+        print(f"     수익률: {profit_percent(position):+.1f}% | 금액: {sell_value:,.0f}원")
+        print(f"     예상 현금 비중: {cash_ratio:.1%} → {self.target_cash_ratio:.0%}")
+        logging.info(f"CASH_REBALANCE - {coin}: {cash_ratio:.1%} → {self.target_cash_ratio:.0%} "
+                     f"({reason}: {sell_value:,.0f}원)")
+        return [self._action('cash_shortage', ticker, -sell_value, position['bid_price'], reason,
+                             balance=position['balance'])]
+
+    def _concentration(self, snapshot):
+        """집중도 - 최대 비중 초과 코인을 목표 비중까지 축소 (리밸런싱 쿨다운 적용)"""
+        for ticker, position in snapshot.positions.items():
+            coin_ratio = snapshot.ratio(ticker)
+            if coin_ratio <= self.max_single_position:
+                continue
+
+            coin = ticker.split('-')[1]
+            print(f"⚖️ {coin} 비중 초과 감지: {coin_ratio:.1%} → {self.concentration_target:.0%} 목표")
+            last_time = self.cooldowns.get(coin)
+            if last_time is not None and time.time() - last_time < self.cooldown_seconds:
+                remaining = (self.cooldown_seconds - (time.time() - last_time)) / 3600
+                print(f"  ⏰ {coin} 리밸런싱 쿨다운 중 (남은 시간: {remaining:.1f}시간) - 다음 초과 코인 확인")
+                continue
+            excess_value = position['value'] - snapshot.total_value * self.concentration_target
+            if excess_value < self.min_order_krw:
+                print(f"  ⏸️ {coin} 초과분 {excess_value:,.0f}원 - 최소 거래금액 미만")
+                continue
+
+            print(f"  📝 {coin} 집중도 리밸런싱 제안")
+            print(f"     매도량: {excess_value / position['bid_price']:.6f}개 | 금액: {excess_value:,.0f}원")
+            logging.info(f"CONCENTRATION_REBALANCE - {coin}: {coin_ratio:.1%} → {self.concentration_target:.0%} "
+                         f"(매도: {excess_value:,.0f}원)")
+            # 한 사이클에 한 코인만 축소 (비중 재계산은 다음 스냅샷에서)
+            return [self._action('concentration', ticker, -excess_value, position['bid_price'],
+                                 f"비중 {coin_ratio:.1%} → {self.concentration_target:.0%}",
+                                 balance=position['balance'], use_cooldown=True)]
+        return []
+
+    def _rebalancing(self, snapshot):
+        """목표 비율 리밸런싱 - 편차 기준 초과 코인 조정 (매수는 매도가 있을 때만, 매도 대금으로)"""
+        if snapshot.total_value <= 0:
+            return []
+
+        sells, buys = [], []
+        for ticker in self.tickers:
+            current_ratio = snapshot.ratio(ticker)
+            target_ratio = self.target_allocation.get(ticker, 0)
+            if abs(current_ratio - target_ratio) <= self.rebalancing_threshold:
+                continue
+            delta_krw = (target_ratio - current_ratio) * snapshot.total_value
+            position = snapshot.positions.get(ticker)
+            reason = f"{current_ratio:.1%} → {target_ratio:.1%}"
+            if delta_krw < 0 and position:
+                sells.append(self._action('rebalancing', ticker, delta_krw, position['bid_price'], reason,
+                                          balance=position['balance']))
+            elif delta_krw > 0:
+                buys.append(self._action('rebalancing', ticker, delta_krw,
+                                         position['bid_price'] if position else 0, reason))
+
+        if not sells and not buys:
+            return []
+
+        print(f"\n🔄 포트폴리오 리밸런싱 필요 (편차 {self.rebalancing_threshold:.0%} 초과)")
+        print("=" * 60)
+        for action in sells + buys:
+            icon = '📉' if action['delta_krw'] < 0 else '📈'
+            print(f"{icon} {action['ticker'].split('-')[1]}: {action['reason']} ({action['delta_krw']:+,.0f}원)")
+        return sells + buys if sells else []
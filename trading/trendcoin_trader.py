@@ -8,12 +8,16 @@
 """
 
 from openai import OpenAI
+import json
 import pyupbit
 import requests
 from datetime import datetime
 from utils.api_helpers import get_safe_orderbook, get_safe_price
 from utils.logger import log_decision
 from utils.delisted_coins import is_delisted
+from utils.ai_cost_ledger import ai_cost_ledger, CALL_SITE_TREND_NEWS
+from trading.execution_engine import OrderExecutionEngine
+from trading.resting_orders import RestingOrderManager
 
 # CryptoCompare API 설정 (무료, API 키 불필요)
 CRYPTOCOMPARE_NEWS_URL = "https://min-api.cryptocompare.com/data/v2/news/?lang=EN"
@@ -97,11 +101,12 @@ def get_top_trend_coins(n=5, min_trade_value=1_000_000_000, min_orderbook_depth=
     return [coin['ticker'] for coin in top_trend]
 
 
-def get_real_coin_news(coin_name, max_news=5):
+def fetch_news_feed():
     """
-    CryptoCompare API로 실제 최신 뉴스 수집
-    - 무료 API, 실시간 암호화폐 뉴스 제공
-    - 특정 코인 관련 뉴스 필터링
+    CryptoCompare 최신 뉴스 피드 1회 조회 (여러 코인이 공유)
+    
+    Returns:
+        list: 원본 기사 리스트 (실패 시 빈 리스트)
     """
     try:
         response = requests.get(CRYPTOCOMPARE_NEWS_URL, timeout=10)
@@ -110,36 +115,54 @@ def get_real_coin_news(coin_name, max_news=5):
             return []
         
         news_data = response.json()
-        if 'Data' not in news_data:
-            return []
-        
-        # 코인명 관련 뉴스 필터링
-        coin_keywords = [coin_name.upper(), coin_name.lower(), coin_name.capitalize()]
-        relevant_news = []
-        
-        for article in news_data['Data'][:30]:  # 최근 30개 뉴스 검색
-            title = article.get('title', '')
-            body = article.get('body', '')
-            
-            # 코인명이 제목이나 본문에 포함된 뉴스만 선택
-            if any(keyword in title or keyword in body for keyword in coin_keywords):
-                relevant_news.append({
-                    'title': title,
-                    'body': body[:200],  # 본문 200자까지만
-                    'published': datetime.fromtimestamp(article.get('published_on', 0)).strftime('%Y-%m-%d %H:%M'),
-                    'source': article.get('source', 'Unknown')
-                })
-                
-                if len(relevant_news) >= max_news:
-                    break
-        
-        return relevant_news
+        return news_data.get('Data', []) or []
     
     except Exception as e:
         print(f"❌ 뉴스 수집 오류: {e}")
         return []
 
 
+def filter_coin_news(feed, coin_name, max_news=5):
+    """
+    뉴스 피드에서 특정 코인 관련 기사만 추출
+    
+    Args:
+        feed: fetch_news_feed() 결과
+        coin_name: 코인명 (예: "SOL")
+        max_news: 최대 기사 수
+    """
+    # 코인명 관련 뉴스 필터링
+    coin_keywords = [coin_name.upper(), coin_name.lower(), coin_name.capitalize()]
+    relevant_news = []
+    
+    for article in feed[:30]:  # 최근 30개 뉴스 검색
+        title = article.get('title', '')
+        body = article.get('body', '')
+        
+        # 코인명이 제목이나 본문에 포함된 뉴스만 선택
+        if any(keyword in title or keyword in body for keyword in coin_keywords):
+            relevant_news.append({
+                'title': title,
+                'body': body[:200],  # 본문 200자까지만
+                'published': datetime.fromtimestamp(article.get('published_on', 0)).strftime('%Y-%m-%d %H:%M'),
+                'source': article.get('source', 'Unknown')
+            })
+            
+            if len(relevant_news) >= max_news:
+                break
+    
+    return relevant_news
+
+
+def get_real_coin_news(coin_name, max_news=5):
+    """
+    CryptoCompare API로 실제 최신 뉴스 수집
+    - 무료 API, 실시간 암호화폐 뉴스 제공
+    - 특정 코인 관련 뉴스 필터링
+    """
+    return filter_coin_news(fetch_news_feed(), coin_name, max_news)
+
+
 def ai_analyze_coin_news(coin_name, news_articles):
     """
     실제 뉴스를 OpenAI로 분석하여 투자 위험도 평가
@@ -148,6 +171,10 @@ def ai_analyze_coin_news(coin_name, news_articles):
     if not news_articles:
         return "최신 뉴스 없음 - 중립"
     
+    if ai_cost_ledger.is_over_budget(CALL_SITE_TREND_NEWS):
+        print(f"💸 일일 AI 예산 초과 - {coin_name} 뉴스 분석 생략")
+        return "뉴스 분석 실패"
+    
     # 뉴스를 텍스트로 정리
     news_text = f"{coin_name} 최신 뉴스:\n\n"
     for i, article in enumerate(news_articles, 1):
@@ -175,6 +202,7 @@ def ai_analyze_coin_news(coin_name, news_articles):
             max_tokens=300
         )
         analysis = response.choices[0].message.content
+        ai_cost_ledger.record_usage(CALL_SITE_TREND_NEWS, "gpt-4o-mini", response.usage)
         print(f"📰 {coin_name} 뉴스 분석:\n{analysis}")
         return analysis
     except Exception as e:
@@ -182,6 +210,122 @@ def ai_analyze_coin_news(coin_name, news_articles):
         return "뉴스 분석 실패"
 
 
+# 일괄 뉴스 분석 고정 지시문 (코인 수와 무관하게 1회만 전송)
+BATCH_NEWS_SYSTEM_PROMPT = """당신은 암호화폐 뉴스 위험도 분석가입니다.
+사용자가 여러 코인의 실제 최신 뉴스를 코인별로 묶어 전달합니다.
+각 코인에 대해 투자 관점의 위험도를 평가하고, 다음 위험 키워드가 뉴스에서 발견되는지 확인하세요:
+악재, 해킹, 규제, 펌핑, 청산, 상장폐지, 사기, 소송
+
+반드시 아래 JSON 형식으로만 답변하세요 (전달된 모든 코인 포함):
+{"coins": {"<코인명>": {"risk_level": "안전|주의|위험", "summary": "한 줄 요약", "risk_keywords": ["발견된 키워드"]}}}
+위험 키워드가 없으면 risk_keywords는 빈 배열로 두세요."""
+
+NEWS_RISK_LEVELS = ('안전', '주의', '위험')
+
+
+def parse_batch_news_analysis(content, coin_names):
+    """
+    일괄 뉴스 분석 JSON 응답 파싱
+    
+    Args:
+        content: 모델 응답 문자열
+        coin_names: 요청한 코인명 리스트
+    
+    Returns:
+        dict: 코인명 → {'risk_level', 'summary', 'risk_keywords'} (누락/형식 오류 코인 제외)
+    """
+    try:
+        data = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    
+    coins = data.get('coins', data) if isinstance(data, dict) else {}
+    if not isinstance(coins, dict):
+        return {}
+    
+    results = {}
+    for coin_name in coin_names:
+        entry = coins.get(coin_name) or coins.get(coin_name.upper())
+        if not isinstance(entry, dict):
+            continue
+        
+        risk_level = entry.get('risk_level', '주의')
+        if risk_level not in NEWS_RISK_LEVELS:
+            risk_level = '주의'
+        
+        keywords = entry.get('risk_keywords', [])
+        if isinstance(keywords, str):
+            keywords = [k.strip() for k in keywords.split(',') if k.strip() and k.strip() != '없음']
+        elif not isinstance(keywords, list):
+            keywords = []
+        
+        results[coin_name] = {
+            'risk_level': risk_level,
+            'summary': str(entry.get('summary', '')),
+            'risk_keywords': [str(k) for k in keywords]
+        }
+    
+    return results
+
+
+def format_news_analysis(result):
+    """구조화된 분석 결과를 기존 3줄 텍스트 형식으로 변환 (로그/위험 키워드 체크 호환)"""
+    keywords = ', '.join(result['risk_keywords']) if result['risk_keywords'] else '없음'
+    return (f"1. 투자 위험도: {result['risk_level']}\n"
+            f"2. 주요 이슈: {result['summary']}\n"
+            f"3. 위험 키워드: {keywords}")
+
+
+def ai_analyze_coins_news_batch(news_by_coin):
+    """
+    여러 코인의 뉴스를 한 번의 OpenAI 요청으로 분석
+    
+    Args:
+        news_by_coin: 코인명 → 뉴스 기사 리스트
+    
+    Returns:
+        dict: 코인명 → {'risk_level', 'summary', 'risk_keywords'} (실패 시 빈 dict)
+    """
+    news_by_coin = {coin: articles for coin, articles in news_by_coin.items() if articles}
+    if not news_by_coin:
+        return {}
+    
+    if ai_cost_ledger.is_over_budget(CALL_SITE_TREND_NEWS):
+        print(f"💸 일일 AI 예산 초과 - 뉴스 일괄 분석 생략 (기술적 분석으로 대체)")
+        return {}
+    
+    # 코인별 뉴스 블록 구성
+    news_text = ""
+    for coin_name, articles in news_by_coin.items():
+        news_text += f"### {coin_name}\n"
+        for i, article in enumerate(articles, 1):
+            news_text += f"{i}. [{article['published']}] {article['title']}\n"
+            news_text += f"   {article['body']}\n"
+        news_text += "\n"
+    
+    try:
+        client = OpenAI()
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": BATCH_NEWS_SYSTEM_PROMPT},
+                {"role": "user", "content": news_text}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3,
+            max_tokens=120 * len(news_by_coin) + 100
+        )
+        ai_cost_ledger.record_usage(CALL_SITE_TREND_NEWS, "gpt-4o-mini", response.usage)
+        results = parse_batch_news_analysis(response.choices[0].message.content, list(news_by_coin))
+        print(f"📰 뉴스 일괄 분석 완료: {len(results)}/{len(news_by_coin)}개 코인 (요청 1회)")
+        for coin_name, result in results.items():
+            print(f"   {coin_name}: {result['risk_level']} - {result['summary']}")
+        return results
+    except Exception as e:
+        print(f"❌ 뉴스 일괄 분석 오류: {e}")
+        return {}
+
+
 def analyze_technical_indicators(ticker):
     """
     뉴스가 없을 때 기술적 분석으로 투자 판단
@@ -221,22 +365,10 @@ def analyze_technical_indicators(ticker):
         return None
 
 
-def ai_search_coin_news(coin_name, ticker=None):
+def technical_news_fallback(coin_name, ticker=None):
     """
-    하이브리드 분석 전략:
-    1. CryptoCompare에서 실제 최신 뉴스 수집
-    2. 뉴스 있음 → OpenAI 분석
-    3. 뉴스 없음 → 기술적 분석으로 대체 (보수적)
+    뉴스가 없을 때 기술적 분석으로 대체한 판단 문자열 반환 (보수적)
     """
-    # 1. 실제 뉴스 수집
-    news_articles = get_real_coin_news(coin_name, max_news=5)
-    
-    if news_articles:
-        # 2. 뉴스 있을 경우 → AI 분석
-        analysis = ai_analyze_coin_news(coin_name, news_articles)
-        return analysis
-    
-    # 3. 뉴스 없을 경우 → 기술적 분석
     print(f"ℹ️ {coin_name} 관련 최신 뉴스를 찾을 수 없습니다.")
     
     if not ticker:
@@ -271,6 +403,61 @@ def ai_search_coin_news(coin_name, ticker=None):
         return f"뉴스 없음 - {msg}"
 
 
+def ai_search_coin_news(coin_name, ticker=None):
+    """
+    하이브리드 분석 전략:
+    1. CryptoCompare에서 실제 최신 뉴스 수집
+    2. 뉴스 있음 → OpenAI 분석
+    3. 뉴스 없음 → 기술적 분석으로 대체 (보수적)
+    """
+    # 1. 실제 뉴스 수집
+    news_articles = get_real_coin_news(coin_name, max_news=5)
+    
+    if news_articles:
+        # 2. 뉴스 있을 경우 → AI 분석
+        analysis = ai_analyze_coin_news(coin_name, news_articles)
+        return analysis
+    
+    # 3. 뉴스 없을 경우 → 기술적 분석
+    return technical_news_fallback(coin_name, ticker)
+
+
+def ai_search_coins_news_batch(tickers):
+    """
+    여러 후보 코인의 하이브리드 분석을 일괄 실행
+    - 뉴스 피드 1회 조회 + 뉴스 있는 코인 전체를 OpenAI 1회 요청으로 분석
+    - 뉴스 없거나 일괄 분석에서 누락된 코인 → 기술적 분석 대체
+    
+    Args:
+        tickers: 후보 티커 리스트 (예: ["KRW-SOL", ...])
+    
+    Returns:
+        dict: 티커 → 분석 결과 문자열 (ai_search_coin_news와 동일 형식)
+    """
+    if not tickers:
+        return {}
+    
+    feed = fetch_news_feed()
+    news_by_coin = {}
+    for ticker in tickers:
+        coin_name = ticker.replace("KRW-", "")
+        news_by_coin[coin_name] = filter_coin_news(feed, coin_name, max_news=5)
+    
+    batch_results = ai_analyze_coins_news_batch(news_by_coin)
+    
+    summaries = {}
+    for ticker in tickers:
+        coin_name = ticker.replace("KRW-", "")
+        if coin_name in batch_results:
+            summaries[ticker] = format_news_analysis(batch_results[coin_name])
+        elif news_by_coin.get(coin_name) and not ai_cost_ledger.is_over_budget(CALL_SITE_TREND_NEWS):
+            summaries[ticker] = "뉴스 분석 실패"
+        else:
+            summaries[ticker] = technical_news_fallback(coin_name, ticker)
+    
+    return summaries
+
+
 # ==================== 투자 전략 설정 ====================
 MIN_TRADE_AMOUNT = 25000  # 최소 투자금 (20,000원 → 25,000원으로 상향)
 # 이유: 1차 익절(70%) 후 남은 30%가 -25% 하락해도 5,000원 이상 유지
@@ -286,18 +473,37 @@ PROFIT_TAKE_STAGES = {
 }
 # =========================================================
 
-def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_ratio=0.05, check_interval_min=20, managed_coins=None, market_summary=None):
+def _sold_value(result, price):
+    """매도 체결 금액 (체결 내역 미확정 시 체결 수량 × 조회 가격으로 추정)"""
+    if result.get('unknown'):
+        return result['executed_volume'] * price
+    return result['funds']
+
+
+def _fully_exited(result, balance_amount, price, min_order=5000):
+    """전량 매도 완료 여부 (남은 수량이 최소 주문금액 미만 잔량이면 완료로 간주)"""
+    if not result:
+        return False
+    remaining = balance_amount - result['executed_volume']
+    return remaining * price < min_order
+
+
+def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_ratio=0.05, check_interval_min=20, managed_coins=None, market_summary=None, order_router=None, reduce_only=False):
     """
     신규/트렌드 코인에 소액 투자 및 짧은 주기 모니터링
     - invest_ratio: 전체 자산의 몇 %를 신규코인에 분산 투자할지
     - check_interval_min: 신규 코인만 몇 분마다 재체크할지
     - managed_coins: 이 함수에서 관리 중인 신규코인 set (손절/익절 대상)
     - market_summary: 시장 상황 정보 (공포탐욕지수, 변동성 등)
+    - order_router: 주문 경로 (RestingOrderManager 등, None이면 기본 지정가 관리자)
+    - reduce_only: True면 보유 코인 손절/익절만 실행하고 신규 매수 탐색 생략 (비상 정지 중)
     - 보유 중인 코인: 손절/익절 자동 실행
     - 반환: 현재 관리 중인 신규코인 set
     """
     if managed_coins is None:
         managed_coins = set()
+    if order_router is None:
+        order_router = RestingOrderManager(OrderExecutionEngine(upbit))
     
     currently_held = set()  # 현재 보유 중인 신규코인
     
@@ -356,9 +562,13 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
                     continue
                 
                 print(f"🚨 [신규코인 손절] {coin_name}: {profit_rate:.1f}% 손실 → 즉시 매도")
-                result = upbit.sell_market_order(ticker, balance_amount)
-                if result:
-                    print(f"✅ {coin_name} 손절 완료: {current_value:,.0f}원")
+                result = order_router.execute_market(ticker, 'sell', balance_amount)  # 손절은 시장가 (긴급)
+                if result and not _fully_exited(result, balance_amount, current_price, UPBIT_MIN_ORDER):
+                    # 부분 체결 - 잔여 수량은 관리 목록에 남겨 다음 점검에서 재시도
+                    print(f"⚠️ {coin_name} 손절 부분 체결: {result['executed_volume']:.6f}/{balance_amount:.6f} "
+                          f"- 잔여분 계속 관리")
+                elif result:
+                    print(f"✅ {coin_name} 손절 완료: {_sold_value(result, current_price):,.0f}원")
                     managed_coins.discard(ticker)  # 관리 목록에서 제거
                     log_decision(
                         action="SELL",
@@ -377,9 +587,13 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
                     print(f"   → 보유 유지 (추가 상승 대기)")
                 else:
                     print(f"💰💰 [신규코인 2차익절] {coin_name}: {profit_rate:.1f}% 수익 → 전량 매도")
-                    result = upbit.sell_market_order(ticker, balance_amount)
-                    if result:
-                        print(f"✅ {coin_name} 2차익절 완료: {current_value:,.0f}원 (수익: +{profit_rate:.1f}%)")
+                    result = order_router.execute(ticker, 'sell', balance_amount)
+                    if result and not _fully_exited(result, balance_amount, current_price, UPBIT_MIN_ORDER):
+                        print(f"⚠️ {coin_name} 2차익절 부분 체결: {result['executed_volume']:.6f}/{balance_amount:.6f} "
+                              f"- 잔여분 계속 관리")
+                    elif result:
+                        print(f"✅ {coin_name} 2차익절 완료: {_sold_value(result, current_price):,.0f}원 "
+                              f"(수익: +{profit_rate:.1f}%)")
                         managed_coins.discard(ticker)  # 관리 목록에서 제거
                         log_decision(
                             action="SELL",
@@ -413,9 +627,13 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
                     print(f"   → 하락 시 손절 불가능하므로 전량 매도로 전환")
                     
                     # 전량 매도
-                    result = upbit.sell_market_order(ticker, balance_amount)
-                    if result:
-                        print(f"✅ {coin_name} 전량 매도 완료: {current_value:,.0f}원 (수익: +{profit_rate:.1f}%)")
+                    result = order_router.execute(ticker, 'sell', balance_amount)
+                    if result and not _fully_exited(result, balance_amount, current_price, UPBIT_MIN_ORDER):
+                        print(f"⚠️ {coin_name} 전량 매도 부분 체결: {result['executed_volume']:.6f}/{balance_amount:.6f} "
+                              f"- 잔여분 계속 관리")
+                    elif result:
+                        print(f"✅ {coin_name} 전량 매도 완료: {_sold_value(result, current_price):,.0f}원 "
+                              f"(수익: +{profit_rate:.1f}%)")
                         managed_coins.discard(ticker)
                         log_decision(
                             action="SELL",
@@ -428,10 +646,12 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
                 
                 # 정상 1차 익절 (70% 매도)
                 print(f"💵 [신규코인 1차익절] {coin_name}: {profit_rate:.1f}% → 70% 회수")
-                result = upbit.sell_market_order(ticker, partial_amount)
+                result = order_router.execute(ticker, 'sell', partial_amount)
                 if result:
-                    sold_value = partial_amount * current_price
-                    print(f"✅ {coin_name} 1차익절 완료: {sold_value:,.0f}원 (남은 30%: {remaining_value:,.0f}원 → +15% 목표)")
+                    # 실제 체결 기준 (지정가 부분 체결 시 잔여 수량이 더 많이 남음)
+                    sold_value = _sold_value(result, current_price)
+                    remaining_value = (balance_amount - result['executed_volume']) * current_price
+                    print(f"✅ {coin_name} 1차익절 완료: {sold_value:,.0f}원 (남은 수량: {remaining_value:,.0f}원 → +15% 목표)")
                     log_decision(
                         action="SELL",
                         coin=coin_name,
@@ -467,6 +687,10 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
             print(f"❌ {coin_name} 모니터링 오류: {e}")
             continue
     
+    if reduce_only:
+        print(f"🚨 [신규코인] 비상 정지 중 - 손절/익절만 실행, 신규 매수 생략")
+        return currently_held
+    
     # 2. 새로운 투자 기회 탐색 (보유 중이 아닐 때만)
     # 🚨 급락장 방어: 공포탐욕지수 30 이하 시 신규 매수 중단
     if market_summary:
@@ -509,6 +733,13 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
                 total_value += balance * price
     max_invest = total_value * invest_ratio / len(top_coins) if top_coins else 0
 
+    # 매수 후보 뉴스 분석을 한 번에 실행 (코인별 개별 요청 대신 1회 요청, 남은 슬롯 수만큼만)
+    open_slots = MAX_NEW_COIN_HOLDINGS - len(currently_held)
+    candidates = [t for t in top_coins if t not in portfolio_coins and t not in currently_held][:open_slots]
+    if not candidates:
+        return currently_held
+    news_summaries = ai_search_coins_news_batch(candidates)
+
     for ticker in top_coins:
         # 매수 시점마다 최대 보유 수 재확인 (손절/익절로 빠져나간 슬롯 활용)
         if len(currently_held) >= MAX_NEW_COIN_HOLDINGS:
@@ -518,8 +749,8 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
         coin_name = ticker.replace("KRW-", "")
         # 이미 보유 중이거나 포트폴리오 코인이면 건너뛰기 (중복 매수 방지)
         if ticker not in portfolio_coins and ticker not in currently_held:
-            # 하이브리드 분석: 뉴스 우선, 없으면 기술적 분석
-            news_summary = ai_search_coin_news(coin_name, ticker=ticker)
+            # 하이브리드 분석: 뉴스 우선, 없으면 기술적 분석 (일괄 분석 결과 사용)
+            news_summary = news_summaries.get(ticker) or ai_search_coin_news(coin_name, ticker=ticker)
             
             # 위험 키워드 체크 (뉴스 분석 결과)
             if any(word in news_summary for word in ["악재", "해킹", "규제", "청산", "상장폐지", "사기", "소송"]):
@@ -564,7 +795,7 @@ def execute_new_coin_trades(upbit, portfolio_coins, min_trade_amount, invest_rat
             # MIN_TRADE_AMOUNT 사용 (설정된 최소 투자금)
             trade_amount = max(amount * price, MIN_TRADE_AMOUNT)
             if current_krw >= trade_amount:
-                result = upbit.buy_market_order(ticker, trade_amount)
+                result = order_router.execute(ticker, 'buy', trade_amount)
                 if result:
                     print(f"✅ 신규코인 매수: {ticker} {trade_amount/price:.4f}개 ({trade_amount:,.0f}원)")
                     print(f"📊 분할익절 전략: 손절 -5% | 1차익절 +10%(70%) | 2차익절 +15%(100%) | 모니터링 5분")
@@ -0,0 +1,172 @@
+"""
+AI 비용/토큰 원장
+- AI 호출 완료 시마다 메모리 누적 (파일 재스캔 없이 O(1) 조회)
+- 모델별 / 호출 위치별(포트폴리오 신호, 트렌드코인 뉴스) 집계
+- 일별 파일로 원자적 저장 (log/ai_cost_YYYYMMDD.json)
+- 일일 예산 한도 (전체 / 호출 위치별)
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+
+# 모델별 요금 (USD / 1K 토큰)
+MODEL_PRICING = {
+    'gpt-4o-mini': {'input': 0.00015, 'cached_input': 0.000075, 'output': 0.0006},
+}
+
+USD_TO_KRW = 1300  # 대략적인 환율
+
+# 호출 위치 식별자
+CALL_SITE_PORTFOLIO = 'portfolio_signals'
+CALL_SITE_TREND_NEWS = 'trend_news'
+
+
+def estimate_cost_usd(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """
+    토큰 사용량 기반 비용 계산 (캐시 적중 입력 토큰 할인 반영)
+
+    Returns:
+        float: 비용 (USD)
+    """
+    pricing = MODEL_PRICING.get(model, MODEL_PRICING['gpt-4o-mini'])
+    uncached_tokens = max(0, prompt_tokens - cached_tokens)
+    return (uncached_tokens * pricing['input']
+            + cached_tokens * pricing['cached_input']
+            + completion_tokens * pricing['output']) / 1000
+
+
+def _empty_bucket():
+    return {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0,
+            'cost_usd': 0.0, 'cost_krw': 0.0}
+
+
+class AICostLedger:
+    """일별 AI 비용 원장 (스레드 안전)"""
+
+    def __init__(self, log_dir="log", daily_budget_krw=None, call_site_budget_krw=None):
+        """
+        Args:
+            log_dir: 원장 파일 저장 폴더
+            daily_budget_krw: 일일 전체 예산 (원, None이면 무제한)
+            call_site_budget_krw: 호출 위치별 일일 예산 dict (예: {'trend_news': 500})
+        """
+        self.log_dir = log_dir
+        self.daily_budget_krw = daily_budget_krw
+        self.call_site_budget_krw = call_site_budget_krw or {}
+        self._lock = threading.Lock()
+        self._date = None
+        self._data = None
+
+    def _ledger_path(self, date_str):
+        return os.path.join(self.log_dir, f"ai_cost_{date_str}.json")
+
+    def _ensure_today(self):
+        """날짜가 바뀌었으면 해당 일자 원장을 로드 (재시작 시 이어서 누적)"""
+        today = datetime.now().strftime("%Y%m%d")
+        if self._date == today:
+            return
+        self._date = today
+        self._data = {'date': today, 'total': _empty_bucket(), 'by_model': {}, 'by_call_site': {}}
+        path = self._ledger_path(today)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                if loaded.get('date') == today:
+                    self._data = loaded
+            except (json.JSONDecodeError, OSError) as e:
+                logging.warning(f"AI 비용 원장 로드 실패 (새로 시작): {e}")
+
+    def _persist(self):
+        """임시 파일에 쓰고 rename (원자적 교체)"""
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            path = self._ledger_path(self._date)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"AI 비용 원장 저장 실패: {e}")
+
+    def record(self, call_site, model, prompt_tokens, completion_tokens, cached_tokens=0):
+        """
+        AI 호출 1건 기록
+
+        Args:
+            call_site: 호출 위치 (CALL_SITE_PORTFOLIO, CALL_SITE_TREND_NEWS 등)
+            model: 모델명
+            prompt_tokens / completion_tokens / cached_tokens: 토큰 사용량
+
+        Returns:
+            dict: 이번 호출 비용 {'cost_usd', 'cost_krw'}
+        """
+        cost_usd = estimate_cost_usd(model, prompt_tokens, completion_tokens, cached_tokens)
+        cost_krw = cost_usd * USD_TO_KRW
+
+        with self._lock:
+            self._ensure_today()
+            buckets = [
+                self._data['total'],
+                self._data['by_model'].setdefault(model, _empty_bucket()),
+                self._data['by_call_site'].setdefault(call_site, _empty_bucket())
+            ]
+            for bucket in buckets:
+                bucket['calls'] += 1
+                bucket['prompt_tokens'] += prompt_tokens
+                bucket['completion_tokens'] += completion_tokens
+                bucket['cached_tokens'] += cached_tokens
+                bucket['cost_usd'] += cost_usd
+                bucket['cost_krw'] += cost_krw
+            self._persist()
+
+        return {'cost_usd': cost_usd, 'cost_krw': cost_krw}
+
+    def record_usage(self, call_site, model, usage):
+        """OpenAI 응답 usage 객체로 기록 (cached_tokens 자동 추출)"""
+        cached_tokens = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', 0) or 0
+        return self.record(call_site, model, usage.prompt_tokens, usage.completion_tokens, cached_tokens)
+
+    def get_daily_cost(self, call_site=None):
+        """
+        오늘 누적 비용 (원)
+
+        Args:
+            call_site: 지정 시 해당 호출 위치 비용만
+        """
+        with self._lock:
+            self._ensure_today()
+            if call_site is None:
+                return self._data['total']['cost_krw']
+            return self._data['by_call_site'].get(call_site, _empty_bucket())['cost_krw']
+
+    def is_over_budget(self, call_site=None):
+        """
+        일일 예산 초과 여부 (전체 예산 또는 호출 위치별 예산)
+        """
+        if self.daily_budget_krw is not None and self.get_daily_cost() >= self.daily_budget_krw:
+            return True
+        site_budget = self.call_site_budget_krw.get(call_site) if call_site else None
+        if site_budget is not None and self.get_daily_cost(call_site) >= site_budget:
+            return True
+        return False
+
+    def configure(self, ai_budget_config):
+        """config.json의 ai_budget 섹션 적용"""
+        ai_budget_config = ai_budget_config or {}
+        self.daily_budget_krw = ai_budget_config.get('daily_budget_krw')
+        self.call_site_budget_krw = ai_budget_config.get('call_site_budget_krw', {}) or {}
+
+    def get_summary(self):
+        """오늘 원장 전체 (모델별/호출 위치별 포함) 사본 반환"""
+        with self._lock:
+            self._ensure_today()
+            return json.loads(json.dumps(self._data))
+
+
+# 전역 AI 비용 원장 인스턴스
+ai_cost_ledger = AICostLedger()
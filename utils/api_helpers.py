@@ -7,6 +7,7 @@ import pyupbit
 import logging
 import time
 from utils.delisted_coins import is_delisted
+from utils.slippage import estimate_fills
 
 
 def get_safe_price(ticker, max_retries=3):
@@ -52,59 +53,96 @@ def get_safe_price(ticker, max_retries=3):
     return None
 
 
-def check_slippage_risk(ticker, order_amount, max_slippage=0.02):
+def get_krw_markets():
     """
-    슬리피지 리스크 체크 (호가 깊이 기반)
+    KRW 마켓 티커 집합
+    
+    Returns:
+        set: {"KRW-BTC", ...} (조회 실패 시 빈 set - 호출 측에서 필터 생략)
+    """
+    try:
+        return set(pyupbit.get_tickers(fiat="KRW") or [])
+    except Exception as e:
+        logging.warning(f"KRW_MARKET_LIST_ERROR: {e} - 마켓 필터 생략")
+        return set()
+
+
+def get_krw_prices(tickers, check_markets=True):
+    """
+    다수 티커 현재가 조회 (KRW 마켓 필터 + 일괄 실패 시 개별/호가 대체)
+    
+    Args:
+        tickers: 티커 목록 (예: ["KRW-BTC", "KRW-XYZ"])
+        check_markets: KRW 마켓 목록 조회로 거래 불가 티커 제외 (이미 걸러진 목록이면 False)
+    
+    Returns:
+        tuple: ({ticker: price}, [KRW 마켓이 없는 티커])
+    """
+    tickers = list(tickers)
+    listed = get_krw_markets() if check_markets else set()
+    unlisted = [t for t in tickers if listed and t not in listed]
+    tickers = [t for t in tickers if t not in unlisted]
+    if not tickers:
+        return {}, unlisted
+
+    prices = {}
+    try:
+        quotes = pyupbit.get_current_price(tickers)
+        prices = quotes if isinstance(quotes, dict) else {tickers[0]: quotes}
+    except Exception as e:
+        # 하나라도 조회 불가 티커가 섞이면 일괄 조회 전체가 실패 → 개별 조회
+        logging.warning(f"PRICE_BATCH_ERROR: {e} - 개별 조회로 대체")
+
+    for ticker in tickers:
+        if prices.get(ticker):
+            continue
+        price = get_safe_price(ticker, max_retries=1)
+        if not price:
+            orderbook = get_safe_orderbook(ticker, max_retries=1)
+            price = orderbook['orderbook_units'][0]['bid_price'] if orderbook else None
+        if price:
+            prices[ticker] = price
+    return {t: p for t, p in prices.items() if p}, unlisted
+
+
+def check_slippage_risk(ticker, order_amount, max_slippage=0.02, side='buy', orderbook=None):
+    """
+    슬리피지 리스크 체크 (호가 전체 깊이 기반)
     
     Args:
         ticker: 티커 심볼
         order_amount: 주문 금액 (KRW)
         max_slippage: 최대 허용 슬리피지 (기본 2%)
+        side: 'buy' (매도호가 소진) 또는 'sell' (매수호가 소진)
+        orderbook: 이미 조회한 호가 (None이면 조회)
     
     Returns:
-        dict: {'safe': bool, 'expected_slippage': float, 'limit_price': float}
+        dict: {'safe': bool, 'expected_slippage': float, 'limit_price': float, ...}
     """
     try:
-        orderbook = get_safe_orderbook(ticker)
+        orderbook = orderbook or get_safe_orderbook(ticker)
         if not orderbook:
             return {'safe': False, 'expected_slippage': 0, 'limit_price': 0}
         
-        ask_price = orderbook['orderbook_units'][0]['ask_price']
-        
-        # 매도 1~5호가 총 금액 계산
-        cumulative_amount = 0
-        weighted_price = 0
-        
-        for unit in orderbook['orderbook_units'][:5]:
-            size = unit['ask_size']
-            price = unit['ask_price']
-            unit_amount = size * price
-            
-            cumulative_amount += unit_amount
-            weighted_price += price * unit_amount
-            
-            # 주문 금액을 커버할 수 있으면 중단
-            if cumulative_amount >= order_amount:
-                break
-        
-        # 예상 평균 체결가
-        expected_avg_price = weighted_price / cumulative_amount if cumulative_amount > 0 else ask_price
+        estimate = estimate_fills(orderbook, side, order_amount)
+        expected_slippage = float(estimate['slippage'][0])
+        best_price = estimate['best_price']
         
-        # 예상 슬리피지 계산
-        expected_slippage = (expected_avg_price - ask_price) / ask_price
+        # 안전 여부 판단 (호가 깊이가 주문 금액을 커버해야 함)
+        is_safe = expected_slippage <= max_slippage and not estimate['insufficient'][0]
         
-        # 안전 여부 판단
-        is_safe = expected_slippage <= max_slippage and cumulative_amount >= order_amount
-        
-        # 지정가 한도 (슬리피지 제한)
-        limit_price = ask_price * (1 + max_slippage)
+        # 지정가 한도 (슬리피지 제한) - 매수는 위로, 매도는 아래로
+        limit_price = best_price * (1 + max_slippage) if side == 'buy' else best_price * (1 - max_slippage)
         
         return {
             'safe': is_safe,
             'expected_slippage': expected_slippage,
+            'expected_avg_price': float(estimate['avg_price'][0]),
             'limit_price': limit_price,
-            'ask_price': ask_price,
-            'cumulative_depth': cumulative_amount
+            'best_price': best_price,
+            'ask_price': orderbook['orderbook_units'][0]['ask_price'],
+            'bid_price': orderbook['orderbook_units'][0]['bid_price'],
+            'cumulative_depth': estimate['depth_krw']
         }
         
     except Exception as e:
@@ -114,7 +152,7 @@ def check_slippage_risk(ticker, order_amount, max_slippage=0.02):
 
 def safe_market_order(upbit, ticker, order_type, amount, max_slippage=0.02):
     """
-    슬리피지 제어된 안전한 주문 (지정가 우선, 실패 시 시장가)
+    슬리피지 제어된 안전한 주문 (지정가 우선 → 미체결 시 재호가 → 조건부 시장가)
     
     Args:
         upbit: Upbit 객체
@@ -124,38 +162,14 @@ def safe_market_order(upbit, ticker, order_type, amount, max_slippage=0.02):
         max_slippage: 최대 허용 슬리피지
     
     Returns:
-        주문 결과 또는 None
+        dict: 체결 정보 (executed_volume, avg_price, funds, paid_fee) 또는 None
     """
-    try:
-        # 슬리피지 체크
-        slippage_check = check_slippage_risk(ticker, amount if order_type == 'buy' else amount * get_safe_price(ticker), max_slippage)
-        
-        if slippage_check['safe']:
-            # 안전: 지정가 주문
-            if order_type == 'buy':
-                limit_price = slippage_check['limit_price']
-                quantity = amount / limit_price
-                print(f"✅ 슬리피지 안전 - 지정가 매수: {ticker} @ {limit_price:,.0f}원")
-                return upbit.buy_limit_order(ticker, limit_price, quantity)
-            else:
-                limit_price = slippage_check['ask_price'] * (1 - max_slippage)
-                print(f"✅ 슬리피지 안전 - 지정가 매도: {ticker} @ {limit_price:,.0f}원")
-                return upbit.sell_limit_order(ticker, limit_price, amount)
-        else:
-            # 위험: 시장가 주문 (긴급)
-            print(f"⚠️ 슬리피지 위험 ({slippage_check['expected_slippage']:.1%}) - 시장가 주문: {ticker}")
-            if order_type == 'buy':
-                return upbit.buy_market_order(ticker, amount)
-            else:
-                return upbit.sell_market_order(ticker, amount)
-                
-    except Exception as e:
-        logging.error(f"안전 주문 오류 ({ticker}): {e}")
-        # 오류 시 기본 시장가 주문
-        if order_type == 'buy':
-            return upbit.buy_market_order(ticker, amount)
-        else:
-            return upbit.sell_market_order(ticker, amount)
+    # 지연 임포트 (trading 모듈이 utils.api_helpers를 임포트하므로 순환 방지)
+    from trading.execution_engine import OrderExecutionEngine
+    from trading.resting_orders import RestingOrderManager
+    
+    manager = RestingOrderManager(OrderExecutionEngine(upbit), max_slippage=max_slippage)
+    return manager.execute(ticker, order_type, amount)
 
 
 def get_safe_orderbook(ticker, max_retries=3):
@@ -1,34 +1,167 @@
 """
 비상 정지 시스템
 연속 실패, API 장애, 급격한 폭락 시 자동 거래 정지
+- 감시 스레드(guard_loop)가 보유/관심 코인 시세를 일괄 조회로 고빈도 샘플링
+- can_trade 플래그는 잠금 없이 읽음 (모든 주문 경로에서 먼저 확인)
+- 정지 중에도 노출을 줄이는 매도(손절/익절)는 허용 (can_submit) - 신규 매수만 차단
+- 정지 상태는 파일에 저장되어 재시작 후에도 유지 (수동 리셋 필요)
 """
 
+import os
+import json
+import time
 import logging
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
 import pyupbit
 
 
+class PriceWindow:
+    """
+    시간 기반 슬라이딩 윈도우 가격 버퍼 (고정 용량 링 버퍼 + 단조 최대/최소 덱)
+    - 삽입/만료: 분할상환 O(1)
+    - 윈도우 내 최고가/최저가 및 고점 대비 하락률 조회: O(1)
+    """
+
+    def __init__(self, window_seconds, capacity=4096):
+        """
+        Args:
+            window_seconds: 윈도우 길이 (초)
+            capacity: 최대 보관 관측치 수 (초과 시 가장 오래된 관측치부터 제거)
+        """
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self._buffer = deque(maxlen=capacity)  # (seq, timestamp, price)
+        self._max = deque()  # 가격 단조 감소 (앞 = 윈도우 최고가)
+        self._min = deque()  # 가격 단조 증가 (앞 = 윈도우 최저가)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def push(self, price, timestamp=None):
+        """관측치 추가 후 윈도우 밖 관측치 만료"""
+        timestamp = time.time() if timestamp is None else timestamp
+        entry = (self._seq, timestamp, price)
+        self._seq += 1
+
+        self._buffer.append(entry)
+        while self._max and self._max[-1][2] <= price:
+            self._max.pop()
+        self._max.append(entry)
+        while self._min and self._min[-1][2] >= price:
+            self._min.pop()
+        self._min.append(entry)
+
+        self._expire(timestamp - self.window_seconds)
+
+    def _expire(self, cutoff):
+        buffer = self._buffer
+        while buffer and buffer[0][1] <= cutoff:
+            buffer.popleft()
+        # 용량 초과(maxlen)로 밀려난 관측치 포함, 버퍼에 없는 항목 제거
+        oldest_seq = buffer[0][0] if buffer else self._seq
+        while self._max and self._max[0][0] < oldest_seq:
+            self._max.popleft()
+        while self._min and self._min[0][0] < oldest_seq:
+            self._min.popleft()
+
+    @property
+    def latest(self):
+        return self._buffer[-1][2] if self._buffer else None
+
+    @property
+    def peak(self):
+        return self._max[0][2] if self._max else None
+
+    @property
+    def trough(self):
+        return self._min[0][2] if self._min else None
+
+    def drawdown(self):
+        """윈도우 내 고점 대비 현재가 변화율 (하락 시 음수)"""
+        if not self._buffer or not self.peak:
+            return 0.0
+        return (self.latest - self.peak) / self.peak
+
+
 class EmergencyStopSystem:
     """비상 정지 시스템"""
     
-    def __init__(self):
+    def __init__(self, state_file=None):
         self.consecutive_failures = 0
         self.api_failures = 0
+        self.quote_failures = 0
         self.last_check_time = datetime.now()
         self.is_stopped = False
         self.stop_reason = None
+        self.stopped_at = None
+        self.state_file = state_file
         
         # 임계값 설정
-        self.MAX_CONSECUTIVE_FAILURES = 3
+        self.MAX_CONSECUTIVE_FAILURES = 3  # 주문 제출/시장가 체결 연속 실패 (OrderExecutionEngine이 보고)
+        self.QUOTE_WARNING_INTERVAL = 12  # 감시 시세 조회 연속 실패 경고 주기 (5초 간격 12회 = 약 1분)
         self.MAX_API_FAILURES = 5
         self.CRASH_THRESHOLD = -0.10  # -10% 30분 내 폭락
         self.CRASH_TIMEFRAME = 30  # 30분
+        self.PRICE_WINDOW_CAPACITY = 4096  # 티커별 최대 관측치 (1초 간격 샘플링 시 30분 = 1,800개)
         
-        # 가격 이력
+        # 가격 이력 (티커별 PriceWindow)
         self.price_history = {}
     
+    def configure(self, emergency_config, state_file=None):
+        """
+        config.json의 emergency_stop 섹션 적용 + 저장된 정지 상태 복원
+        
+        Args:
+            emergency_config: emergency_stop 설정 dict
+            state_file: 정지 상태 저장 파일 (None이면 저장하지 않음 - 모의 실행 등)
+        """
+        emergency_config = emergency_config or {}
+        self.MAX_CONSECUTIVE_FAILURES = emergency_config.get('max_consecutive_failures', self.MAX_CONSECUTIVE_FAILURES)
+        self.MAX_API_FAILURES = emergency_config.get('max_api_failures', self.MAX_API_FAILURES)
+        self.CRASH_THRESHOLD = emergency_config.get('crash_threshold', self.CRASH_THRESHOLD)
+        self.CRASH_TIMEFRAME = emergency_config.get('crash_timeframe_minutes', self.CRASH_TIMEFRAME)
+        self.state_file = state_file
+        self._load_state()
+    
+    def _load_state(self):
+        """재시작 전 정지 상태 복원"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(f"비상 정지 상태 로드 실패: {e}")
+            return
+        if state.get('is_stopped'):
+            self.stop_reason = state.get('stop_reason')
+            self.stopped_at = state.get('stopped_at')
+            self.is_stopped = True
+            logging.critical(f"🚨 비상 정지 상태 유지 (재시작 전 발동: {self.stopped_at}) - 사유: {self.stop_reason}")
+            print(f"🚨 비상 정지 상태 유지 중 ({self.stopped_at} 발동) - 사유: {self.stop_reason}")
+            print("   거래 재개: python mvp.py emergency-reset")
+    
+    def _persist_state(self):
+        """정지 상태 저장 (임시 파일에 쓰고 rename)"""
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_path = f"{self.state_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'is_stopped': self.is_stopped,
+                    'stop_reason': self.stop_reason,
+                    'stopped_at': self.stopped_at
+                }, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            logging.warning(f"비상 정지 상태 저장 실패: {e}")
+    
     def check_consecutive_failures(self, success):
-        """연속 실패 체크"""
+        """주문 연속 실패 체크 (OrderExecutionEngine이 제출/시장가 체결 결과마다 호출)"""
         if success:
             self.consecutive_failures = 0
         else:
@@ -66,34 +199,22 @@ class EmergencyStopSystem:
             
             return True
     
-    def check_market_crash(self, ticker, current_price):
-        """급격한 폭락 감지 (30분 -10%)"""
-        now = datetime.now()
-        
-        # 가격 이력 업데이트
-        if ticker not in self.price_history:
-            self.price_history[ticker] = []
-        
-        self.price_history[ticker].append({
-            'time': now,
-            'price': current_price
-        })
-        
-        # 30분 이전 데이터 제거
-        cutoff_time = now - timedelta(minutes=self.CRASH_TIMEFRAME)
-        self.price_history[ticker] = [
-            p for p in self.price_history[ticker] 
-            if p['time'] > cutoff_time
-        ]
-        
-        # 30분 전 가격이 있으면 비교
-        if len(self.price_history[ticker]) >= 2:
-            old_price = self.price_history[ticker][0]['price']
-            change_rate = (current_price - old_price) / old_price
+    def check_market_crash(self, ticker, current_price, timestamp=None):
+        """급격한 폭락 감지 (30분 윈도우 고점 대비 -10%)"""
+        window = self.price_history.get(ticker)
+        if window is None:
+            window = self.price_history[ticker] = PriceWindow(self.CRASH_TIMEFRAME * 60, self.PRICE_WINDOW_CAPACITY)
+        
+        window.push(current_price, timestamp)
+        
+        # 윈도우 내 중간 고점에서의 하락도 감지 (가장 오래된 가격만 비교하지 않음)
+        if len(window) >= 2:
+            change_rate = window.drawdown()
             
             if change_rate <= self.CRASH_THRESHOLD:
                 self.trigger_emergency_stop(
-                    f"{ticker} 급격한 폭락 감지: {change_rate:.1%} ({self.CRASH_TIMEFRAME}분)"
+                    f"{ticker} 급격한 폭락 감지: 고점 {window.peak:,.0f} → {current_price:,.0f} "
+                    f"({change_rate:.1%}, {self.CRASH_TIMEFRAME}분)"
                 )
                 return True
         
@@ -101,8 +222,13 @@ class EmergencyStopSystem:
     
     def trigger_emergency_stop(self, reason):
         """비상 정지 트리거"""
-        self.is_stopped = True
+        if self.is_stopped:
+            logging.warning(f"비상 정지 중 추가 사유: {reason}")
+            return
         self.stop_reason = reason
+        self.stopped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.is_stopped = True
+        self._persist_state()
         
         logging.critical(f"🚨 비상 정지 발동: {reason}")
         print(f"\n{'='*60}")
@@ -138,60 +264,138 @@ class EmergencyStopSystem:
         # - Email (SMTP)
         # - Telegram Bot
     
-    def emergency_sell_all(self, upbit, portfolio_coins):
-        """긴급 전량 청산 (옵션)"""
+    def emergency_sell_all(self, upbit, portfolio_coins=None, min_order_krw=5000):
+        """
+        긴급 전량 청산 (옵션) - 비상 정지 중에만 실행
+        
+        보유 코인 전체를 병렬 제출하고 체결까지 확인 (평가금액/변동폭 큰 코인 우선,
+        상장폐지/소액 잔량 제외)
+        """
         if not self.is_stopped:
             return False
         
         print("\n💸 긴급 청산 시작...")
         
         try:
-            balances = upbit.get_balances()
-            
-            for balance in balances:
-                if balance['currency'] == 'KRW':
-                    continue
-                
-                ticker = f"KRW-{balance['currency']}"
-                amount = float(balance['balance'])
-                
-                if amount > 0:
-                    print(f"  매도: {ticker} {amount:.6f}")
-                    result = upbit.sell_market_order(ticker, amount)
-                    
-                    if result:
-                        print(f"  ✅ {ticker} 청산 완료")
-                    else:
-                        print(f"  ❌ {ticker} 청산 실패")
-            
-            print("💸 긴급 청산 완료\n")
-            return True
+            from trading.liquidation import LiquidationExecutor
+            result = LiquidationExecutor(upbit, min_order_krw=min_order_krw).liquidate_all(self.price_history)
+            print(f"💸 긴급 청산 완료: {len(result['sold'])}건 {result['proceeds']:,.0f}원 "
+                  f"({result['elapsed']:.1f}초, 미완료 {len(result['failed'])}건)\n")
+            return not result['failed']
             
         except Exception as e:
             logging.error(f"긴급 청산 오류: {e}")
             return False
     
     def can_trade(self):
-        """거래 가능 여부"""
+        """거래 가능 여부 (단일 bool 읽기 - 잠금 없음)"""
         return not self.is_stopped
     
+    def can_submit(self, side):
+        """주문 제출 가능 여부 (정지 중에는 노출 축소 주문인 매도만 허용)"""
+        return not self.is_stopped or side == 'sell'
+    
     def reset(self, reason="수동 리셋"):
         """비상 정지 해제 (수동)"""
         self.is_stopped = False
         self.stop_reason = None
+        self.stopped_at = None
         self.consecutive_failures = 0
         self.api_failures = 0
+        self.quote_failures = 0
+        self.price_history = {}
+        self._persist_state()
         
         logging.info(f"✅ 비상 정지 해제: {reason}")
         print(f"\n✅ 비상 정지 해제: {reason}\n")
     
+    def _held_tickers(self, upbit):
+        """보유 중인 거래 가능 코인 티커 (상장폐지 / KRW 마켓 없는 통화 제외)"""
+        from utils.delisted_coins import is_delisted
+        from utils.api_helpers import get_krw_markets
+        listed = get_krw_markets()
+        tickers = []
+        for balance in upbit.get_balances():
+            currency = balance['currency']
+            if currency == 'KRW' or is_delisted(currency):
+                continue
+            if listed and f"KRW-{currency}" not in listed:
+                continue
+            if float(balance['balance']) + float(balance.get('locked') or 0) > 0:
+                tickers.append(f"KRW-{currency}")
+        return tickers
+    
+    def sample_prices(self, tickers):
+        """
+        시세 일괄 조회 1회 (실패 시 티커별 조회) → 폭락 감지에 반영
+        - 시세 조회 장애는 거래 실패가 아니므로 비상 정지(파일 저장)로 이어지지 않음 - 경고 로그만
+        
+        Returns:
+            dict: {ticker: price} (조회 실패 시 빈 dict)
+        """
+        from utils.api_helpers import get_krw_prices
+        prices = {}
+        if tickers:
+            try:
+                prices, _ = get_krw_prices(tickers, check_markets=False)
+            except Exception as e:
+                logging.warning(f"EMERGENCY_GUARD_QUOTE_ERROR: {e}")
+        
+        if prices or not tickers:
+            self.quote_failures = 0
+        else:
+            self.quote_failures += 1
+            if self.quote_failures % self.QUOTE_WARNING_INTERVAL == 0:
+                logging.warning(f"EMERGENCY_GUARD_QUOTE_UNAVAILABLE - 시세 조회 {self.quote_failures}회 연속 실패 "
+                                f"(폭락 감시 일시 중단)")
+        now = time.time()
+        for ticker, price in prices.items():
+            if self.check_market_crash(ticker, price, now):
+                break
+        return prices
+    
+    def guard_loop(self, upbit, watch_tickers, stop_event, interval=5, health_interval=60):
+        """
+        비상 정지 감시 스레드 - 보유/관심 코인 시세를 주기적으로 일괄 샘플링
+        
+        Args:
+            upbit: Upbit 객체
+            watch_tickers: 항상 감시할 티커 (포트폴리오 코인)
+            stop_event: 종료 이벤트
+            interval: 시세 샘플링 주기 (초)
+            health_interval: API 상태 점검 및 보유 코인 갱신 주기 (초)
+        """
+        tickers = list(watch_tickers)
+        last_health_check = 0
+        
+        while not stop_event.is_set():
+            if self.is_stopped:
+                stop_event.wait(health_interval)
+                continue
+            
+            try:
+                if time.time() - last_health_check >= health_interval:
+                    last_health_check = time.time()
+                    if self.check_api_health(upbit):
+                        tickers = list(dict.fromkeys(list(watch_tickers) + self._held_tickers(upbit)))
+                
+                self.sample_prices(tickers)
+            except Exception as e:
+                logging.error(f"비상 정지 감시 오류: {e}")
+            
+            stop_event.wait(interval)
+        
+        logging.info("🛑 비상 정지 감시 스레드 종료")
+    
     def get_status(self):
         """현재 상태 반환"""
         return {
             'is_stopped': self.is_stopped,
             'stop_reason': self.stop_reason,
+            'stopped_at': self.stopped_at,
             'consecutive_failures': self.consecutive_failures,
-            'api_failures': self.api_failures
+            'api_failures': self.api_failures,
+            'quote_failures': self.quote_failures
         }
 
 
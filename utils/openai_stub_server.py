@@ -0,0 +1,331 @@
+"""
+OpenAI 호환 로컬 스텁 서버 (오프라인 벤치마크/부하 테스트용)
+- replay: 녹화된 카세트에서 요청 해시로 응답 재생 (미스는 경고 로그 후 고정 응답, --strict면 HTTP 404)
+- canned: 고정 응답 반환 (지연 시간 주입 가능)
+- record: 실제 OpenAI API로 프록시하며 요청/응답 쌍을 카세트에 기록
+
+사용 예:
+    python -m utils.openai_stub_server --mode canned --latency-ms 300
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python mvp.py
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+import urllib.request
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_PORT = 8765
+DEFAULT_UPSTREAM = "https://api.openai.com/v1"
+
+# 요청 해시 계산에 포함할 필드 (stream 등 전송 옵션은 제외)
+HASHED_FIELDS = ('model', 'messages', 'response_format', 'temperature', 'max_tokens')
+
+# 뉴스 분석(자유 텍스트) 기본 응답 - trendcoin_trader.ai_analyze_coin_news 형식
+DEFAULT_TEXT_REPLY = "1. 투자 위험도: 안전\n2. 주요 이슈: 특이사항 없음\n3. 위험 키워드: 없음"
+
+
+def request_hash(payload):
+    """
+    요청 본문 해시 (카세트 키)
+
+    Args:
+        payload: chat.completions 요청 dict
+
+    Returns:
+        str: 정규화된 요청의 sha256 hex
+    """
+    key = {field: payload.get(field) for field in HASHED_FIELDS}
+    canonical = json.dumps(key, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _estimate_tokens(text):
+    """대략적인 토큰 수 추정 (4글자 ≈ 1토큰)"""
+    return max(1, len(text) // 4)
+
+
+def _default_json_reply(payload):
+    """
+    json_object 요청에 대한 기본 응답
+    - 포트폴리오 신호 요청: MARKET_DATA의 코인마다 HOLD
+    - 일괄 뉴스 분석 요청: "### 코인명" 블록마다 안전
+    """
+    coins = []
+    news_coins = []
+    for message in payload.get('messages', []):
+        content = message.get('content') or ''
+        if message.get('role') != 'user':
+            continue
+        marker = content.find('MARKET_DATA: ')
+        if marker >= 0:
+            try:
+                coins = list(json.loads(content[marker + len('MARKET_DATA: '):]).get('coins', {}).keys())
+            except (json.JSONDecodeError, AttributeError):
+                coins = []
+        news_coins += [line[4:].strip() for line in content.splitlines() if line.startswith('### ')]
+    if news_coins and not coins:
+        return json.dumps({"coins": {
+            coin: {"risk_level": "안전", "summary": "stub server canned reply", "risk_keywords": []}
+            for coin in news_coins
+        }}, ensure_ascii=False)
+    return json.dumps({
+        coin: {"signal": "HOLD", "confidence": 0.5, "reason": "stub server canned reply",
+               "stop_loss": 0, "take_profit": 0, "recommended_size": 0}
+        for coin in coins
+    })
+
+
+def build_completion(payload, content):
+    """
+    OpenAI chat.completion 응답 본문 생성
+
+    Args:
+        payload: 원본 요청 dict
+        content: assistant 메시지 내용
+
+    Returns:
+        dict: chat.completion 형식 응답
+    """
+    prompt_text = ''.join((m.get('content') or '') for m in payload.get('messages', []))
+    prompt_tokens = _estimate_tokens(prompt_text)
+    completion_tokens = _estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-stub-{request_hash(payload)[:16]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get('model', 'gpt-4o-mini'),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+    }
+
+
+class Cassette:
+    """요청 해시 → 응답 본문 저장소 (JSON 파일)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+        return entry['response'] if entry else None
+
+    def put(self, key, request, response):
+        """녹화 후 즉시 원자적으로 저장 (tmp 파일 → rename)"""
+        with self._lock:
+            self.entries[key] = {"request": request, "response": response}
+            if not self.path:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+class StubConfig:
+    """스텁 서버 동작 설정"""
+
+    def __init__(self, mode='canned', cassette_path=None, latency_ms=0, jitter_ms=0,
+                 canned_json=None, canned_text=None, upstream=DEFAULT_UPSTREAM, fail_rate=0.0, strict=False):
+        """
+        Args:
+            mode: 'replay' | 'canned' | 'record'
+            cassette_path: 카세트 파일 경로 (replay/record)
+            latency_ms: 응답 전 고정 지연 (ms)
+            jitter_ms: 추가 랜덤 지연 상한 (ms)
+            canned_json: json_object 요청에 대한 고정 응답 문자열 (None이면 코인별 HOLD)
+            canned_text: 텍스트 요청에 대한 고정 응답 문자열
+            upstream: record 모드 프록시 대상 base URL
+            fail_rate: 500 오류를 반환할 확률 (장애 주입)
+            strict: replay 카세트 미스 시 고정 응답 대신 HTTP 404 반환 (재생 결과 오염 방지)
+        """
+        self.mode = mode
+        self.cassette = Cassette(cassette_path)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.canned_json = canned_json
+        self.canned_text = canned_text or DEFAULT_TEXT_REPLY
+        self.upstream = upstream.rstrip('/')
+        self.fail_rate = fail_rate
+        self.strict = strict
+        self.stats = {'requests': 0, 'replayed': 0, 'canned': 0, 'recorded': 0, 'misses': 0, 'failures': 0}
+
+    def canned_reply(self, payload):
+        if (payload.get('response_format') or {}).get('type') == 'json_object':
+            content = self.canned_json if self.canned_json is not None else _default_json_reply(payload)
+        else:
+            content = self.canned_text
+        return build_completion(payload, content)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """POST /v1/chat/completions 처리"""
+
+    server_version = "OpenAIStub/1.0"
+
+    def log_message(self, format, *args):
+        logging.debug("openai-stub: " + format % args)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": {"message": message, "type": "stub_error", "code": status}})
+
+    def do_POST(self):
+        config = self.server.stub_config
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_error(404, f"지원하지 않는 경로: {self.path}")
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_error(400, "잘못된 JSON 요청")
+            return
+
+        config.stats['requests'] += 1
+        delay = config.latency_ms + (random.uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if config.fail_rate and random.random() < config.fail_rate:
+            config.stats['failures'] += 1
+            self._send_error(500, "stub 장애 주입")
+            return
+
+        key = request_hash(payload)
+
+        if config.mode == 'record':
+            self._proxy_and_record(config, key, payload)
+            return
+
+        if config.mode == 'replay':
+            response = config.cassette.get(key)
+            if response is not None:
+                config.stats['replayed'] += 1
+                self._send_json(200, response)
+                return
+            config.stats['misses'] += 1
+            if config.strict:
+                logging.warning(f"openai-stub: 카세트 미스 {key[:12]} - strict 모드 404 반환")
+                self._send_error(404, f"카세트 미스: {key}")
+                return
+            logging.warning(f"openai-stub: 카세트 미스 {key[:12]} - 고정 응답 사용")
+
+        config.stats['canned'] += 1
+        self._send_json(200, config.canned_reply(payload))
+
+    def _proxy_and_record(self, config, key, payload):
+        """실제 API로 요청 전달 후 카세트에 기록"""
+        api_key = os.getenv('OPENAI_API_KEY', '')
+        auth = self.headers.get('Authorization') or f"Bearer {api_key}"
+        request = urllib.request.Request(
+            f"{config.upstream}/chat/completions",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Authorization': auth},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as resp:
+                body = json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            self._send_json(e.code, json.loads(e.read() or b'{}'))
+            return
+        except Exception as e:
+            self._send_error(502, f"upstream 오류: {e}")
+            return
+
+        config.cassette.put(key, payload, body)
+        config.stats['recorded'] += 1
+        self._send_json(200, body)
+
+
+def start_stub_server(config=None, host='127.0.0.1', port=DEFAULT_PORT):
+    """
+    백그라운드 스레드에서 스텁 서버 시작
+
+    Args:
+        config: StubConfig (None이면 canned 기본값)
+        host: 바인드 주소
+        port: 포트 (0이면 임의 포트)
+
+    Returns:
+        tuple: (server, base_url) - 종료 시 server.shutdown() 호출
+    """
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.stub_config = config or StubConfig()
+    thread = threading.Thread(target=server.serve_forever, daemon=True, name="OpenAIStubServer")
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    logging.info(f"🧪 OpenAI 스텁 서버 시작: {base_url} (모드: {server.stub_config.mode})")
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 스텁 서버")
+    parser.add_argument('--mode', choices=['replay', 'canned', 'record'], default='canned')
+    parser.add_argument('--cassette', default=os.path.join('log', 'openai_cassette.json'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--canned-json', default=None, help="json_object 요청 고정 응답 (파일 경로 또는 JSON 문자열)")
+    parser.add_argument('--upstream', default=os.getenv('OPENAI_UPSTREAM_URL', DEFAULT_UPSTREAM))
+    parser.add_argument('--strict', action='store_true', help="replay 카세트 미스 시 고정 응답 대신 HTTP 404 반환")
+    args = parser.parse_args()
+
+    canned_json = args.canned_json
+    if canned_json and os.path.exists(canned_json):
+        with open(canned_json, 'r', encoding='utf-8') as f:
+            canned_json = f.read()
+
+    if args.mode == 'record':
+        os.makedirs(os.path.dirname(args.cassette) or '.', exist_ok=True)
+
+    config = StubConfig(mode=args.mode, cassette_path=args.cassette, latency_ms=args.latency_ms,
+                        jitter_ms=args.jitter_ms, canned_json=canned_json, upstream=args.upstream,
+                        fail_rate=args.fail_rate, strict=args.strict)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server, base_url = start_stub_server(config, args.host, args.port)
+    print(f"🧪 OpenAI 스텁 서버 실행 중: {base_url} (모드: {args.mode})")
+    print(f"   OPENAI_BASE_URL={base_url} OPENAI_API_KEY=stub python mvp.py")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n🛑 스텁 서버 종료 - 통계: {config.stats}")
+
+
+if __name__ == "__main__":
+    main()
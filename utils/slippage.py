@@ -0,0 +1,119 @@
+"""
+호가 전체 깊이 기반 슬리피지 추정 (NumPy 벡터화)
+- 매수는 매도호가(ask), 매도는 매수호가(bid) 쪽을 사용
+- 여러 주문 규모를 한 번에 계산 (누적 깊이 + searchsorted)
+- 슬리피지 한도 내 최대 주문 금액을 해석적으로 산출
+"""
+
+import numpy as np
+
+
+def orderbook_to_arrays(orderbook, side):
+    """
+    호가 dict → 주문 방향 쪽 가격/잔량 배열
+
+    Args:
+        orderbook: pyupbit 호가 dict
+        side: 'buy' (ask 쪽) 또는 'sell' (bid 쪽)
+
+    Returns:
+        tuple: (prices, sizes) np.ndarray (최우선 호가부터)
+    """
+    units = orderbook['orderbook_units']
+    price_key, size_key = ('ask_price', 'ask_size') if side == 'buy' else ('bid_price', 'bid_size')
+    prices = np.fromiter((u[price_key] for u in units), dtype=float, count=len(units))
+    sizes = np.fromiter((u[size_key] for u in units), dtype=float, count=len(units))
+    return prices, sizes
+
+
+def _adverse_slippage(side, avg_price, best_price):
+    """불리한 방향을 양수로 하는 슬리피지 (매수: 비싸게, 매도: 싸게)"""
+    if side == 'buy':
+        return (avg_price - best_price) / best_price
+    return (best_price - avg_price) / best_price
+
+
+def estimate_fills(orderbook, side, amounts, amount_type='krw'):
+    """
+    주문 규모별 예상 평균 체결가/슬리피지 (벡터화)
+
+    Args:
+        orderbook: pyupbit 호가 dict
+        side: 'buy' 또는 'sell'
+        amounts: 주문 규모 (스칼라 또는 배열)
+        amount_type: 'krw' (주문 금액) 또는 'volume' (수량)
+
+    Returns:
+        dict: {'avg_price', 'slippage', 'volume', 'notional', 'insufficient'} 배열
+              + 'best_price', 'depth_krw', 'depth_volume' 스칼라
+              (호가 부족분은 가용 깊이까지만 체결된 것으로 계산)
+    """
+    prices, sizes = orderbook_to_arrays(orderbook, side)
+    amounts = np.atleast_1d(np.asarray(amounts, dtype=float))
+
+    cum_volume = np.concatenate(([0.0], np.cumsum(sizes)))
+    cum_krw = np.concatenate(([0.0], np.cumsum(prices * sizes)))
+    cum_key = cum_krw if amount_type == 'krw' else cum_volume
+
+    insufficient = amounts > cum_key[-1]
+    capped = np.minimum(amounts, cum_key[-1])
+
+    # 주문이 끝나는 호가 단계 (부분 체결 단계)
+    level = np.clip(np.searchsorted(cum_key, capped, side='left') - 1, 0, len(prices) - 1)
+    partial = capped - cum_key[level]
+    if amount_type == 'krw':
+        volume = cum_volume[level] + partial / prices[level]
+        notional = capped
+    else:
+        volume = capped
+        notional = cum_krw[level] + partial * prices[level]
+
+    best_price = prices[0]
+    avg_price = np.divide(notional, volume, out=np.full_like(notional, best_price), where=volume > 0)
+
+    return {
+        'avg_price': avg_price,
+        'slippage': _adverse_slippage(side, avg_price, best_price),
+        'volume': volume,
+        'notional': notional,
+        'insufficient': insufficient,
+        'best_price': float(best_price),
+        'depth_krw': float(cum_krw[-1]),
+        'depth_volume': float(cum_volume[-1])
+    }
+
+
+def max_notional_under_slippage(orderbook, side, max_slippage):
+    """
+    평균 체결가 슬리피지가 한도 이내인 최대 주문 금액 (KRW)
+
+    각 호가 단계 끝에서의 슬리피지를 한 번에 계산한 뒤,
+    한도를 처음 넘는 단계 안에서 한도와 같아지는 수량을 해석적으로 구함.
+
+    Args:
+        orderbook: pyupbit 호가 dict
+        side: 'buy' 또는 'sell'
+        max_slippage: 허용 슬리피지 (예: 0.005 = 0.5%)
+
+    Returns:
+        float: 최대 주문 금액 (KRW, 전체 깊이가 한도 이내면 전체 깊이)
+    """
+    prices, sizes = orderbook_to_arrays(orderbook, side)
+    cum_volume = np.cumsum(sizes)
+    cum_krw = np.cumsum(prices * sizes)
+    best_price = prices[0]
+
+    level_slippage = _adverse_slippage(side, cum_krw / cum_volume, best_price)
+    over = np.flatnonzero(level_slippage > max_slippage)
+    if over.size == 0:
+        return float(cum_krw[-1])
+
+    j = over[0]
+    prev_krw = cum_krw[j - 1] if j > 0 else 0.0
+    prev_volume = cum_volume[j - 1] if j > 0 else 0.0
+
+    # (prev_krw + x·p) / (prev_volume + x) = 한도 가격 을 만족하는 수량 x
+    bound_price = best_price * (1 + max_slippage) if side == 'buy' else best_price * (1 - max_slippage)
+    x = (bound_price * prev_volume - prev_krw) / (prices[j] - bound_price)
+    x = float(np.clip(x, 0.0, sizes[j]))
+    return float(prev_krw + x * prices[j])